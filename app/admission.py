@@ -0,0 +1,155 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after_s: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+async def _acquire_within(sem: asyncio.Semaphore, timeout_s: float) -> bool:
+    """
+    sem.acquire() with a timeout; True if a permit was taken.
+
+    asyncio.wait_for can lose a permit before Python 3.12: when the acquire
+    completes just as the timeout fires (or the caller is cancelled) it
+    still raises, and nobody releases. Here an acquire that is given up on
+    is cancelled, and if it won the permit anyway the permit goes straight
+    back to the semaphore.
+    """
+    task = asyncio.ensure_future(sem.acquire())
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout_s)
+    except asyncio.CancelledError:
+        _abandon(sem, task)
+        raise
+    if done:
+        return task.result()
+    _abandon(sem, task)
+    return False
+
+
+def _abandon(sem: asyncio.Semaphore, task: asyncio.Task) -> None:
+    def give_back(t: asyncio.Task) -> None:
+        if not t.cancelled() and t.exception() is None:
+            sem.release()
+
+    task.cancel()
+    task.add_done_callback(give_back)
+
+
+class AdmissionController:
+    """
+    Per-worker concurrency limit with a bounded, deadline-aware wait queue.
+
+    At most `max_concurrency` requests run at once. Up to `max_queue` more
+    wait for a slot, each for at most its deadline (`queue_timeout_ms`, or
+    less if the client asks for less). Anything beyond that is rejected
+    immediately with Overloaded, so the caller can answer 503 + Retry-After
+    instead of letting latency grow without bound.
+
+    Runs on the event loop: admission happens before the request is handed
+    to the threadpool, so a shed request costs no thread.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 64,
+                 queue_timeout_ms: float = 1000.0, retry_after_s: int = 1):
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._max_queue = max(0, int(max_queue))
+        self._queue_timeout_s = max(0.0, float(queue_timeout_ms)) / 1000.0
+        self._retry_after_s = max(1, int(retry_after_s))
+
+        self._loop = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+
+        self._admitted = 0
+        self._shed_queue_full = 0
+        self._shed_deadline = 0
+        self._max_waiting_seen = 0
+        self._wait_total_s = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; recreate if the app is served from a new one
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self._max_concurrency)
+        return self._sem
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self, timeout_ms: Optional[float] = None) -> float:
+        """Wait for a slot; returns the seconds spent queued. Raises Overloaded."""
+        sem = self._semaphore()
+        if not sem.locked():
+            await sem.acquire()  # free slot: no suspension
+            self._active += 1
+            self._admitted += 1
+            return 0.0
+
+        if self._waiting >= self._max_queue:
+            self._shed_queue_full += 1
+            raise Overloaded("queue_full", self._retry_after_s)
+
+        timeout_s = self._queue_timeout_s
+        if timeout_ms is not None:
+            timeout_s = min(timeout_s, max(0.0, float(timeout_ms)) / 1000.0)
+
+        self._waiting += 1
+        self._max_waiting_seen = max(self._max_waiting_seen, self._waiting)
+        start = time.perf_counter()
+        try:
+            acquired = await _acquire_within(sem, timeout_s)
+        finally:
+            self._waiting -= 1
+        if not acquired:
+            self._shed_deadline += 1
+            raise Overloaded("deadline", self._retry_after_s)
+
+        waited = time.perf_counter() - start
+        self._active += 1
+        self._admitted += 1
+        self._wait_total_s += waited
+        return waited
+
+    def release(self) -> None:
+        self._active -= 1
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self, timeout_ms: Optional[float] = None):
+        await self.acquire(timeout_ms)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self._max_concurrency,
+            "max_queue": self._max_queue,
+            "queue_timeout_ms": self._queue_timeout_s * 1000.0,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "max_queue_depth_seen": self._max_waiting_seen,
+            "admitted": self._admitted,
+            "shed_queue_full": self._shed_queue_full,
+            "shed_deadline": self._shed_deadline,
+            "avg_queue_wait_ms": self._wait_total_s / self._admitted * 1000.0 if self._admitted else 0.0,
+        }
@@ -0,0 +1,232 @@
+import csv
+import io
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: writes are still appended, just not locked
+    fcntl = None
+
+
+_STOP = object()
+
+
+class LiveRequestCapture:
+    """
+    Buffers validated /predict payloads in memory and writes them for drift
+    monitoring from a background thread.
+
+    The request path only does a queue put of the whole batch: a list of row
+    dicts (capture) or a float matrix in `columns` order (capture_matrix,
+    for columnar requests, which never build per-row objects). The buffer
+    holds at most `max_queue_size` rows; rows that do not fit are dropped at
+    once by the `drop` policy, and after waiting up to `block_timeout_ms` for
+    space by the `block` policy.
+
+    Sinks:
+      - "store": each flush becomes one segment in the hourly-partitioned
+        columnar store at `path` (see src.live_store); segment names are unique
+        per process, so workers never share a file.
+      - "csv": rows are appended to the single CSV file at `path` under an
+        exclusive file lock so several gunicorn workers can share it.
+    """
+
+    def __init__(self, path: str, columns: List[str], sink: str = "csv",
+                 store_format: str = "parquet", max_queue_size: int = 10000,
+                 policy: str = "drop", block_timeout_ms: float = 5.0,
+                 flush_interval_s: float = 1.0, flush_batch_size: int = 500):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown capture policy: {policy}. Use 'drop' or 'block'.")
+        if sink not in ("store", "csv"):
+            raise ValueError(f"Unknown capture sink: {sink}. Use 'store' or 'csv'.")
+
+        self._path = Path(path)
+        self._columns = list(columns)
+        self._sink = sink
+        self._store_format = store_format
+        self._policy = policy
+        self._block_timeout_s = float(block_timeout_ms) / 1000.0
+        self._flush_interval_s = float(flush_interval_s)
+        self._flush_batch_size = max(1, int(flush_batch_size))
+
+        # batches (row-dict lists or matrices); the row bound is kept by _queued_rows
+        self._queue: "queue.Queue" = queue.Queue()
+        self._max_rows = max(1, int(max_queue_size))
+        self._queued_rows = 0
+        self._space = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[list], None]] = []
+
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._written = 0
+        self._flushes = 0
+        self._write_errors = 0
+        self._listener_errors = 0
+
+    @property
+    def path(self) -> str:
+        return str(self._path)
+
+    def add_listener(self, fn: Callable[[list], None]):
+        """Call `fn(rows)` from the writer thread with every flushed batch."""
+        self._listeners.append(fn)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        (self._path if self._sink == "store" else self._path.parent).mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="live-capture", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0):
+        """Flush everything still buffered and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def capture(self, rows: List[dict]) -> int:
+        """Enqueue rows for writing; returns how many were accepted."""
+        return self._enqueue(rows)
+
+    def capture_matrix(self, X: np.ndarray) -> int:
+        """capture() for an (n, len(columns)) float matrix; the rows are written as they are."""
+        return self._enqueue(X)
+
+    def _enqueue(self, batch) -> int:
+        n = len(batch)
+        with self._space:
+            if self._policy == "block" and self._queued_rows + n > self._max_rows:
+                deadline = time.monotonic() + self._block_timeout_s
+                while self._queued_rows + n > self._max_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._space.wait(remaining)
+            accepted = max(0, min(n, self._max_rows - self._queued_rows))
+            if accepted:
+                self._queued_rows += accepted
+                self._queue.put(batch if accepted == n else batch[:accepted])
+
+        with self._stats_lock:
+            self._enqueued += accepted
+            self._dropped += n - accepted
+        return accepted
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "path": str(self._path),
+                "sink": self._sink,
+                "policy": self._policy,
+                "enqueued": self._enqueued,
+                "dropped": self._dropped,
+                "written": self._written,
+                "flushes": self._flushes,
+                "write_errors": self._write_errors,
+                "listener_errors": self._listener_errors,
+                "queue_depth": self._queued_rows,
+            }
+
+    def _run(self):
+        pending: list = []
+        pending_rows = 0
+        deadline = time.monotonic() + self._flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(pending)
+                return
+            if item is not None:
+                with self._space:
+                    self._queued_rows -= len(item)
+                    self._space.notify_all()
+                pending.append(item)
+                pending_rows += len(item)
+
+            now = time.monotonic()
+            if pending_rows >= self._flush_batch_size or now >= deadline:
+                self._flush(pending)
+                pending = []
+                pending_rows = 0
+                deadline = now + self._flush_interval_s
+
+    def _records(self, batch) -> List[dict]:
+        if isinstance(batch, np.ndarray):
+            return [dict(zip(self._columns, r)) for r in batch.tolist()]
+        return list(batch)
+
+    def _flush(self, batches: list):
+        n_rows = sum(len(b) for b in batches)
+        if not n_rows:
+            return
+
+        if self._listeners:
+            rows = [row for b in batches for row in self._records(b)]
+            for fn in self._listeners:
+                try:
+                    fn(rows)
+                except Exception:
+                    with self._stats_lock:
+                        self._listener_errors += 1
+
+        try:
+            if self._sink == "store":
+                self._write_segment(batches)
+            else:
+                self._append_csv(batches)
+        except Exception:  # keep the writer alive; the failure shows up in stats()
+            with self._stats_lock:
+                self._write_errors += 1
+            return
+
+        with self._stats_lock:
+            self._written += n_rows
+            self._flushes += 1
+
+    def _write_segment(self, batches: list):
+        import pandas as pd
+        from src.live_store import write_segment
+
+        frames = [
+            pd.DataFrame(b, columns=self._columns) if isinstance(b, np.ndarray)
+            else pd.DataFrame.from_records(b, columns=self._columns)
+            for b in batches
+        ]
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        write_segment(df, self._path, self._store_format)
+
+    def _append_csv(self, batches: list):
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        for b in batches:
+            if isinstance(b, np.ndarray):
+                writer.writerows(b.tolist())
+            else:
+                writer.writerows([row.get(c) for c in self._columns] for row in b)
+        body = buf.getvalue()
+
+        fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # header check must happen under the lock: another worker may create the file
+            if os.fstat(fd).st_size == 0:
+                body = ",".join(self._columns) + "\n" + body
+            os.write(fd, body.encode("utf-8"))
+        finally:
+            os.close(fd)  # closing the descriptor releases the flock
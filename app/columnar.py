@@ -0,0 +1,126 @@
+import io
+import operator
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+
+# Binary bodies for /predict/batch: one column per feature, no per-row Python objects.
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+NPY = "application/x-npy"
+BINARY_TYPES = (ARROW_STREAM, ARROW_FILE, NPY)
+
+_OPS = {"ge": (operator.ge, ">="), "gt": (operator.gt, ">"), "le": (operator.le, "<="), "lt": (operator.lt, "<")}
+MAX_REPORTED_ROWS = 100
+
+
+class ColumnarError(ValueError):
+    pass
+
+
+def media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def feature_bounds(schema: Type[BaseModel]) -> Dict[str, List[Tuple[str, float]]]:
+    """The ge/gt/le/lt constraints declared on each Field of `schema`."""
+    bounds = {}
+    for name, field in schema.model_fields.items():
+        bounds[name] = [
+            (op, float(getattr(m, op)))
+            for m in field.metadata
+            for op in _OPS
+            if getattr(m, op, None) is not None
+        ]
+    return bounds
+
+
+def validate_matrix(X: np.ndarray, columns: List[str],
+                    bounds: Dict[str, List[Tuple[str, float]]]) -> Tuple[int, List[dict]]:
+    """
+    Vectorized equivalent of validating every row with the pydantic schema.
+    Returns (number of bad rows, [{"index", "errors"}] for the first
+    MAX_REPORTED_ROWS of them).
+    """
+    checks = []
+    for j, col in enumerate(columns):
+        x = X[:, j]
+        finite = np.isfinite(x)
+        checks.append((~finite, f"{col}: missing or not finite"))
+        for op, value in bounds.get(col, []):
+            fn, sym = _OPS[op]
+            checks.append((finite & ~fn(x, value), f"{col}: must be {sym} {value:g}"))
+    bad = np.logical_or.reduce([fail for fail, _ in checks]) if checks else np.zeros(X.shape[0], dtype=bool)
+
+    bad_rows = np.flatnonzero(bad)
+    rejected = []
+    for i in bad_rows[:MAX_REPORTED_ROWS]:
+        rejected.append({"index": int(i), "errors": [msg for fail, msg in checks if fail[i]]})
+    return int(bad_rows.size), rejected
+
+
+def _from_arrow(body: bytes, columns: List[str], file_format: bool) -> np.ndarray:
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.py_buffer(body)) if file_format else pa.ipc.open_stream(pa.py_buffer(body))
+    table = reader.read_all()
+    missing = [c for c in columns if c not in table.column_names]
+    if missing:
+        raise ColumnarError(f"Missing columns: {missing}")
+
+    X = np.empty((table.num_rows, len(columns)), dtype=np.float64)
+    for j, col in enumerate(columns):
+        # nulls become NaN and are then rejected by validate_matrix
+        X[:, j] = table.column(col).cast(pa.float64()).to_numpy(zero_copy_only=False)
+    return X
+
+
+def _from_npy(body: bytes, columns: List[str]) -> np.ndarray:
+    arr = np.load(io.BytesIO(body), allow_pickle=False)
+    if arr.dtype.names:
+        missing = [c for c in columns if c not in arr.dtype.names]
+        if missing:
+            raise ColumnarError(f"Missing fields: {missing}")
+        arr = arr.reshape(-1)
+        return np.column_stack([arr[c].astype(np.float64) for c in columns]).reshape(arr.size, len(columns))
+    if arr.ndim != 2 or arr.shape[1] != len(columns):
+        raise ColumnarError(f"Expected a 2-D array of shape (n, {len(columns)}) in {columns} order, got {arr.shape}")
+    if arr.dtype.kind not in "fiu":
+        raise ColumnarError(f"Expected a numeric array, got dtype {arr.dtype}")
+    return np.ascontiguousarray(arr, dtype=np.float64)
+
+
+def decode_matrix(body: bytes, content_type: str, columns: List[str]) -> np.ndarray:
+    """(n_rows, n_features) float64 matrix in `columns` order from an Arrow IPC or .npy body."""
+    kind = media_type(content_type)
+    try:
+        if kind == NPY:
+            return _from_npy(body, columns)
+        return _from_arrow(body, columns, file_format=kind == ARROW_FILE)
+    except ColumnarError:
+        raise
+    except Exception as e:  # malformed body
+        raise ColumnarError(f"Could not read {kind} body: {e}") from e
+
+
+def encode_predictions(preds: np.ndarray, content_type: str, metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """Predictions as a one-column Arrow IPC body or a 1-D .npy array."""
+    preds = np.asarray(preds, dtype=np.float64)
+    kind = media_type(content_type)
+    if kind == NPY:
+        buf = io.BytesIO()
+        np.save(buf, preds, allow_pickle=False)
+        return buf.getvalue()
+
+    import pyarrow as pa
+
+    table = pa.table({"prediction": preds})
+    if metadata:
+        table = table.replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_file(sink, table.schema) if kind == ARROW_FILE else pa.ipc.new_stream(sink, table.schema)
+    with writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
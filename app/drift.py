@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from src.drift_profile import OnlineDriftEngine
+
+
+class _Bucket:
+    """Per-feature counts, mean and M2 (sum of squared deviations) for one time slice."""
+
+    def __init__(self, slot: int, n_bins: List[int]):
+        self.slot = slot
+        self.counts = [np.zeros(n, dtype=np.int64) for n in n_bins]
+        k = len(n_bins)
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    # Chan et al. parallel variance update, vectorized over features
+    n = n_a + n_b
+    safe_n = np.where(n > 0, n, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / safe_n
+    m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / safe_n
+    return n, mean, m2
+
+
+class RollingDriftMonitor:
+    """
+    Sliding-window input statistics for the serving process.
+
+    The window of `window_s` seconds is split into `n_buckets` time slices.
+    Each slice holds per-feature bin counts (on the baseline profile's cut
+    points) plus streaming mean/variance; slices older than the window are
+    recycled. `snapshot` merges the live slices and compares them with the
+    baseline profile.
+
+    `observe` is the request-path entry point: it only buffers the rows, which
+    are binned as one block once `flush_rows` are pending or the oldest is
+    `flush_interval_s` old, and before every snapshot.
+    """
+
+    def __init__(self, profile: dict, window_s: float = 3600.0, n_buckets: int = 12,
+                 method: str = "psi", psi_threshold: float = 0.2, ks_threshold: float = 0.1,
+                 drift_threshold_share: float = 0.3, min_rows: int = 100,
+                 flush_rows: int = 256, flush_interval_s: float = 1.0):
+        self._engine = OnlineDriftEngine(profile, method=method,
+                                         psi_threshold=psi_threshold, ks_threshold=ks_threshold)
+        self._profile = profile
+        self._features = self._engine.features
+        self._n_bins = [len(profile["features"][f]["proportions"]) for f in self._features]
+
+        self._window_s = float(window_s)
+        self._bucket_s = self._window_s / max(1, int(n_buckets))
+        self._buckets: List[_Bucket] = []
+        self._n_buckets = max(1, int(n_buckets))
+
+        self._drift_threshold_share = float(drift_threshold_share)
+        self._min_rows = int(min_rows)
+        self._lock = threading.Lock()
+
+        self._flush_rows = max(1, int(flush_rows))
+        self._flush_interval_s = float(flush_interval_s)
+        self._pending: List[np.ndarray] = []
+        self._pending_rows = 0
+        self._pending_since = 0.0
+
+    @property
+    def features(self) -> List[str]:
+        return list(self._features)
+
+    def _current_slot(self, now: float) -> int:
+        return int(now // self._bucket_s)
+
+    def _live_buckets(self, now: float) -> List[_Bucket]:
+        oldest = self._current_slot(now) - self._n_buckets + 1
+        return [b for b in self._buckets if b.slot >= oldest]
+
+    def observe(self, rows) -> None:
+        """Buffer scored rows (dicts or a matrix in feature order); cheap enough for every request."""
+        X = self._engine.to_matrix(rows)
+        now = time.time()
+        with self._lock:
+            if not self._pending:
+                self._pending_since = now
+            self._pending.append(X)
+            self._pending_rows += X.shape[0]
+            if self._pending_rows < self._flush_rows and now - self._pending_since < self._flush_interval_s:
+                return
+            block, since = self._take_pending()
+        self.update(block, now=since)
+
+    def _take_pending(self):
+        # caller holds self._lock; rows are filed under the time the oldest of them arrived
+        block = np.vstack(self._pending) if self._pending else np.empty((0, len(self._features)))
+        since = self._pending_since
+        self._pending, self._pending_rows = [], 0
+        return block, since
+
+    def flush(self) -> None:
+        with self._lock:
+            block, since = self._take_pending()
+        self.update(block, now=since)
+
+    def update(self, rows, now: Optional[float] = None) -> None:
+        """Add a block of rows (dicts, DataFrame or matrix in feature order) at `now` (default: time.time())."""
+        X = self._engine.to_matrix(rows)
+        if X.shape[0] == 0:
+            return
+
+        counts = self._engine.bin_counts(X)
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0).astype(float)
+        safe = np.where(n_b > 0, n_b, 1)
+        mean_b = np.where(valid, X, 0.0).sum(axis=0) / safe
+        m2_b = np.where(valid, (X - mean_b) ** 2, 0.0).sum(axis=0)
+
+        now = time.time() if now is None else now
+        slot = self._current_slot(now)
+        with self._lock:
+            self._buckets = self._live_buckets(now)
+            # a buffered block older than the newest slice (flushed by a slower thread) joins that slice
+            if not self._buckets or self._buckets[-1].slot < slot:
+                self._buckets.append(_Bucket(slot, self._n_bins))
+            b = self._buckets[-1]
+            for acc, new in zip(b.counts, counts):
+                acc += new
+            b.n, b.mean, b.m2 = _merge_moments(b.n, b.mean, b.m2, n_b, mean_b, m2_b)
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        self.flush()
+        k = len(self._features)
+        counts = [np.zeros(n, dtype=np.int64) for n in self._n_bins]
+        n, mean, m2 = np.zeros(k), np.zeros(k), np.zeros(k)
+
+        with self._lock:
+            buckets = self._live_buckets(time.time() if now is None else now)
+            for b in buckets:
+                for acc, c in zip(counts, b.counts):
+                    acc += c
+                n, mean, m2 = _merge_moments(n, mean, m2, b.n, b.mean, b.m2)
+
+        result = self._engine.drift(dict(zip(self._features, counts)))
+        std = np.sqrt(m2 / np.where(n > 0, n, 1))
+        for j, f in enumerate(self._features):
+            ref = self._profile["features"][f]
+            stats = result["features"].setdefault(f, {"count": 0})
+            stats.update({
+                "mean": float(mean[j]) if n[j] else None,
+                "std": float(std[j]) if n[j] else None,
+                "baseline_mean": ref["mean"],
+                "baseline_std": ref["std"],
+            })
+
+        enough = result["rows"] >= self._min_rows
+        result.update({
+            "window_s": self._window_s,
+            "buckets": len(buckets),
+            "min_rows": self._min_rows,
+            "insufficient_data": not enough,
+            "drift_threshold_share": self._drift_threshold_share,
+            "drift_detected": bool(enough and result["share_of_drifted_columns"] >= self._drift_threshold_share),
+        })
+        return result
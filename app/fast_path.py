@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+import numpy as np
+
+from src.compile_model import UnsupportedPipeline, extract_preprocessing
+
+
+class FastPathPredictor:
+    """
+    Scores NumPy rows with a fitted `preprocess -> model` pipeline without
+    pandas or ColumnTransformer dispatch.
+
+    Supported layout (what src.features.build_preprocessor produces for
+    numeric data): a ColumnTransformer whose only non-empty branch is
+    SimpleImputer(nan) -> StandardScaler, followed by an estimator that was
+    fitted on plain arrays. The imputer statistics and scaler vectors are
+    precomputed in the input column order; anything else raises
+    UnsupportedPipeline so the caller can keep using `pipe.predict`.
+    """
+
+    def __init__(self, pipe, feature_columns: List[str], dtype=np.float64):
+        pre, model = extract_preprocessing(pipe, feature_columns)
+
+        self.feature_columns = list(feature_columns)
+        self.dtype = np.dtype(dtype)
+        self._order = pre["order"]
+        self._stats = pre["impute"].astype(self.dtype)
+        self._impute_mask = ~np.isnan(pre["impute"])
+        self._has_stats = bool(self._impute_mask.all())
+        self._mean = pre["mean"].astype(self.dtype)
+        self._scale = pre["scale"].astype(self.dtype)
+        self._model = model
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X[:, self._order], dtype=self.dtype)
+        if self._impute_mask.any():
+            nan = np.isnan(X) & self._impute_mask
+            if nan.any():
+                X[nan] = np.broadcast_to(self._stats, X.shape)[nan]
+        X -= self._mean
+        X /= self._scale
+        return X
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._model.predict(self.transform(X))
+
+    def verify(self, pipe, probe: np.ndarray) -> None:
+        """Raise UnsupportedPipeline unless predictions match `pipe.predict` on `probe`."""
+        import pandas as pd
+
+        expected = pipe.predict(pd.DataFrame(probe, columns=self.feature_columns))
+        got = self.predict(probe)
+        if self.dtype == np.float64:
+            ok = np.array_equal(expected, got)
+        else:
+            ok = np.allclose(expected, got, rtol=1e-3, atol=1e-4)
+        if not ok:
+            raise UnsupportedPipeline(
+                f"Fast path disagrees with pipeline (max abs diff {np.max(np.abs(expected - got)):.3g})"
+            )
+
+
+def build_fast_path(pipe, feature_columns: List[str], dtype=np.float64,
+                    probe: Optional[np.ndarray] = None) -> FastPathPredictor:
+    """Build and verify a fast path; raises UnsupportedPipeline when it can't match the pipeline."""
+    fast = FastPathPredictor(pipe, feature_columns, dtype=dtype)
+    if probe is None:
+        # imputer medians / scaler means, a shifted row and (with an imputer) an all-NaN row
+        base = np.zeros(len(feature_columns))
+        base[fast._order] = np.where(np.isnan(fast._stats), fast._mean, fast._stats)
+        rows = [base, base * 1.1 + 0.5]
+        if fast._has_stats:
+            rows.append(np.full(len(feature_columns), np.nan))
+        probe = np.vstack(rows)
+    fast.verify(pipe, probe)
+    return fast
@@ -1,17 +1,128 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
 import time
-from pathlib import Path
-import pandas as pd
 
-from src.config import load_settings
+_import_started = time.perf_counter()
+
+import hmac
+import json
+import os
+import random
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+import anyio.to_thread
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
+
+from src.config import load_settings, on_config_reload, reload_config
+from src.drift_profile import load_profile
 from src.logger import get_logger
 
-from .schemas import HouseFeatures, PredictResponse
+from .schemas import HouseFeatures, PredictResponse, BatchPredictRequest, BatchPredictResponse, inline_json_schema
+from . import metrics
+from .columnar import (
+    ARROW_FILE, ARROW_STREAM, BINARY_TYPES, NPY, ColumnarError,
+    decode_matrix, encode_predictions, feature_bounds, media_type, validate_matrix,
+)
 from .service import model_service
+from .registry import UnknownModelVersion
+from .model_cache import ModelLoading
+from .capture import LiveRequestCapture
+from .drift import RollingDriftMonitor
+from .memory import format_memory, process_memory
+from .reloader import ModelReloader, canary_batch
+from .shadow import ShadowScorer
+from .admission import AdmissionController, Overloaded
+from .profiling import RequestProfiler, StackSampler
 
 settings = load_settings()
-log = get_logger("api", settings.log_level)
+cfg = settings.cfg
+log_cfg = cfg["logging"]["api"]
+log = get_logger("api", settings.log_level, str(log_cfg["format"]))
+success_sample_rate = float(log_cfg["success_sample_rate"])
+slow_request_s = float(log_cfg["slow_request_ms"]) / 1000.0
+
+
+@on_config_reload
+def apply_config(new_settings):
+    # only settings read per request are applied live; the rest takes effect on restart
+    global success_sample_rate, slow_request_s
+    api_cfg = new_settings.cfg["logging"]["api"]
+    success_sample_rate = float(api_cfg["success_sample_rate"])
+    slow_request_s = float(api_cfg["slow_request_ms"]) / 1000.0
+    log.info("Config reloaded (request log sampling applied; restart for other settings)")
+
+
+FEATURE_COLUMNS = list(settings.feature_columns)
+FEATURE_BOUNDS = feature_bounds(HouseFeatures)
+
+capture_cfg = cfg["monitoring"]["capture"]
+capture_sink = str(capture_cfg["sink"])
+live_capture = LiveRequestCapture(
+    path=cfg["monitoring"]["live_store"]["dir"] if capture_sink == "store" else cfg["monitoring"]["live_file"],
+    columns=FEATURE_COLUMNS,
+    sink=capture_sink,
+    store_format=str(cfg["monitoring"]["live_store"]["format"]),
+    max_queue_size=int(capture_cfg["max_queue_size"]),
+    policy=str(capture_cfg["policy"]),
+    block_timeout_ms=float(capture_cfg["block_timeout_ms"]),
+    flush_interval_s=float(capture_cfg["flush_interval_s"]),
+    flush_batch_size=int(capture_cfg["flush_batch_size"]),
+)
+
+rolling_cfg = cfg["monitoring"]["rolling"]
+drift_monitor = None
+
+# /health/ready answers 503 until startup, including the background warm-up, has finished
+warmup_cfg = cfg["serving"]["warmup"]
+ready = False
+stopping = threading.Event()  # set on shutdown, so a warm-up still running does not report ready afterwards
+startup_timings = {}
+
+reload_cfg = cfg["serving"]["hot_reload"]
+model_reloader = None
+
+admission_cfg = cfg["serving"]["admission"]
+micro_batching_cfg = cfg["serving"]["micro_batching"]
+
+
+def admission_controller(max_concurrency: int) -> AdmissionController:
+    return AdmissionController(
+        max_concurrency=max_concurrency,
+        max_queue=int(admission_cfg["max_queue"]),
+        queue_timeout_ms=float(admission_cfg["queue_timeout_ms"]),
+        retry_after_s=int(admission_cfg["retry_after_s"]),
+    )
+
+
+admission = admission_controller(int(admission_cfg["max_concurrency"])) if admission_cfg["enabled"] else None
+# /predict on the live model only waits for the micro-batcher, which scores on its own thread. Held to
+# max_concurrency, no batch could grow past that many rows, so those requests get a cap of max_batch_size.
+batched_admission = admission_controller(
+    max(int(admission_cfg["max_concurrency"]), int(micro_batching_cfg["max_batch_size"]))
+) if admission_cfg["enabled"] and micro_batching_cfg["enabled"] else None
+
+profiling_cfg = cfg["serving"]["profiling"]
+stack_sampler = StackSampler(
+    profiling_cfg["output_dir"],
+    interval_ms=float(profiling_cfg["sample_interval_ms"]),
+    max_seconds=float(profiling_cfg["max_seconds"]),
+)
+request_profiler = RequestProfiler(
+    profiling_cfg["output_dir"],
+    sample_rate=float(profiling_cfg["request_sample_rate"]),
+    dump_every=int(profiling_cfg["request_dump_every"]),
+)
+
+# a request for a registry version still loading gets 503 after model_cache.load_timeout_s
+model_loading_retry_after = str(int(cfg["serving"]["model_cache"]["load_retry_after_s"]))
+
+shadow_cfg = cfg["serving"]["shadow"]
+shadow_scorer = None
 
 app = FastAPI(
     title="House Price Prediction API",
@@ -28,30 +139,257 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Request logging middleware ---
+# --- Request logging + metrics middleware ---
+_in_flight = {}
+
+
+def route_label(path: str) -> str:
+    # only known paths become label values, so scanners can't blow up metric cardinality
+    if not _in_flight:
+        for r in app.routes:
+            _in_flight[r.path] = metrics.IN_FLIGHT.labels(route=r.path)
+        _in_flight["unmatched"] = metrics.IN_FLIGHT.labels(route="unmatched")
+    return path if path in _in_flight else "unmatched"
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start = time.time()
-    response = await call_next(request)
-    duration_ms = (time.time() - start) * 1000
-    log.info(f"{request.method} {request.url.path} -> {response.status_code} ({duration_ms:.1f} ms)")
+    start = time.perf_counter()
+    route = route_label(request.url.path)
+    in_flight = _in_flight[route]
+    in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        in_flight.dec()
+        elapsed = time.perf_counter() - start
+        requests_total, latency = metrics.request_metrics(request.method, route, status)
+        requests_total.inc()
+        latency.observe(elapsed)
+
+    # errors and slow requests are always logged; successful ones only at the sample rate
+    if status >= 400 or elapsed >= slow_request_s or random.random() < success_sample_rate:
+        log.info(
+            f"{request.method} {request.url.path} -> {status} ({elapsed * 1000:.1f} ms)",
+            extra={"fields": {
+                "method": request.method,
+                "path": request.url.path,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 3),
+                "sample_rate": 1.0 if status >= 400 or elapsed >= slow_request_s else success_sample_rate,
+            }},
+        )
     return response
 
 
+@app.on_event("startup")
+async def size_threadpool():
+    # every admitted request holds a threadpool thread, micro-batched /predict calls while they wait for
+    # their batch, so the pool must fit both caps or it, not admission, decides how big a batch gets
+    if admission is None:
+        return
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    needed = admission.max_concurrency + (batched_admission.max_concurrency if batched_admission else 0)
+    limiter.total_tokens = max(limiter.total_tokens, needed)
+
+
 @app.on_event("startup")
 def startup_event():
+    global ready
+    timings = {"import": time.perf_counter() - _import_started}
+    phase = time.perf_counter()
+
+    def lap(name):
+        nonlocal phase
+        now = time.perf_counter()
+        timings[name] = now - phase
+        phase = now
+
     try:
+        mem_before = process_memory()
+        model_service.set_stage_observer(metrics.observe_stage)
+        model_service.set_swap_observer(lambda model: metrics.LIVE_MODEL_LOADED.set_to_current_time())
         model_service.load()
+        lap("model_load")
         log.info("[bold green]✅ Model loaded[/bold green]")
-        log.info(f"Artifact: {model_service.artifact_path}")
+        log.info(f"Worker memory (mmap_mode={cfg['serving'].get('mmap_mode')}): {format_memory(mem_before, process_memory())}")
+        log.info(f"Artifact: {model_service.artifact_path} ({model_service.model_format}, {model_service.model_version})")
+        if model_service.fast_path_enabled:
+            log.info("Fast path: enabled (NumPy preprocess)")
+        elif model_service.fast_path_error:
+            log.info(f"Fast path: disabled ({model_service.fast_path_error})")
     except Exception as e:
         log.info(f"[bold red]❌ Failed to load model[/bold red] {e}")
         raise
 
+    if reload_cfg["enabled"]:
+        start_model_reloader()
+        lap("reloader")
+
+    if shadow_cfg["enabled"]:
+        start_shadow_scorer()
+        lap("shadow")
+
+    if rolling_cfg["enabled"]:
+        start_drift_monitor()
+        lap("drift")
+
+    if capture_cfg["enabled"]:
+        live_capture.start()
+        log.info(f"Live capture -> {live_capture.path}")
+        lap("capture")
+
+    # the worker answers /health/live (and /health) while the rest of startup runs in the background
+    stopping.clear()
+    threading.Thread(target=finish_startup, args=(timings,), name="warm-up", daemon=True).start()
+
+
+def finish_startup(timings: dict):
+    """Warm-up and pinned-version preloads; /health/ready turns 200 when they are done."""
+    global ready
+    phase = time.perf_counter()
+
+    def lap(name):
+        nonlocal phase
+        now = time.perf_counter()
+        timings[name] = now - phase
+        phase = now
+
+    if warmup_cfg["enabled"]:
+        try:
+            warm_up_model()
+        except Exception:
+            return  # logged by warm_up_model; the worker never reports ready
+        lap("warmup")
+
+    try:
+        pinned = model_service.preload_pinned()
+        if pinned:
+            log.info(f"Pinned model versions loaded: {', '.join(pinned)}")
+    except Exception as e:
+        log.info(f"[bold yellow]Pinned model versions not loaded[/bold yellow] {e}")
+    lap("pinned")
+
+    startup_timings.update({k: round(v * 1000, 1) for k, v in timings.items()})
+    startup_timings["total"] = round(sum(timings.values()) * 1000, 1)
+    log.info(
+        "Startup: " + ", ".join(f"{k} {v:.0f} ms" for k, v in startup_timings.items()),
+        extra={"fields": {"startup_ms": dict(startup_timings)}},
+    )
+    ready = not stopping.is_set()
+
+
+def warm_up_model():
+    X = canary_batch(cfg["monitoring"]["baseline_profile"], model_service.feature_columns)
+    X = np.resize(X, (max(1, int(warmup_cfg["rows"])), X.shape[1]))
+    try:
+        elapsed = model_service.warm_up(X, iterations=int(warmup_cfg["iterations"]))
+        log.info(f"Warm-up: {X.shape[0]} rows x {warmup_cfg['iterations']} in {elapsed * 1000:.1f} ms")
+    except Exception as e:
+        # a model that cannot score the canary rows keeps the worker out of rotation instead of failing requests
+        log.info(f"[bold red]❌ Warm-up failed[/bold red] {e}")
+        raise
+
+
+def start_model_reloader():
+    global model_reloader
+    model_reloader = ModelReloader(
+        model_service,
+        canary=canary_batch(cfg["monitoring"]["baseline_profile"], model_service.feature_columns),
+        source=str(reload_cfg["source"]),
+        interval_s=float(reload_cfg["interval_s"]),
+        alias=str(reload_cfg["alias"]),
+        registry=model_service.registry,
+        canary_max_abs_diff=reload_cfg.get("canary_max_abs_diff"),
+        log=log,
+    )
+    model_reloader.start()
+    log.info(f"Hot reload: {reload_cfg['source']} every {reload_cfg['interval_s']}s")
+
+
+def start_shadow_scorer():
+    global shadow_scorer
+    if not cfg["serving"]["model_cache"]["enabled"]:
+        log.info("[bold yellow]Shadow scoring disabled[/bold yellow] needs serving.model_cache.enabled")
+        return
+
+    shadow_scorer = ShadowScorer(
+        model_service,
+        version=str(shadow_cfg["version"]),
+        max_queue_size=int(shadow_cfg["max_queue_size"]),
+        batch_size=int(shadow_cfg["batch_size"]),
+        flush_interval_s=float(shadow_cfg["flush_interval_s"]),
+        sample_rate=float(shadow_cfg["sample_rate"]),
+        alert_abs_diff=shadow_cfg.get("alert_abs_diff"),
+    )
+    shadow_scorer.start()
+    log.info(f"Shadow scoring: {shadow_cfg['version']} (sample rate {shadow_cfg['sample_rate']})")
+
+
+def start_drift_monitor():
+    global drift_monitor
+    try:
+        profile = load_profile(cfg["monitoring"]["baseline_profile"])
+    except (FileNotFoundError, ValueError) as e:
+        log.info(f"[bold yellow]Rolling drift disabled[/bold yellow] {e}")
+        return
+
+    drift_cfg = cfg["monitoring"]["drift"]
+    drift_monitor = RollingDriftMonitor(
+        profile,
+        window_s=float(rolling_cfg["window_s"]),
+        n_buckets=int(rolling_cfg["n_buckets"]),
+        method=str(drift_cfg["method"]),
+        psi_threshold=float(drift_cfg["psi_threshold"]),
+        ks_threshold=float(drift_cfg["ks_threshold"]),
+        drift_threshold_share=float(cfg["monitoring"]["drift_threshold_share"]),
+        min_rows=int(rolling_cfg["min_rows"]),
+        flush_rows=int(rolling_cfg["flush_rows"]),
+        flush_interval_s=float(rolling_cfg["flush_interval_s"]),
+    )
+    if drift_monitor.features != model_service.feature_columns:
+        log.info(f"[bold yellow]Rolling drift disabled[/bold yellow] profile features {drift_monitor.features} "
+                 f"!= serving features {model_service.feature_columns}")
+        drift_monitor = None
+        return
+    # fed from the scoring path, so it sees every prediction whether or not capture is on or dropping
+    model_service.set_row_observer(drift_monitor.observe)
+    log.info(f"Rolling drift window: {rolling_cfg['window_s']}s")
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    global ready
+    stopping.set()
+    ready = False
+    if model_reloader is not None:
+        model_reloader.stop()
+    if shadow_scorer is not None:
+        shadow_scorer.close()
+    model_service.close()
+    live_capture.close()
+    request_profiler.close()
+
+
+@app.get("/health/live")
+def health_live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def health_ready(response: Response):
+    if not ready:
+        response.status_code = 503
+        return {"status": "starting"}
+    return {"status": "ok", "artifact": model_service.artifact_path, "startup_ms": startup_timings}
+
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "artifact": model_service.artifact_path}
+    # liveness plus a summary: the model is loaded before the worker serves at all, warm-up may still run
+    return {"status": "ok", "ready": ready, "artifact": model_service.artifact_path}
 
 
 @app.get("/version")
@@ -60,33 +398,359 @@ def version():
         "service": "house-price-api",
         "version": "1.0.0",
         "artifact": model_service.artifact_path,
+        "model_version": model_service.model_version,
+        "model_format": model_service.model_format,
     }
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(payload: HouseFeatures):
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+def require_admin(token: Optional[str]) -> None:
+    expected = os.environ.get(str(profiling_cfg["admin_token_env"]), "")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/profile", status_code=202, include_in_schema=False)
+def start_profile(
+    seconds: float = Query(10.0, gt=0),
+    x_admin_token: Optional[str] = Header(None),
+):
+    require_admin(x_admin_token)
     try:
-        pred = model_service.predict_one(payload.model_dump())
-         # --- store live request for drift monitoring ---
-        cfg = __import__("yaml").safe_load(open("configs/config.yaml", "r", encoding="utf-8"))
-        live_path = Path(cfg["monitoring"]["live_file"])
-        live_path.parent.mkdir(parents=True, exist_ok=True)
+        path = stack_sampler.start(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    log.info(f"Stack sampling for {seconds}s -> {path}")
+    return {"status": "started", "seconds": seconds, "pid": os.getpid(), "output": str(path)}
 
-        row = payload.model_dump()
-        df_row = pd.DataFrame([row])
 
-        if live_path.exists():
-            df_row.to_csv(live_path, mode="a", header=False, index=False)
-        else:
-            df_row.to_csv(live_path, index=False) 
+@app.get("/admin/profile", include_in_schema=False)
+def profile_status(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return {"pid": os.getpid(), "sampler": stack_sampler.stats(), "requests": request_profiler.stats()}
+
+
+@app.post("/admin/config/reload", include_in_schema=False)
+def config_reload(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    reload_config()
+    return {"status": "reloaded", "pid": os.getpid()}
+
+
+@app.get("/monitoring/batching")
+def batching_stats():
+    return model_service.batching_stats()
+
+
+@app.get("/monitoring/models")
+def model_cache_stats():
+    return {"live_version": model_service.model_version, **model_service.cache_stats()}
+
+
+@app.get("/monitoring/admission")
+def admission_stats():
+    if admission is None:
+        return {"enabled": False}
+    out = {"enabled": True, **admission.stats()}
+    if batched_admission is not None:
+        out["micro_batched"] = batched_admission.stats()
+    return out
+
+
+@app.get("/monitoring/shadow")
+def shadow_stats():
+    if shadow_scorer is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow_scorer.stats()}
+
+
+@app.get("/monitoring/reload")
+def reload_stats():
+    if model_reloader is None:
+        return {"enabled": False}
+    return {"enabled": True, **model_reloader.stats()}
+
+
+@app.get("/monitoring/cache")
+def prediction_cache_stats():
+    return model_service.prediction_cache_stats()
+
+
+@app.get("/monitoring/capture")
+def capture_stats():
+    return {"enabled": bool(capture_cfg["enabled"]), **live_capture.stats()}
+
+
+@app.get("/monitoring/memory")
+def memory_stats():
+    return process_memory()
+
+
+@app.get("/monitoring/drift")
+def rolling_drift():
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Rolling drift monitor is disabled")
+    return drift_monitor.snapshot()
+
+
+def store_live_rows(rows: list) -> None:
+    # --- store live requests for drift monitoring (buffered, written off the request path) ---
+    if capture_cfg["enabled"]:
+        live_capture.capture(rows)
+
+
+def store_live_matrix(X: np.ndarray) -> None:
+    # columnar requests: the matrix is queued as one block, no per-row dicts
+    if capture_cfg["enabled"]:
+        live_capture.capture_matrix(X)
+
+
+def shadow_score(rows: list, preds: list, model, version: Optional[str]) -> None:
+    # only default-routed traffic is mirrored; explicitly versioned requests are already a comparison
+    if shadow_scorer is not None and not version:
+        shadow_scorer.submit(rows, preds, model.version)
+
+
+def shadow_score_matrix(X: np.ndarray, preds: np.ndarray, model, version: Optional[str]) -> None:
+    if shadow_scorer is not None and not version:
+        shadow_scorer.submit_matrix(X, FEATURE_COLUMNS, preds, model.version)
+
+
+def model_label(model, version: Optional[str]) -> str:
+    # bounded metric label: "live", or the canonical registry label of a routed version ("3", "03" and "@prod" agree)
+    return model.version if version else "live"
+
+
+def requested_version(query: Optional[str], header: Optional[str]) -> Optional[str]:
+    # ?model_version= wins over the X-Model-Version header; empty means the live model
+    return (query or header or "").strip() or None
+
+
+@asynccontextmanager
+async def admitted(request: Request, controller: Optional[AdmissionController]):
+    """Hold a slot of `controller` for the block, or fail fast with 503 + Retry-After."""
+    if controller is None:
+        yield
+        return
+
+    try:
+        timeout_ms = float(request.headers["x-request-timeout-ms"])
+    except (KeyError, ValueError):
+        timeout_ms = None
+
+    metrics.ADMISSION_WAITING.inc()
+    try:
+        await controller.acquire(timeout_ms)
+    except Overloaded as e:
+        metrics.SHED.labels(reason=e.reason).inc()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server overloaded ({e.reason}), retry later",
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+    finally:
+        metrics.ADMISSION_WAITING.dec()
+
+    try:
+        yield
+    finally:
+        controller.release()
+
+
+def parse_body(body: bytes, schema, precheck: Optional[Callable[[Any], None]] = None):
+    """
+    json.loads + pydantic validation, timed as separate stages; errors become
+    the usual 422. CPU-bound (a 50k-record batch takes a few hundred ms), so
+    only call it from the threadpool, never on the event loop. `precheck`
+    sees the decoded JSON before any pydantic object is built.
+    """
+    with metrics.stage("parse"):
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise RequestValidationError(
+                [{"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error", "input": {}, "ctx": {"error": str(e)}}]
+            )
+    if precheck is not None:
+        precheck(data)
+    with metrics.stage("validate"):
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            )
+
+
+def score_one(body: bytes, version: Optional[str]) -> PredictResponse:
+    payload = parse_body(body, HouseFeatures)
+    try:
+        model = model_service.model_for(version)
+        row = payload.model_dump()
+        pred = model_service.predict_one(row, model=model)
+        with metrics.stage("capture"):
+            store_live_rows([row])
+            shadow_score([row], [pred], model, version)
+        metrics.PREDICTIONS.labels("/predict", model_label(model, version)).inc()
         return PredictResponse(
             prediction=pred,
-            model_artifact=model_service.artifact_path,
+            model_artifact=model.artifact_path,
+            model_version=model.version,
         )
+    except UnknownModelVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoading as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": model_loading_retry_after})
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
-    
-    
 
+
+@app.post(
+    "/predict",
+    response_model=PredictResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": inline_json_schema(HouseFeatures)}},
+        }
+    },
+)
+async def predict(
+    request: Request,
+    model_version: Optional[str] = Query(None, description="Registry version or alias; default: live model"),
+    x_model_version: Optional[str] = Header(None),
+):
+    version = requested_version(model_version, x_model_version)
+    async with admitted(request, admission if version or batched_admission is None else batched_admission):
+        body = await request.body()
+        return await run_in_threadpool(request_profiler.call, score_one, body, version)
+
+
+def check_request_rows(n_rows: int) -> None:
+    max_rows = int(cfg["serving"]["max_request_rows"])
+    if n_rows > max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many records: {n_rows} > {max_rows}. Split the request.",
+        )
+
+
+def check_batch_rows(data: Any) -> None:
+    # before validation: an oversized batch is refused without building its HouseFeatures
+    if isinstance(data, dict) and isinstance(data.get("records"), list):
+        check_request_rows(len(data["records"]))
+
+
+def score_json_batch(body: bytes, version: Optional[str]) -> BatchPredictResponse:
+    payload = parse_body(body, BatchPredictRequest, precheck=check_batch_rows)
+    try:
+        model = model_service.model_for(version)
+        rows = [r.model_dump() for r in payload.records]
+        preds = model_service.predict_batch(rows, model=model)
+        with metrics.stage("capture"):
+            store_live_rows(rows)
+            shadow_score(rows, preds, model, version)
+        metrics.PREDICTIONS.labels("/predict/batch", model_label(model, version)).inc(len(preds))
+        return BatchPredictResponse(
+            predictions=preds,
+            count=len(preds),
+            model_artifact=model.artifact_path,
+            model_version=model.version,
+        )
+    except UnknownModelVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoading as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": model_loading_retry_after})
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {e}")
+
+
+def score_binary_batch(body: bytes, content_type: str, accept: str, version: Optional[str]) -> Response:
+    try:
+        with metrics.stage("parse"):
+            X = decode_matrix(body, content_type, FEATURE_COLUMNS)
+    except ColumnarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if X.shape[0] == 0:
+        raise HTTPException(status_code=422, detail="Empty batch")
+    check_request_rows(X.shape[0])
+
+    with metrics.stage("validate"):
+        n_rejected, rejected = validate_matrix(X, FEATURE_COLUMNS, FEATURE_BOUNDS)
+    if n_rejected:
+        raise HTTPException(status_code=422, detail={
+            "message": f"{n_rejected} of {X.shape[0]} rows failed validation; nothing was scored",
+            "rejected_count": n_rejected,
+            "rejected": rejected,
+        })
+
+    try:
+        model = model_service.model_for(version)
+        preds = model_service.predict_matrix(X, model=model)
+        with metrics.stage("capture"):
+            store_live_matrix(X)
+            shadow_score_matrix(X, preds, model, version)
+        metrics.PREDICTIONS.labels("/predict/batch", model_label(model, version)).inc(len(preds))
+    except UnknownModelVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelLoading as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": model_loading_retry_after})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {e}")
+
+    # reply in the requested binary format, or mirror the request format
+    out_type = media_type(accept) if media_type(accept) in BINARY_TYPES else media_type(content_type)
+    headers = {"X-Model-Version": model.version, "X-Model-Artifact": model.artifact_path, "X-Row-Count": str(len(preds))}
+    body = encode_predictions(preds, out_type, metadata={"model_version": model.version, "units": "100k_dollars"})
+    return Response(content=body, media_type=out_type, headers=headers)
+
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": inline_json_schema(BatchPredictRequest)},
+                ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+                ARROW_FILE: {"schema": {"type": "string", "format": "binary"}},
+                NPY: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def predict_batch(
+    request: Request,
+    model_version: Optional[str] = Query(None, description="Registry version or alias; default: live model"),
+    x_model_version: Optional[str] = Header(None),
+):
+    """
+    JSON {"records": [...]} or a columnar body (Arrow IPC stream/file with one
+    column per feature, or an (n, 8) .npy array in schema order). Binary
+    requests are validated with vectorized bounds checks and answered in the
+    Accept-ed binary format (default: same as the request).
+    """
+    version = requested_version(model_version, x_model_version)
+    content_type = media_type(request.headers.get("content-type"))
+
+    async with admitted(request, admission):
+        body = await request.body()
+
+        if content_type in BINARY_TYPES:
+            return await run_in_threadpool(
+                score_binary_batch, body, content_type, request.headers.get("accept", ""), version
+            )
+
+        return await run_in_threadpool(score_json_batch, body, version)
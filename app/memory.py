@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+from typing import Dict
+
+
+_SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+    "Anonymous": "anonymous_mb",
+}
+
+
+def process_memory() -> Dict[str, float]:
+    """
+    Memory of the current process in MB.
+
+    On Linux this reads /proc/self/smaps_rollup, where PSS splits shared
+    pages (e.g. a memory-mapped model file used by every gunicorn worker)
+    between the processes mapping them. Elsewhere only peak RSS is available.
+    """
+    rollup = Path("/proc/self/smaps_rollup")
+    if rollup.exists():
+        out = {}
+        for line in rollup.read_text().splitlines():
+            key, _, rest = line.partition(":")
+            if key in _SMAPS_FIELDS:
+                out[_SMAPS_FIELDS[key]] = int(rest.split()[0]) / 1024.0
+        return out
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {}
+
+    # ru_maxrss is bytes on macOS, KB elsewhere
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"max_rss_mb": maxrss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)}
+
+
+def format_memory(before: Dict[str, float], after: Dict[str, float]) -> str:
+    parts = []
+    for key in ("rss_mb", "pss_mb", "private_dirty_mb", "max_rss_mb"):
+        if key in after:
+            delta = after[key] - before.get(key, 0.0)
+            parts.append(f"{key[:-3].upper()} {before.get(key, 0.0):.1f} -> {after[key]:.1f} MB ({delta:+.1f})")
+    return " | ".join(parts)
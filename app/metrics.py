@@ -0,0 +1,112 @@
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+
+# Prometheus metrics for the API.
+#
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) before the app is
+# imported: every worker then writes its samples to mmap'd files in that directory and
+# /metrics aggregates all workers, whichever one serves the scrape.
+
+# 100 us .. 10 s: stage timings of a single-row request start well below 1 ms
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGES = ("parse", "validate", "features", "predict", "batch_wait", "capture")
+
+REQUESTS = Counter(
+    "house_api_requests_total", "HTTP requests by route and status.",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "house_api_request_duration_seconds", "End-to-end request latency.",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "house_api_stage_duration_seconds",
+    "Latency of one processing stage: parse, validate, features (input matrix / frame), "
+    "predict (model call), batch_wait (time a row spends in the micro-batcher), capture.",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "house_api_in_flight_requests", "Requests currently being processed.",
+    ["route"], multiprocess_mode="livesum",
+)
+# model: "live" for default-routed requests, else the registry version asked for. The live
+# model's own version changes on every reload (local-<mtime>), which would leave a new series
+# behind in the multiprocess files each time; it is reported by /version instead.
+PREDICTIONS = Counter(
+    "house_api_predictions_total", "Rows scored, by route and model (live or registry version).",
+    ["route", "model"],
+)
+LIVE_MODEL_LOADED = Gauge(
+    "house_api_live_model_loaded_timestamp_seconds",
+    "Unix time the worker's live model was loaded or hot-swapped in (version: GET /version).",
+    multiprocess_mode="liveall",
+)
+
+ADMISSION_WAITING = Gauge(
+    "house_api_admission_waiting", "Requests waiting for an admission slot.",
+    multiprocess_mode="livesum",
+)
+SHED = Counter(
+    "house_api_shed_total", "Requests rejected with 503 by admission control.",
+    ["reason"],
+)
+
+# label lookups cost more than the observation itself: resolve the fixed stages once
+_STAGE = {s: STAGE_LATENCY.labels(stage=s) for s in STAGES}
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    _STAGE[stage].observe(seconds)
+
+
+class stage:
+    """`with stage("parse"): ...` observes the block's duration (a plain class: cheaper than @contextmanager)."""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, name: str):
+        self._child = _STAGE[name]
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+_request_children: dict = {}
+
+
+def request_metrics(method: str, route: str, status: int):
+    """(requests counter, latency histogram) children for one label set, cached."""
+    if method not in _METHODS:
+        method = "OTHER"
+    key = (method, route, status)
+    children = _request_children.get(key)
+    if children is None:
+        children = (REQUESTS.labels(method, route, str(status)), REQUEST_LATENCY.labels(route=route))
+        _request_children[key] = children
+    return children
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render() -> tuple:
+    """(body, content type) of the current metrics, aggregated over workers in multiprocess mode."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .service import LoadedModel
+
+
+class ModelLoading(Exception):
+    """A version is still being loaded after the caller's wait ran out; retry later."""
+
+    def __init__(self, version: str, waited_s: float):
+        super().__init__(f"Model version {version!r} is loading (waited {waited_s:.1f}s), retry later")
+        self.version = version
+
+
+class ModelCache:
+    """
+    Bounded in-process cache of loaded model versions.
+
+    Entries are kept in LRU order and evicted once there are more than
+    `max_models` of them or their combined `LoadedModel.nbytes` exceeds
+    `max_bytes`; pinned versions are never evicted.
+
+    A miss starts `loader(version)` on a loader thread, once per version:
+    concurrent misses for the same version wait on that one load. `get`
+    waits at most `load_timeout_s` (None: until done) and then raises
+    ModelLoading while the load carries on, so a slow registry download
+    never holds a request for longer than that; `load` always waits.
+    """
+
+    def __init__(self, loader: Callable[[str], "LoadedModel"], max_models: int = 3,
+                 max_bytes: Optional[int] = None, pinned: Iterable[str] = (),
+                 load_timeout_s: Optional[float] = None):
+        self._loader = loader
+        self._load_timeout_s = None if load_timeout_s is None else max(0.0, float(load_timeout_s))
+        self._max_models = max(1, int(max_models))
+        self._max_bytes = None if max_bytes is None else int(max_bytes)
+        self._pinned = {str(v) for v in pinned}
+
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._load_errors = 0
+        self._evictions = 0
+
+    def get(self, version: str) -> "LoadedModel":
+        """The cached model for `version`, waiting up to `load_timeout_s` for a load."""
+        return self._get(str(version), self._load_timeout_s)
+
+    def load(self, version: str) -> "LoadedModel":
+        """Like get, but waits for the load however long it takes (startup preloads)."""
+        return self._get(str(version), None)
+
+    def _get(self, version: str, timeout: Optional[float]) -> "LoadedModel":
+        with self._lock:
+            model = self._models.get(version)
+            if model is not None:
+                self._models.move_to_end(version)
+                self._hits += 1
+                return model
+            self._misses += 1
+            pending = self._loading.get(version)
+            if pending is None:
+                pending = Future()
+                self._loading[version] = pending
+                threading.Thread(target=self._load, args=(version, pending),
+                                 name=f"model-load-{version}", daemon=True).start()
+
+        try:
+            return pending.result(timeout=timeout)
+        except FutureTimeout:
+            raise ModelLoading(version, timeout) from None
+
+    def _load(self, version: str, pending: Future) -> None:
+        try:
+            model = self._loader(version)
+        except BaseException as e:
+            with self._lock:
+                self._load_errors += 1
+                del self._loading[version]
+            pending.set_exception(e)
+            return
+
+        with self._lock:
+            self._loads += 1
+            self._models[version] = model
+            del self._loading[version]
+            self._evict()
+        pending.set_result(model)
+
+    def _evict(self) -> None:
+        # called with the lock held; the newest entry always stays
+        def over_budget() -> bool:
+            if len(self._models) > self._max_models:
+                return True
+            return self._max_bytes is not None and self._total_bytes() > self._max_bytes
+
+        for version in list(self._models):
+            if not over_budget():
+                break
+            if version in self._pinned or version == next(reversed(self._models)):
+                continue
+            del self._models[version]
+            self._evictions += 1
+
+    def _total_bytes(self) -> int:
+        return sum(m.nbytes for m in self._models.values())
+
+    def pin(self, version: str) -> "LoadedModel":
+        self._pinned.add(str(version))
+        return self.load(version)
+
+    def versions(self):
+        with self._lock:
+            return list(self._models)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_models": self._max_models,
+                "max_bytes": self._max_bytes,
+                "pinned": sorted(self._pinned),
+                "hits": self._hits,
+                "misses": self._misses,
+                "loads": self._loads,
+                "load_errors": self._load_errors,
+                "loading": sorted(self._loading),
+                "evictions": self._evictions,
+                "bytes": self._total_bytes(),
+                "models": [
+                    {"version": v, "model_version": m.version, "format": m.model_format, "bytes": m.nbytes}
+                    for v, m in self._models.items()
+                ],
+            }
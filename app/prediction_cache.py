@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+_NAN = float("nan")
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of single-row predictions.
+
+    Keys are (model version, feature values in `feature_columns` order),
+    with values rounded to `decimals` places (None = exact match), so a hit
+    never crosses model versions. Entries older than `ttl_s` are treated as
+    misses; beyond `max_entries` the least recently used entry is evicted.
+    """
+
+    def __init__(self, feature_columns: List[str], max_entries: int = 100000,
+                 ttl_s: Optional[float] = 300.0, decimals: Optional[int] = 6):
+        self._columns = list(feature_columns)
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_s = None if ttl_s is None else float(ttl_s)
+        self._decimals = None if decimals is None else int(decimals)
+
+        self._entries: "OrderedDict[Tuple, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidations = 0
+
+    def key(self, version: str, features: dict) -> Tuple:
+        # missing values key as NaN (the pipeline imputes them); NaN != NaN, so such rows may just miss
+        raw = (float(features.get(c, _NAN)) for c in self._columns)
+        if self._decimals is None:
+            values = tuple(raw)
+        else:
+            values = tuple(round(v, self._decimals) for v in raw)
+        return (version,) + values
+
+    def get(self, key: Tuple) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, stored_at = entry
+            if self._ttl_s is not None and now - stored_at > self._ttl_s:
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Tuple, value: float) -> None:
+        with self._lock:
+            self._entries[key] = (float(value), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (called when the live model changes)."""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_s": self._ttl_s,
+                "decimals": self._decimals,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else None,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "invalidations": self._invalidations,
+            }
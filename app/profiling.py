@@ -0,0 +1,152 @@
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """
+    Statistical profiler for the whole process.
+
+    A background thread snapshots every thread's stack (sys._current_frames)
+    each `interval_ms` for `seconds`, then writes the counts as collapsed
+    stacks ("thread;outer;...;inner count" per line), the input format of
+    flamegraph.pl / speedscope. Only one run at a time per process.
+    """
+
+    def __init__(self, output_dir: str, interval_ms: float = 5.0, max_seconds: float = 120.0):
+        self._output_dir = Path(output_dir)
+        self._interval_s = max(0.001, float(interval_ms) / 1000.0)
+        self._max_seconds = float(max_seconds)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float) -> Path:
+        """Start a run in the background; returns the file it will write. Raises RuntimeError if busy."""
+        seconds = min(max(0.1, float(seconds)), self._max_seconds)
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profile is already running")
+            self._output_dir.mkdir(parents=True, exist_ok=True)
+            path = self._output_dir / f"sample-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.collapsed"
+            self._thread = threading.Thread(target=self._run, args=(seconds, path), name="stack-sampler", daemon=True)
+            self._thread.start()
+        return path
+
+    def _run(self, seconds: float, path: Path) -> None:
+        me = threading.get_ident()
+        names = {}
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for t in threading.enumerate():
+                names.setdefault(t.ident, t.name)
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}").replace(";", ","))
+                stacks[";".join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(self._interval_s)
+
+        tmp = path.with_name(f".{path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        tmp.replace(path)
+        self._last = {"path": str(path), "seconds": seconds, "samples": samples, "stacks": len(stacks)}
+
+    def stats(self) -> dict:
+        return {"running": self.running, "interval_ms": self._interval_s * 1000.0, "last": self._last}
+
+
+class RequestProfiler:
+    """
+    cProfile for a sampled fraction of requests. Profiles are merged and
+    written as one pstats file per process every `dump_every` sampled
+    requests (and on close). cProfile only sees the calling thread: time a
+    request spends waiting on the micro-batcher shows up as the wait, not
+    as the model code (use StackSampler for that).
+    """
+
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, dump_every: int = 100):
+        self._output_dir = Path(output_dir)
+        self._sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self._dump_every = max(1, int(dump_every))
+        self._lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+        self._pending = 0
+        self._profiled = 0
+        self._path: Optional[Path] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._sample_rate > 0.0
+
+    def call(self, fn: Callable, *args, **kwargs):
+        if self._sample_rate <= 0.0 or random.random() >= self._sample_rate:
+            return fn(*args, **kwargs)
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            self._add(prof)
+
+    def _add(self, prof: cProfile.Profile) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(prof)
+            else:
+                self._stats.add(prof)
+            self._profiled += 1
+            self._pending += 1
+            if self._pending >= self._dump_every:
+                self._dump()
+
+    def _dump(self) -> None:
+        # called with the lock held
+        if self._stats is None or self._pending == 0:
+            return
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        if self._path is None:
+            self._path = self._output_dir / f"requests-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.pstats"
+        tmp = self._path.with_name(f".{self._path.name}.tmp")
+        self._stats.dump_stats(str(tmp))
+        tmp.replace(self._path)
+        self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._dump()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sample_rate": self._sample_rate,
+                "profiled_requests": self._profiled,
+                "path": str(self._path) if self._path else None,
+            }
@@ -0,0 +1,105 @@
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class UnknownModelVersion(LookupError):
+    pass
+
+
+_VERSION_RE = re.compile(r"^\d+$")
+_ALIAS_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_-]*$")
+_LATEST = "latest"  # reserved by MLflow, never a real alias
+
+
+class ModelRegistry:
+    """
+    Thin wrapper over the MLflow model registry for one registered model.
+
+    References are either a registry version ("3") or an alias ("prod",
+    "challenger"); aliases are resolved to versions and remembered for
+    `alias_ttl_s` so request routing doesn't hit the tracking store every
+    call. mlflow is imported lazily, only when the registry is used.
+    """
+
+    def __init__(self, name: str, tracking_uri: Optional[str] = None, alias_ttl_s: float = 30.0):
+        self.name = name
+        self._tracking_uri = tracking_uri
+        self._alias_ttl_s = float(alias_ttl_s)
+        self._aliases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            import mlflow
+            from mlflow.tracking import MlflowClient
+
+            if self._tracking_uri:
+                mlflow.set_tracking_uri(self._tracking_uri)
+            self._client = MlflowClient()
+        return self._client
+
+    def label(self, version: str) -> str:
+        """Version string reported by the service for a registry version."""
+        return f"{self.name}/{version}"
+
+    def uri(self, version: str) -> str:
+        return f"models:/{self.name}/{version}"
+
+    def alias_version(self, alias: str, max_age_s: Optional[float] = None) -> str:
+        max_age_s = self._alias_ttl_s if max_age_s is None else max_age_s
+        now = time.monotonic()
+        with self._lock:
+            hit = self._aliases.get(alias)
+        if hit is not None and now - hit[1] <= max_age_s:
+            return hit[0]
+
+        client = self.client()
+        try:
+            version = str(client.get_model_version_by_alias(self.name, alias).version)
+        except Exception as e:
+            raise UnknownModelVersion(f"Unknown alias {alias!r} for {self.name}: {e}") from e
+        with self._lock:
+            self._aliases[alias] = (version, now)
+        return version
+
+    def latest_version(self, max_age_s: Optional[float] = None) -> str:
+        """Highest registered version, whether or not an alias points at it."""
+        max_age_s = self._alias_ttl_s if max_age_s is None else max_age_s
+        now = time.monotonic()
+        with self._lock:
+            hit = self._aliases.get(_LATEST)
+        if hit is not None and now - hit[1] <= max_age_s:
+            return hit[0]
+
+        client = self.client()
+        versions = client.search_model_versions(f"name='{self.name}'")
+        if not versions:
+            raise UnknownModelVersion(f"No registered versions for {self.name}")
+        version = str(max(int(v.version) for v in versions))
+        with self._lock:
+            self._aliases[_LATEST] = (version, now)
+        return version
+
+    def resolve(self, ref: str) -> str:
+        """Registry version for a version number, an alias or "latest"."""
+        ref = str(ref).strip().lstrip("@")
+        if _VERSION_RE.match(ref):
+            return str(int(ref))
+        if ref == _LATEST:
+            return self.latest_version()
+        if _ALIAS_RE.match(ref):
+            return self.alias_version(ref)
+        raise UnknownModelVersion(f"Invalid model version {ref!r}: expected a version number or alias")
+
+    def load_pipe(self, version: str):
+        import mlflow.sklearn
+
+        client = self.client()
+        try:
+            client.get_model_version(self.name, version)
+        except Exception as e:
+            raise UnknownModelVersion(f"Unknown version {version!r} for {self.name}: {e}") from e
+        return mlflow.sklearn.load_model(self.uri(version))
@@ -0,0 +1,179 @@
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.drift_profile import load_profile
+
+from .registry import ModelRegistry
+from .service import LoadedModel, ModelService
+
+
+def canary_batch(profile_path: str, feature_columns: list) -> np.ndarray:
+    """
+    Small fixed batch for checking a candidate model: one row per baseline
+    quantile level plus the baseline means. Falls back to a single all-NaN
+    row (imputed by the pipeline) when the profile is missing.
+    """
+    try:
+        profile = load_profile(profile_path)
+    except (FileNotFoundError, ValueError):
+        return np.full((1, len(feature_columns)), np.nan)
+
+    feats = profile["features"]
+    levels = sorted(feats[feature_columns[0]]["quantiles"], key=float)
+    rows = [[feats[c]["quantiles"][q] for c in feature_columns] for q in levels]
+    rows.append([feats[c]["mean"] for c in feature_columns])
+    return np.asarray(rows, dtype=np.float64)
+
+
+class ModelReloader:
+    """
+    Background watcher that hot-swaps the model served by a ModelService.
+
+    source="mtime" polls the resolved local artifact (path, mtime, size);
+    source="mlflow" polls the version behind a registry alias. A changed
+    candidate is loaded and warmed up on this thread, checked on the canary
+    batch (finite outputs, optional max abs diff against the live model),
+    and only then swapped in. Failed candidates are counted and skipped
+    until the source changes again; the live model keeps serving.
+    """
+
+    def __init__(self, service: ModelService, canary: np.ndarray, source: str = "mtime",
+                 interval_s: float = 30.0, alias: str = "prod", registry: Optional[ModelRegistry] = None,
+                 canary_max_abs_diff: Optional[float] = None, log=None):
+        if source not in ("mtime", "mlflow"):
+            raise ValueError(f"Unknown hot reload source: {source!r} (expected mtime|mlflow)")
+        if source == "mlflow" and registry is None:
+            raise ValueError("Hot reload from mlflow needs a ModelRegistry")
+
+        self._service = service
+        self._canary = canary
+        self._source = source
+        self._interval_s = max(0.1, float(interval_s))
+        self._alias = alias
+        self._registry = registry
+        self._max_abs_diff = None if canary_max_abs_diff is None else float(canary_max_abs_diff)
+        self._log = log
+
+        self._seen: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # one check at a time (poll thread vs manual trigger)
+
+        self._checks = 0
+        self._reloads = 0
+        self._rejected = 0
+        self._last_error: Optional[str] = None
+        self._last_reload_at: Optional[float] = None
+        self._last_load_ms: Optional[float] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self._source == "mtime":
+            # the artifact loaded at startup is the baseline; only later changes trigger a swap
+            self._seen = self._mtime_signature()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_s):
+            try:
+                self.check_once()
+            except Exception as e:  # never let the watcher die
+                self._last_error = str(e)
+
+    def _mtime_signature(self) -> Optional[str]:
+        path = self._service.resolve_artifact()
+        if not path.exists():
+            return None
+        st = path.stat()
+        return f"{path}:{st.st_mtime_ns}:{st.st_size}"
+
+    def _signature(self) -> Optional[str]:
+        if self._source == "mtime":
+            return self._mtime_signature()
+        return self._registry.alias_version(self._alias, max_age_s=0.0)
+
+    def _load_candidate(self, signature: str) -> LoadedModel:
+        if self._source == "mtime":
+            path = Path(signature.rsplit(":", 2)[0])
+            return self._service.build_model(path)
+
+        pipe = self._registry.load_pipe(signature)
+        return self._service.build_model(self._registry.uri(signature),
+                                         version=self._registry.label(signature), pipe=pipe)
+
+    def _validate(self, candidate: LoadedModel) -> None:
+        # the first calls also warm up the candidate (page faults on mapped arrays, lazy imports)
+        for _ in range(2):
+            preds = np.asarray(candidate.predict_matrix(self._canary), dtype=np.float64)
+        if preds.shape != (self._canary.shape[0],):
+            raise ValueError(f"Canary output shape {preds.shape} != ({self._canary.shape[0]},)")
+        if not np.isfinite(preds).all():
+            raise ValueError("Canary predictions contain NaN/inf")
+
+        live = self._service.current
+        if self._max_abs_diff is not None and live is not None:
+            diff = float(np.max(np.abs(preds - live.predict_matrix(self._canary))))
+            if diff > self._max_abs_diff:
+                raise ValueError(f"Canary max abs diff {diff:.3g} > {self._max_abs_diff:.3g}")
+
+    def check_once(self) -> bool:
+        """Poll the source once; returns True when a new model was swapped in."""
+        with self._lock:
+            self._checks += 1
+            signature = self._signature()
+            if signature is None or signature == self._seen:
+                return False
+            # remember failures too: a bad candidate is retried only once the source changes again
+            self._seen = signature
+
+            start = time.perf_counter()
+            try:
+                candidate = self._load_candidate(signature)
+                self._validate(candidate)
+            except Exception as e:
+                self._rejected += 1
+                self._last_error = f"{signature}: {e}"
+                if self._log is not None:
+                    self._log.info(f"[bold yellow]Model reload rejected[/bold yellow] {self._last_error}")
+                return False
+
+            previous = self._service.swap(candidate)
+            self._reloads += 1
+            self._last_error = None
+            self._last_reload_at = time.time()
+            self._last_load_ms = (time.perf_counter() - start) * 1000.0
+            if self._log is not None:
+                old = previous.version if previous is not None else "-"
+                self._log.info(
+                    f"[bold green]✅ Model reloaded[/bold green] {old} -> {candidate.version} "
+                    f"({candidate.model_format}, {self._last_load_ms:.0f} ms)"
+                )
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "source": self._source,
+            "interval_s": self._interval_s,
+            "running": self._thread is not None,
+            "checks": self._checks,
+            "reloads": self._reloads,
+            "rejected": self._rejected,
+            "last_error": self._last_error,
+            "last_reload_at": self._last_reload_at,
+            "last_load_ms": self._last_load_ms,
+            "live_version": self._service.model_version,
+        }
@@ -1,3 +1,5 @@
+from typing import List, Type
+
 from pydantic import BaseModel, Field
 
 
@@ -16,3 +18,34 @@ class PredictResponse(BaseModel):
     prediction: float
     units: str = "100k_dollars"
     model_artifact: str
+    model_version: str = ""
+
+
+class BatchPredictRequest(BaseModel):
+    records: List[HouseFeatures] = Field(..., min_length=1)
+
+
+class BatchPredictResponse(BaseModel):
+    predictions: List[float]
+    count: int
+    units: str = "100k_dollars"
+    model_artifact: str
+    model_version: str = ""
+
+
+def inline_json_schema(model: Type[BaseModel]) -> dict:
+    """JSON schema of `model` with $defs references inlined (for hand-declared OpenAPI bodies)."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return resolve(defs[ref.split("/")[-1]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(schema)
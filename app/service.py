@@ -1,41 +1,608 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from pathlib import Path
-import joblib
-import pandas as pd
+from typing import Any, Callable, Dict, List, Optional
+import queue
+import threading
+import time
+import numpy as np
 
-from src.config import load_settings, load_yaml
+from src.config import load_settings, get_config
+from src.compiled_model import CompiledModel, load_compiled
+from .fast_path import FastPathPredictor, build_fast_path
+from .model_cache import ModelCache
+from .prediction_cache import PredictionCache
+from .registry import ModelRegistry, UnknownModelVersion
+
+
+_STOP = object()
+
+# upper bounds of the histogram buckets reported by MicroBatcher.stats()
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+_WAIT_MS_BUCKETS = (0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0)
+
+
+def _estimate_nbytes(obj, seen=None) -> int:
+    """Rough in-memory size of a fitted estimator: the NumPy arrays it references."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(_estimate_nbytes(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_estimate_nbytes(v, seen) for v in obj)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return _estimate_nbytes(vars(obj), seen)
+    return 0
+
+
+def _bucket_label(value: float, bounds) -> str:
+    for b in bounds:
+        if value <= b:
+            return f"le_{b}"
+    return "le_inf"
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+
+    Callers block in `submit` while a background thread collects queued rows
+    for at most `max_wait_ms` (measured from the oldest queued row) or until
+    `max_batch_size` rows are waiting, then scores them with
+    `predict_fn(rows, model)`, one call per distinct `model` the rows were
+    submitted with. A caller waits at most `result_timeout_s`; rows still
+    queued when the batcher stops fail with RuntimeError.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[dict], Any], List[float]],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 observe: Optional[Callable[[str, float], None]] = None,
+                 result_timeout_s: float = 30.0):
+        self._predict_fn = predict_fn
+        self._observe = observe
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self._result_timeout_s = max(0.001, float(result_timeout_s))
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # submit vs stop: nothing is queued behind the stop sentinel
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._batch_size_hist: Dict[str, int] = {}
+        self._wait_hist: Dict[str, int] = {}
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout=timeout)
+
+        # rows the thread did not get to (it timed out mid-batch) fail instead of waiting forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Micro-batcher stopped"))
+
+    def submit(self, features: dict, model: Any = None) -> float:
+        fut: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                raise RuntimeError("Micro-batcher not running")
+            self._queue.put((features, fut, time.perf_counter(), model))
+        try:
+            return fut.result(timeout=self._result_timeout_s)
+        except FutureTimeout:
+            fut.cancel()  # still queued: the batcher skips it
+            raise TimeoutError(f"Micro-batched prediction timed out after {self._result_timeout_s:.1f}s") from None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "batches": self._batches,
+                "rows": self._rows,
+                "avg_batch_size": (self._rows / self._batches) if self._batches else 0.0,
+                "max_batch_size_seen": self._largest_batch,
+                "avg_queue_wait_ms": (self._wait_total_s / self._rows * 1000) if self._rows else 0.0,
+                "max_queue_wait_ms": self._wait_max_s * 1000,
+                "batch_size_hist": dict(self._batch_size_hist),
+                "queue_wait_ms_hist": dict(self._wait_hist),
+                "queue_depth": self._queue.qsize(),
+            }
+
+    def _collect(self, first) -> tuple:
+        batch = [first]
+        deadline = first[2] + self._max_wait_s
+        stop = False
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch: list):
+        # callers that timed out cancelled their future; don't score their rows
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        # a hot swap between two submits leaves rows for both models in one batch
+        groups: Dict[int, list] = {}
+        for item in batch:
+            groups.setdefault(id(item[3]), []).append(item)
+        for group in groups.values():
+            try:
+                preds = self._predict_fn([features for features, _, _, _ in group], group[0][3])
+            except Exception as e:
+                for _, fut, _, _ in group:
+                    fut.set_exception(e)
+                continue
+            for (_, fut, _, _), pred in zip(group, preds):
+                fut.set_result(pred)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            label = _bucket_label(len(batch), _BATCH_SIZE_BUCKETS)
+            self._batch_size_hist[label] = self._batch_size_hist.get(label, 0) + 1
+            for _, _, enqueued, _ in batch:
+                wait = started - enqueued
+                if self._observe is not None:
+                    self._observe("batch_wait", wait)
+                self._wait_total_s += wait
+                self._wait_max_s = max(self._wait_max_s, wait)
+                label = _bucket_label(wait * 1000, _WAIT_MS_BUCKETS)
+                self._wait_hist[label] = self._wait_hist.get(label, 0) + 1
+
+
+class LoadedModel:
+    """
+    One loaded model version and its scorer. Never mutated after construction:
+    ModelService swaps whole LoadedModel objects, so a request that grabbed a
+    reference keeps scoring with a consistent model during a reload.
+    """
+
+    def __init__(self, artifact_path: str, version: str, feature_columns: List[str],
+                 pipe=None, compiled: Optional[CompiledModel] = None,
+                 fast_path_dtype: Optional[str] = None):
+        if pipe is None and compiled is None:
+            raise ValueError("LoadedModel needs a pipeline or a compiled model")
+
+        self.artifact_path = artifact_path
+        self.version = version
+        self.feature_columns = list(feature_columns)
+        self.pipe = pipe
+        self.compiled = compiled
+        self.fast: Optional[FastPathPredictor] = None
+        self.fast_path_error: Optional[str] = None
+        self._nbytes: Optional[int] = None
+
+        if compiled is not None and compiled.feature_columns != self.feature_columns:
+            raise ValueError(
+                f"Compiled model columns {compiled.feature_columns} != serving columns {self.feature_columns}"
+            )
+        if pipe is not None and fast_path_dtype:
+            try:
+                self.fast = build_fast_path(pipe, self.feature_columns, dtype=np.dtype(fast_path_dtype))
+            except Exception as e:  # unsupported steps or mismatch -> keep the pandas path
+                self.fast_path_error = str(e)
+
+    @property
+    def model_format(self) -> str:
+        return "compiled" if self.compiled is not None else "joblib"
+
+    @property
+    def nbytes(self) -> int:
+        if self.compiled is not None:
+            return self.compiled.nbytes
+        if self._nbytes is None:
+            self._nbytes = _estimate_nbytes(self.pipe)
+        return self._nbytes
+
+    def matrix(self, records: List[dict]) -> np.ndarray:
+        cols = self.feature_columns
+        return np.array([[r.get(c, np.nan) for c in cols] for r in records], dtype=np.float64)
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """X: (n_rows, n_features) float matrix in `feature_columns` order."""
+        scorer = self.compiled if self.compiled is not None else self.fast
+        if scorer is not None:
+            return scorer.predict(X)
+
+        import pandas as pd
+
+        return self.pipe.predict(pd.DataFrame(X, columns=self.feature_columns))
 
 
 class ModelService:
     def __init__(self):
-        self._pipe = None
-        self._artifact_path = None
+        self._model: Optional[LoadedModel] = None
+        self._feature_columns: List[str] = []
+        self._max_batch_size = 1000
+        self._batcher: Optional[MicroBatcher] = None
+        self._registry: Optional[ModelRegistry] = None
+        self._cache: Optional[ModelCache] = None
+        self._pred_cache: Optional[PredictionCache] = None
+        self._stage_observer: Optional[Callable[[str, float], None]] = None
+        self._row_observer: Optional[Callable[[object], None]] = None
+        self._swap_observer: Optional[Callable[[LoadedModel], None]] = None
+
+    @staticmethod
+    def _resolve_artifact(cfg: dict, models_dir: Path) -> Path:
+        """
+        serving.model_format: "joblib", "compiled", or "auto" (the compiled
+        artifact when it exists and is not older than the joblib one).
+        """
+        joblib_path = models_dir / cfg["training"]["save_model_as"]
+        compiled_path = models_dir / cfg["training"]["compile"]["save_as"]
+        fmt = cfg["serving"].get("model_format", "joblib")
+
+        if fmt == "compiled":
+            return compiled_path
+        if fmt == "auto" and compiled_path.exists():
+            if not joblib_path.exists() or compiled_path.stat().st_mtime >= joblib_path.stat().st_mtime:
+                return compiled_path
+        return joblib_path
+
+    def resolve_artifact(self) -> Path:
+        settings = load_settings()
+        cfg = settings.cfg
+        return self._resolve_artifact(cfg, Path(settings.models_dir))
+
+    def build_model(self, model_path: Path, version: Optional[str] = None, pipe=None) -> LoadedModel:
+        """
+        Load an artifact (or wrap an already loaded pipeline) without touching
+        the live model. Used at startup and by the hot reloader.
+        """
+        cfg = get_config()
+        model_path = Path(model_path)
+        fp_cfg = cfg["serving"].get("fast_path", {})
+        fast_path_dtype = fp_cfg["dtype"] if fp_cfg.get("enabled", False) else None
+        if version is None:
+            version = f"local-{model_path.stat().st_mtime_ns}"
+
+        if pipe is not None:
+            return LoadedModel(str(model_path), version, self._feature_columns,
+                               pipe=pipe, fast_path_dtype=fast_path_dtype)
+
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Model artifact not found at {model_path}. Run: python -m src.train"
+            )
+
+        # Both formats are laid out for mmap (uncompressed .npz members, uncompressed
+        # joblib arrays), so with mmap_mode="r" every worker maps the same page-cache
+        # pages instead of holding its own copy of the model arrays.
+        mmap_mode = cfg["serving"].get("mmap_mode")
+
+        if model_path.suffix == ".npz":
+            compiled = load_compiled(model_path, mmap=mmap_mode is not None)
+            return LoadedModel(str(model_path), version, self._feature_columns, compiled=compiled)
+
+        import joblib
+
+        pipe = joblib.load(model_path, mmap_mode=mmap_mode)
+        return LoadedModel(str(model_path), version, self._feature_columns,
+                           pipe=pipe, fast_path_dtype=fast_path_dtype)
 
     def load(self):
         settings = load_settings()
-        cfg = load_yaml("configs/config.yaml")
+        cfg = settings.cfg
 
-        artifact = cfg["training"]["save_model_as"]
-        model_path = Path(settings.models_dir) / artifact
+        self._feature_columns = list(settings.feature_columns)
+        self._max_batch_size = max(1, int(cfg["serving"]["max_batch_size"]))
 
+        model_path = self._resolve_artifact(cfg, Path(settings.models_dir))
         if not model_path.exists():
             raise FileNotFoundError(
                 f"Model artifact not found at {model_path}. Run: python -m src.train"
             )
+        self._model = self.build_model(model_path)
+        self._notify_swap(self._model)
+
+        cache_cfg = cfg["serving"]["model_cache"]
+        self._registry = ModelRegistry(
+            cfg["mlflow"]["registered_model_name"],
+            tracking_uri=cfg["mlflow"]["tracking_uri"],
+            alias_ttl_s=float(cache_cfg["alias_ttl_s"]),
+        )
+        self._cache = None
+        if cache_cfg["enabled"]:
+            max_mb = cache_cfg.get("max_memory_mb")
+            self._cache = ModelCache(
+                self._load_registry_version,
+                max_models=int(cache_cfg["max_models"]),
+                max_bytes=None if max_mb is None else int(float(max_mb) * 1024 * 1024),
+                pinned=[str(v) for v in cache_cfg.get("pinned") or []],
+                load_timeout_s=cache_cfg.get("load_timeout_s"),
+            )
+
+        pc_cfg = cfg["serving"]["prediction_cache"]
+        self._pred_cache = None
+        if pc_cfg["enabled"]:
+            self._pred_cache = PredictionCache(
+                self._feature_columns,
+                max_entries=int(pc_cfg["max_entries"]),
+                ttl_s=pc_cfg.get("ttl_s"),
+                decimals=pc_cfg.get("decimals"),
+            )
+
+        self.close()
+        mb_cfg = cfg["serving"].get("micro_batching", {})
+        if mb_cfg.get("enabled", False):
+            self._batcher = MicroBatcher(
+                self._score_records,
+                max_batch_size=int(mb_cfg["max_batch_size"]),
+                max_wait_ms=float(mb_cfg["max_wait_ms"]),
+                observe=self._observe_stage,
+                result_timeout_s=float(mb_cfg.get("result_timeout_s", 30.0)),
+            )
+            self._batcher.start()
+
+    def _load_registry_version(self, version: str) -> LoadedModel:
+        pipe = self._registry.load_pipe(version)
+        return self.build_model(self._registry.uri(version), version=self._registry.label(version), pipe=pipe)
+
+    def preload_pinned(self) -> List[str]:
+        """Load the pinned registry versions into the cache, concurrently; returns the ones loaded."""
+        if self._cache is None:
+            return []
+        pinned = self._cache.stats()["pinned"]
+        if not pinned:
+            return []
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(pinned)) as pool:
+            list(pool.map(self._cache.load, pinned))
+        return pinned
+
+    def model_for(self, version: Optional[str] = None) -> LoadedModel:
+        """
+        The live model when `version` is empty, otherwise the registry version
+        (number or alias) it names, served from the version cache.
+        """
+        if not version:
+            return self._live_model()
+        if self._cache is None:
+            raise UnknownModelVersion("Model version routing is disabled (serving.model_cache.enabled)")
+
+        resolved = self._registry.resolve(version)
+        live = self._model
+        if live is not None and live.version == self._registry.label(resolved):
+            return live
+        return self._cache.get(resolved)
 
-        self._pipe = joblib.load(model_path)
-        self._artifact_path = str(model_path)
+    def warm_up(self, X: np.ndarray, iterations: int = 1) -> float:
+        """
+        Score `X` (and its first row alone) on the live model `iterations`
+        times, bypassing the caches and stage metrics, so lazy imports, page
+        faults on mapped arrays and first-call allocations happen before
+        traffic does. Returns the seconds spent.
+        """
+        model = self._live_model()
+        start = time.perf_counter()
+        records = [dict(zip(model.feature_columns, row)) for row in X[:1].tolist()]
+        for _ in range(max(1, int(iterations))):
+            model.predict_matrix(X)
+            model.predict_matrix(model.matrix(records))
+        return time.perf_counter() - start
+
+    def set_stage_observer(self, fn: Optional[Callable[[str, float], None]]) -> None:
+        """`fn(stage, seconds)` receives "features", "predict" and "batch_wait" timings."""
+        self._stage_observer = fn
+
+    def _observe_stage(self, stage: str, seconds: float) -> None:
+        fn = self._stage_observer
+        if fn is not None:
+            fn(stage, seconds)
+
+    def set_row_observer(self, fn: Optional[Callable[[object], None]]) -> None:
+        """
+        `fn(rows)` receives the input of every prediction, cache hits included:
+        a list of feature dicts or a matrix in `feature_columns` order. It runs
+        on the request thread, so it must only buffer.
+        """
+        self._row_observer = fn
+
+    def _observe_rows(self, rows) -> None:
+        fn = self._row_observer
+        if fn is not None:
+            fn(rows)
+
+    def swap(self, model: LoadedModel) -> LoadedModel:
+        """Atomically replace the live model; returns the previous one."""
+        previous, self._model = self._model, model
+        if self._pred_cache is not None:
+            self._pred_cache.clear()
+        self._notify_swap(model)
+        return previous
+
+    def set_swap_observer(self, fn: Optional[Callable[[LoadedModel], None]]) -> None:
+        """`fn(model)` is called whenever a model becomes the live one (load and hot swap)."""
+        self._swap_observer = fn
+
+    def _notify_swap(self, model: LoadedModel) -> None:
+        fn = self._swap_observer
+        if fn is not None:
+            fn(model)
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.stop()
+            self._batcher = None
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        return self._model
+
+    @property
+    def registry(self) -> Optional[ModelRegistry]:
+        return self._registry
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return list(self._feature_columns)
 
     @property
     def artifact_path(self) -> str:
-        return self._artifact_path or ""
+        return self._model.artifact_path if self._model is not None else ""
+
+    @property
+    def model_version(self) -> str:
+        return self._model.version if self._model is not None else ""
+
+    @property
+    def model_format(self) -> str:
+        return self._model.model_format if self._model is not None else ""
+
+    @property
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    @property
+    def fast_path_enabled(self) -> bool:
+        return self._model is not None and self._model.fast is not None
+
+    @property
+    def fast_path_error(self) -> Optional[str]:
+        return self._model.fast_path_error if self._model is not None else None
 
-    def predict_one(self, features: dict) -> float:
-        if self._pipe is None:
+    def cache_stats(self) -> dict:
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
+
+    def prediction_cache_stats(self) -> dict:
+        if self._pred_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._pred_cache.stats()}
+
+    def batching_stats(self) -> dict:
+        if self._batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._batcher.stats()}
+
+    def _live_model(self) -> LoadedModel:
+        model = self._model
+        if model is None:
             raise RuntimeError("Model not loaded")
+        return model
+
+    def predict_one(self, features: dict, version: Optional[str] = None,
+                    model: Optional[LoadedModel] = None) -> float:
+        """
+        Score one row. Pass the `model` already resolved for the request so the
+        prediction and the version reported for it come from the same model.
+        """
+        model = model if model is not None else self.model_for(version)
+        self._observe_rows([features])
+
+        cache_key = None
+        if self._pred_cache is not None:
+            cache_key = self._pred_cache.key(model.version, features)
+            cached = self._pred_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        pred = self._predict_one(model, features, version)
+        if cache_key is not None:
+            self._pred_cache.put(cache_key, pred)
+        return pred
+
+    def _predict_one(self, model: LoadedModel, features: dict, version: Optional[str]) -> float:
+        if self._batcher is not None and not version:
+            return self._batcher.submit(features, model)
+
+        t0 = time.perf_counter()
+        if model.compiled is None and model.fast is None:
+            import pandas as pd
+
+            X = pd.DataFrame([features])
+            t1 = time.perf_counter()
+            pred = float(model.pipe.predict(X)[0])
+        else:
+            X = model.matrix([features])
+            t1 = time.perf_counter()
+            pred = float(model.predict_matrix(X)[0])
+        self._observe_stage("features", t1 - t0)
+        self._observe_stage("predict", time.perf_counter() - t1)
+        return pred
+
+    def predict_batch(self, records: List[dict], version: Optional[str] = None,
+                      model: Optional[LoadedModel] = None) -> List[float]:
+        """
+        Score many records with one vectorized predict per sub-batch.
+        Predictions are returned in the same order as `records`.
+        """
+        model = model if model is not None else self.model_for(version)
+        if not records:
+            return []
+        t0 = time.perf_counter()
+        X = model.matrix(records)
+        self._observe_stage("features", time.perf_counter() - t0)
+        self._observe_rows(X)
+        return self._predict_matrix(model, X).tolist()
+
+    def _score_records(self, records: List[dict], model: Optional[LoadedModel]) -> List[float]:
+        # micro-batched predict_one rows: already observed one by one
+        model = model if model is not None else self._live_model()
+        t0 = time.perf_counter()
+        X = model.matrix(records)
+        self._observe_stage("features", time.perf_counter() - t0)
+        return self._predict_matrix(model, X).tolist()
+
+    def predict_matrix(self, X: np.ndarray, version: Optional[str] = None,
+                       model: Optional[LoadedModel] = None) -> np.ndarray:
+        """Like predict_batch for an (n_rows, n_features) matrix in `feature_columns` order."""
+        model = model if model is not None else self.model_for(version)
+        self._observe_rows(X)
+        return self._predict_matrix(model, X)
 
-        X = pd.DataFrame([features])
-        pred = self._pipe.predict(X)[0]
-        return float(pred)
+    def _predict_matrix(self, model: LoadedModel, X: np.ndarray) -> np.ndarray:
+        t0 = time.perf_counter()
+        out = np.empty(X.shape[0], dtype=np.float64)
+        step = self._max_batch_size
+        for start in range(0, X.shape[0], step):
+            out[start:start + step] = model.predict_matrix(X[start:start + step])
+        self._observe_stage("predict", time.perf_counter() - t0)
+        return out
 
 
 model_service = ModelService()
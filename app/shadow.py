@@ -0,0 +1,206 @@
+import queue
+import random
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+_STOP = object()
+
+
+class _DiffStats:
+    """Running primary-vs-shadow statistics for one (primary, shadow) version pair."""
+
+    def __init__(self, primary_version: str, shadow_version: str):
+        self.primary_version = primary_version
+        self.shadow_version = shadow_version
+        self.n = 0
+        self.sum_diff = 0.0
+        self.sum_abs = 0.0
+        self.sum_sq = 0.0
+        self.max_abs = 0.0
+        self.sum_primary = 0.0
+        self.sum_shadow = 0.0
+        self.over_threshold = 0
+
+    def update(self, primary: np.ndarray, shadow: np.ndarray, alert_abs_diff: Optional[float]):
+        diff = shadow - primary
+        abs_diff = np.abs(diff)
+        self.n += int(diff.size)
+        self.sum_diff += float(diff.sum())
+        self.sum_abs += float(abs_diff.sum())
+        self.sum_sq += float(np.square(diff).sum())
+        self.max_abs = max(self.max_abs, float(abs_diff.max()))
+        self.sum_primary += float(primary.sum())
+        self.sum_shadow += float(shadow.sum())
+        if alert_abs_diff is not None:
+            self.over_threshold += int((abs_diff > alert_abs_diff).sum())
+
+    def to_dict(self) -> dict:
+        n = max(self.n, 1)
+        return {
+            "primary_version": self.primary_version,
+            "shadow_version": self.shadow_version,
+            "rows": self.n,
+            "mean_diff": self.sum_diff / n if self.n else None,
+            "mean_abs_diff": self.sum_abs / n if self.n else None,
+            "rmse_diff": float(np.sqrt(self.sum_sq / n)) if self.n else None,
+            "max_abs_diff": self.max_abs if self.n else None,
+            "primary_mean": self.sum_primary / n if self.n else None,
+            "shadow_mean": self.sum_shadow / n if self.n else None,
+            "share_over_threshold": self.over_threshold / n if self.n else None,
+        }
+
+
+class ShadowScorer:
+    """
+    Scores live traffic with a second (shadow) model off the request path.
+
+    The request path only enqueues (rows, primary predictions, primary
+    version); when the queue is full the rows are dropped. A background
+    thread collects up to `batch_size` rows or `flush_interval_s`, scores them
+    with `service.model_for(version)` in one vectorized call and folds the
+    differences into running statistics, kept per (primary, shadow) version
+    pair so a reload on either side starts a fresh comparison.
+    """
+
+    def __init__(self, service, version: str, max_queue_size: int = 10000,
+                 batch_size: int = 256, flush_interval_s: float = 0.5,
+                 sample_rate: float = 1.0, alert_abs_diff: Optional[float] = None):
+        self._service = service
+        self._version = str(version)
+        self._batch_size = max(1, int(batch_size))
+        self._flush_interval_s = float(flush_interval_s)
+        self._sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self._alert_abs_diff = None if alert_abs_diff is None else float(alert_abs_diff)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._thread: Optional[threading.Thread] = None
+
+        self._stats_lock = threading.Lock()
+        self._pairs: dict = {}
+        self._enqueued = 0
+        self._dropped = 0
+        self._sampled_out = 0
+        self._batches = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._score_ms_total = 0.0
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0):
+        """Score everything still queued and stop the worker thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, rows: List[dict], primary_preds: List[float], primary_version: str) -> int:
+        """Queue rows for shadow scoring; returns how many were accepted."""
+        keep = self._sample(len(rows))
+        return self._put(((rows[i], primary_preds[i]) for i in keep), len(rows), primary_version)
+
+    def submit_matrix(self, X: np.ndarray, columns: List[str], primary_preds, primary_version: str) -> int:
+        """submit() for an (n, len(columns)) matrix: row dicts are built only for the sampled rows."""
+        keep = self._sample(len(X))
+        return self._put(((dict(zip(columns, X[i].tolist())), primary_preds[i]) for i in keep),
+                         len(X), primary_version)
+
+    def _sample(self, n: int) -> List[int]:
+        if self._sample_rate >= 1.0:
+            return range(n)
+        # submit runs on many request threads: the module-level random is safe to share, a Generator is not
+        return [i for i in range(n) if random.random() < self._sample_rate]
+
+    def _put(self, sampled, n: int, primary_version: str) -> int:
+        accepted = kept = 0
+        for row, pred in sampled:
+            kept += 1
+            try:
+                self._queue.put_nowait((row, float(pred), primary_version))
+                accepted += 1
+            except queue.Full:
+                pass
+
+        with self._stats_lock:
+            self._enqueued += accepted
+            self._sampled_out += n - kept
+            self._dropped += kept - accepted
+        return accepted
+
+    def _run(self):
+        pending: list = []
+        deadline = time.monotonic() + self._flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._score(pending)
+                return
+            if item is not None:
+                pending.append(item)
+
+            now = time.monotonic()
+            if len(pending) >= self._batch_size or now >= deadline:
+                self._score(pending)
+                pending = []
+                deadline = now + self._flush_interval_s
+
+    def _score(self, items: list):
+        if not items:
+            return
+
+        start = time.perf_counter()
+        try:
+            model = self._service.model_for(self._version)
+            shadow = np.asarray(model.predict_matrix(model.matrix([row for row, _, _ in items])), dtype=np.float64)
+        except Exception as e:  # keep the worker alive; the failure shows up in stats()
+            with self._stats_lock:
+                self._errors += 1
+                self._last_error = str(e)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        primary = np.fromiter((p for _, p, _ in items), dtype=np.float64, count=len(items))
+        primary_versions = np.array([v for _, _, v in items], dtype=object)
+        with self._stats_lock:
+            self._batches += 1
+            self._score_ms_total += elapsed_ms
+            for pv in dict.fromkeys(primary_versions):
+                mask = primary_versions == pv
+                key = (pv, model.version)
+                if key not in self._pairs:
+                    self._pairs[key] = _DiffStats(pv, model.version)
+                self._pairs[key].update(primary[mask], shadow[mask], self._alert_abs_diff)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "shadow": self._version,
+                "sample_rate": self._sample_rate,
+                "alert_abs_diff": self._alert_abs_diff,
+                "enqueued": self._enqueued,
+                "dropped": self._dropped,
+                "sampled_out": self._sampled_out,
+                "batches": self._batches,
+                "errors": self._errors,
+                "last_error": self._last_error,
+                "mean_batch_ms": self._score_ms_total / self._batches if self._batches else None,
+                "queue_depth": self._queue.qsize(),
+                "comparisons": [s.to_dict() for s in self._pairs.values()],
+            }
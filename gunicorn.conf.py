@@ -0,0 +1,16 @@
+import os
+import shutil
+
+# Prometheus multiprocess mode: workers write metric samples to files in this directory and
+# /metrics merges them. It must be set (and emptied) before the app is imported, which with
+# --preload happens in the master right after this file is read.
+multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # drop the dead worker's live gauges (in-flight requests) from the aggregate
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,31 +1,42 @@
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import pandas as pd
 
-from evidently.report import Report
-from evidently.metrics import DataDriftTable
-
-from .config import load_yaml, load_settings
+from .config import load_settings
 from .logger import get_logger
+from .live_store import load_window
+from .storage import find_table, read_table, table_path
+from .drift_profile import OnlineDriftEngine, load_profile
 
 
-def main():
-    settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("drift", settings.log_level)
+def load_live_window(cfg: dict, window_hours: float) -> pd.DataFrame:
+    """
+    Live rows from the last `window_hours` of the partitioned store.
+    The legacy live CSV is never read: its rows carry no timestamp, so it
+    cannot be limited to the window.
+    """
+    store_cfg = cfg["monitoring"]["live_store"]
+    since = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+    return load_window(Path(store_cfg["dir"]), str(store_cfg["format"]), since=since)
 
-    baseline_path = Path(cfg["monitoring"]["baseline_file"])
-    live_path = Path(cfg["monitoring"]["live_file"])
-    report_path = Path(cfg["monitoring"]["drift_report_html"])
-    threshold = float(cfg["monitoring"]["drift_threshold_share"])
 
-    if not baseline_path.exists():
-        raise FileNotFoundError(f"Baseline not found: {baseline_path}. Run: python -m src.monitoring_baseline")
-    if not live_path.exists():
-        log.info("No live data yet. Call /predict a few times first.")
-        return
+def sketch_drift_share(cfg: dict, live: pd.DataFrame) -> dict:
+    drift_cfg = cfg["monitoring"]["drift"]
+    engine = OnlineDriftEngine(
+        load_profile(Path(cfg["monitoring"]["baseline_profile"])),
+        method=str(drift_cfg["method"]),
+        psi_threshold=float(drift_cfg["psi_threshold"]),
+        ks_threshold=float(drift_cfg["ks_threshold"]),
+    )
+    engine.update(live)
+    return engine.drift()
 
-    baseline = pd.read_csv(baseline_path)
-    live = pd.read_csv(live_path)
+
+def evidently_drift_share(baseline_path: Path, live: pd.DataFrame, report_path: Path) -> float:
+    from evidently.report import Report
+    from evidently.metrics import DataDriftTable
+
+    baseline = read_table(baseline_path)
 
     # keep same columns intersection
     cols = [c for c in baseline.columns if c in live.columns]
@@ -37,11 +48,66 @@ def main():
 
     report_path.parent.mkdir(parents=True, exist_ok=True)
     report.save_html(str(report_path))
-    log.info(f"[bold green]✅ Drift report saved[/bold green] {report_path.resolve()}")
 
-    # extract drift share
     res = report.as_dict()
-    drift_share = res["metrics"][0]["result"]["share_of_drifted_columns"]
+    return res["metrics"][0]["result"]["share_of_drifted_columns"]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window-hours", type=float, default=None,
+                        help="Only analyse live traffic from the last N hours (default: monitoring.live_store.drift_window_hours).")
+    parser.add_argument("--html", action="store_true",
+                        help="Also build the full evidently HTML report (default: monitoring.drift.html_report).")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    cfg = settings.cfg
+    log = get_logger("drift", settings.log_level, settings.log_format)
+
+    baseline_path = Path(cfg["monitoring"]["baseline_file"])
+    try:
+        baseline_path = find_table(baseline_path, cfg["storage"]["format"])
+    except FileNotFoundError:
+        baseline_path = table_path(baseline_path, cfg["storage"]["format"])
+    profile_path = Path(cfg["monitoring"]["baseline_profile"])
+    report_path = Path(cfg["monitoring"]["drift_report_html"])
+    threshold = float(cfg["monitoring"]["drift_threshold_share"])
+    html_report = args.html or bool(cfg["monitoring"]["drift"]["html_report"])
+
+    if not profile_path.exists() and not baseline_path.exists():
+        raise FileNotFoundError(f"Baseline not found: {profile_path}. Run: python -m src.monitoring_baseline")
+
+    window_hours = args.window_hours
+    if window_hours is None:
+        window_hours = float(cfg["monitoring"]["live_store"]["drift_window_hours"])
+
+    live = load_live_window(cfg, window_hours)
+    if len(live) == 0:
+        log.info(f"Live store {cfg['monitoring']['live_store']['dir']} has no rows in the last {window_hours:g}h. "
+                 "Call /predict a few times first.")
+        if Path(cfg["monitoring"]["live_file"]).exists():
+            log.info(f"Not reading {cfg['monitoring']['live_file']}: the legacy CSV sink has no timestamps "
+                     "to window on. Set monitoring.capture.sink to 'store'.")
+        return
+    log.info(f"Live rows in window ({window_hours:g}h): {len(live)}")
+
+    if profile_path.exists():
+        result = sketch_drift_share(cfg, live)
+        drift_share = result["share_of_drifted_columns"]
+        for name, f in result["features"].items():
+            log.info(f"{name}: PSI={f['psi']:.4f} KS={f['ks']:.4f}{' [bold yellow]drifted[/bold yellow]' if f['drifted'] else ''}")
+
+        if html_report:
+            evidently_drift_share(baseline_path, live, report_path)
+            log.info(f"[bold green]✅ Drift report saved[/bold green] {report_path.resolve()}")
+    else:
+        # no profile yet (baseline from an older run): fall back to the full evidently report
+        log.info(f"Baseline profile missing ({profile_path}); using evidently report")
+        drift_share = evidently_drift_share(baseline_path, live, report_path)
+        log.info(f"[bold green]✅ Drift report saved[/bold green] {report_path.resolve()}")
 
     log.info(f"Drifted columns share: {drift_share:.3f} | threshold: {threshold:.3f}")
 
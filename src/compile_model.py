@@ -0,0 +1,247 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import load_settings
+from .logger import get_logger
+from .compiled_model import FORMAT_VERSION, CompiledModel, load_compiled
+
+
+class UnsupportedPipeline(ValueError):
+    pass
+
+
+def _numeric_steps(trans):
+    """(imputer statistics, scaler mean, scaler scale) of one numeric branch; None when absent."""
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    steps = [s for _, s in trans.steps] if isinstance(trans, Pipeline) else [trans]
+    stats = mean = scale = None
+    for step in steps:
+        if isinstance(step, SimpleImputer) and stats is None and mean is None:
+            if step.add_indicator:
+                raise UnsupportedPipeline("SimpleImputer(add_indicator=True) is not supported")
+            if not (isinstance(step.missing_values, float) and np.isnan(step.missing_values)):
+                raise UnsupportedPipeline(f"SimpleImputer(missing_values={step.missing_values!r}) is not supported")
+            stats = np.asarray(step.statistics_, dtype=float)
+            if np.isnan(stats).any():
+                raise UnsupportedPipeline("SimpleImputer dropped all-missing columns")
+        elif isinstance(step, StandardScaler) and mean is None:
+            mean = step.mean_
+            scale = step.scale_
+        else:
+            raise UnsupportedPipeline(f"Unsupported preprocessing step: {type(step).__name__}")
+    return stats, mean, scale
+
+
+def extract_preprocessing(pipe, feature_columns: List[str]) -> Tuple[dict, object]:
+    """
+    Read the fitted numeric preprocessing of a `preprocess -> model` pipeline
+    (src.features.build_preprocessor) as plain vectors.
+
+    Returns ({"order", "impute", "mean", "scale"}, final_estimator). Each
+    vector is indexed by the estimator's input column; `order[j]` is the
+    position of that column in `feature_columns` and `impute[j]` is NaN when
+    the branch has no imputer. Raises UnsupportedPipeline for anything else.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+
+    if not isinstance(pipe, Pipeline) or len(pipe.steps) != 2:
+        raise UnsupportedPipeline("Expected Pipeline([preprocess, model])")
+    pre, model = pipe.steps[0][1], pipe.steps[-1][1]
+    if not isinstance(pre, ColumnTransformer):
+        raise UnsupportedPipeline("Expected a ColumnTransformer as the first step")
+    if hasattr(model, "feature_names_in_"):
+        raise UnsupportedPipeline("Final estimator was fitted on named columns")
+
+    n_out = model.n_features_in_
+    order = np.full(n_out, -1)
+    impute = np.zeros(n_out)
+    mean = np.zeros(n_out)
+    scale = np.ones(n_out)
+    for name, trans, cols in pre.transformers_:
+        out = pre.output_indices_[name]
+        if out.stop - out.start == 0:
+            continue
+        if isinstance(trans, str):
+            raise UnsupportedPipeline(f"Unsupported transformer for {name}: {trans!r}")
+        b_stats, b_mean, b_scale = _numeric_steps(trans)
+        for k, col in enumerate(cols):
+            if col not in feature_columns:
+                raise UnsupportedPipeline(f"Column {col!r} is not a serving feature")
+            j = out.start + k
+            order[j] = feature_columns.index(col)
+            impute[j] = b_stats[k] if b_stats is not None else np.nan
+            mean[j] = b_mean[k] if b_mean is not None else 0.0
+            scale[j] = b_scale[k] if b_scale is not None else 1.0
+    if (order < 0).any():
+        raise UnsupportedPipeline("Preprocessor output does not map onto the input columns")
+
+    return {"order": order, "impute": impute, "mean": mean, "scale": scale}, model
+
+
+def _to_input_order(values: np.ndarray, order: np.ndarray, n_inputs: int, fill: float) -> np.ndarray:
+    out = np.full(n_inputs, fill)
+    out[order] = values
+    return out
+
+
+def _compile_linear(model, pre: dict, n_inputs: int) -> Dict[str, np.ndarray]:
+    coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+    intercept = float(np.ravel(model.intercept_)[0])
+
+    # w * (x - mean) / scale + b  ==  (w / scale) * x + (b - sum(w * mean / scale))
+    folded = coef / pre["scale"]
+    return {
+        "coef": _to_input_order(folded, pre["order"], n_inputs, 0.0),
+        "intercept": np.array([intercept - float(np.sum(folded * pre["mean"]))]),
+    }
+
+
+def _compile_hist_gb(model) -> Dict[str, np.ndarray]:
+    link = type(model._loss.link).__name__
+    if link != "IdentityLink" or model.n_trees_per_iteration_ != 1:
+        raise UnsupportedPipeline(f"Unsupported HistGradientBoosting loss/link: {link}")
+
+    nodes, roots, offset, max_depth = [], [], 0, 0
+    for predictors in model._predictors:
+        tree = predictors[0].nodes
+        if tree["is_categorical"].any():
+            raise UnsupportedPipeline("Categorical splits are not supported")
+        roots.append(offset)
+        nodes.append(tree)
+        max_depth = max(max_depth, int(tree["depth"].max()))
+        offset += tree.shape[0]
+
+    flat = np.concatenate(nodes)
+    offsets = np.repeat(np.asarray(roots), [t.shape[0] for t in nodes])
+    is_leaf = flat["is_leaf"].astype(bool)
+    # child indices become global; leaves point to themselves
+    left = np.where(is_leaf, np.arange(flat.shape[0]), flat["left"].astype(np.int64) + offsets)
+    right = np.where(is_leaf, np.arange(flat.shape[0]), flat["right"].astype(np.int64) + offsets)
+
+    return {
+        "feature_idx": flat["feature_idx"].astype(np.int32),
+        "threshold": flat["num_threshold"].astype(np.float64),
+        "left": left.astype(np.int32),
+        "right": right.astype(np.int32),
+        "missing_go_to_left": flat["missing_go_to_left"].astype(bool),
+        "value": flat["value"].astype(np.float64),
+        "tree_roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.array([max_depth], dtype=np.int32),
+        "baseline": np.asarray(model._baseline_prediction, dtype=np.float64).ravel()[:1],
+    }
+
+
+def compile_pipeline(pipe, feature_columns: List[str]) -> Dict[str, np.ndarray]:
+    """Flatten a fitted pipeline into the NumPy arrays read by CompiledModel."""
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    pre, model = extract_preprocessing(pipe, feature_columns)
+    n_inputs = len(feature_columns)
+    impute = _to_input_order(pre["impute"], pre["order"], n_inputs, np.nan)
+
+    if isinstance(model, (Ridge, LinearRegression)):
+        kind, arrays = "linear", _compile_linear(model, pre, n_inputs)
+    elif isinstance(model, HistGradientBoostingRegressor):
+        kind = "tree_ensemble"
+        arrays = _compile_hist_gb(model)
+        arrays.update({"input_order": pre["order"].astype(np.int32), "mean": pre["mean"], "scale": pre["scale"]})
+    else:
+        raise UnsupportedPipeline(f"Unsupported estimator: {type(model).__name__}")
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "estimator": type(model).__name__,
+        "feature_columns": list(feature_columns),
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    arrays["impute"] = impute
+    return arrays
+
+
+def save_compiled(arrays: Dict[str, np.ndarray], path: Path) -> None:
+    # uncompressed on purpose: members can then be memory-mapped (see compiled_model.load_npz)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, **arrays)
+    tmp.replace(path)
+
+
+def check_equivalence(pipe, compiled: CompiledModel, X) -> float:
+    """Max |compiled - pipeline| over the rows of DataFrame X."""
+    expected = pipe.predict(X)
+    got = compiled.predict(X[compiled.feature_columns].to_numpy(dtype=float))
+    return float(np.max(np.abs(expected - got))) if len(expected) else 0.0
+
+
+def export_compiled(pipe, cfg: dict, settings, log, X_check=None) -> Optional[Path]:
+    """
+    Compile `pipe` next to the joblib artifact and verify it on `X_check`
+    (default: the test split). Unsupported pipelines are skipped and any stale
+    compiled artifact is removed so serving falls back to joblib.
+
+    The artifact is written and verified under a staging name first and only
+    then renamed into place: serving (model_format auto, hot reload) picks
+    up whatever is at `save_as`, so an unverified file must never sit there.
+    """
+    compile_cfg = cfg["training"]["compile"]
+    out_path = Path(settings.models_dir) / compile_cfg["save_as"]
+    if not compile_cfg["enabled"]:
+        return None
+
+    feature_columns = list(settings.feature_columns)
+    try:
+        arrays = compile_pipeline(pipe, feature_columns)
+    except UnsupportedPipeline as e:
+        out_path.unlink(missing_ok=True)
+        log.info(f"[bold yellow]Compiled export skipped[/bold yellow] {e}")
+        return None
+
+    if X_check is None:
+        from .datasets import load_split, get_xy
+        X_check, _ = get_xy(load_split("test"))
+
+    staged = out_path.with_name(f".{out_path.stem}.staged{out_path.suffix}")
+    try:
+        save_compiled(arrays, staged)
+        max_diff = check_equivalence(pipe, load_compiled(staged, mmap=False), X_check)
+        atol = float(compile_cfg["atol"])
+        if max_diff > atol:
+            out_path.unlink(missing_ok=True)  # compiled from an older pipeline: no longer current either
+            raise ValueError(f"Compiled model differs from pipeline: max abs diff {max_diff:.3g} > {atol:.3g}")
+        os.replace(staged, out_path)
+    finally:
+        staged.unlink(missing_ok=True)
+
+    log.info(f"[bold green]✅ Compiled model saved[/bold green] {out_path.resolve()}")
+    log.info(f"Equivalence on {len(X_check)} rows: max abs diff {max_diff:.3g} (atol {atol:.3g})")
+    return out_path
+
+
+def main():
+    import joblib
+
+    settings = load_settings()
+    cfg = settings.cfg
+    log = get_logger("compile_model", settings.log_level, settings.log_format)
+
+    model_path = Path(settings.models_dir) / cfg["training"]["save_model_as"]
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model artifact not found: {model_path}. Run: python -m src.train")
+
+    export_compiled(joblib.load(model_path), cfg, settings, log)
+
+
+if __name__ == "__main__":
+    main()
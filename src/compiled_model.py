@@ -0,0 +1,147 @@
+import json
+import struct
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+
+# NumPy-only scorer for artifacts written by src.compile_model.
+# Importing this module must not pull in sklearn, pandas or joblib.
+
+FORMAT_VERSION = 1
+_CHUNK_ROWS = 1024
+
+
+def _npz_member_offset(fh, info: zipfile.ZipInfo) -> int:
+    # local file header: 30 fixed bytes, then file name and extra field
+    fh.seek(info.header_offset)
+    header = fh.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+
+def load_npz(path: Path, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Load every array of an .npz file. With `mmap=True`, arrays stored
+    uncompressed (np.savez) are memory-mapped read-only instead of copied,
+    so processes loading the same file share its pages.
+    """
+    path = Path(path)
+    if not mmap:
+        with np.load(path, allow_pickle=False) as npz:
+            return {k: npz[k] for k in npz.files}
+
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, path.open("rb") as fh:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(zf.open(info), allow_pickle=False)
+                continue
+
+            fh.seek(_npz_member_offset(fh, info))
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fh)
+            if dtype.hasobject:
+                raise ValueError(f"Object arrays are not allowed in compiled artifacts: {name}")
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape,
+                                         order="F" if fortran else "C", offset=fh.tell())
+    return arrays
+
+
+class CompiledModel:
+    """
+    Pure-NumPy scorer for a compiled pipeline.
+
+    kind == "linear": imputation, scaling and the linear model are folded into
+    one coefficient vector over the raw input columns.
+    kind == "tree_ensemble": inputs are imputed and scaled exactly like the
+    sklearn pipeline, then all trees are walked together level by level over
+    flattened node arrays.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        meta = json.loads(bytes(np.asarray(arrays["meta"])).decode("utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled artifact version: {meta.get('format_version')}")
+
+        self.meta = meta
+        self.kind: str = meta["kind"]
+        self.feature_columns: List[str] = list(meta["feature_columns"])
+        # plain ndarray views (still backed by the mapping) avoid np.memmap subclass overhead
+        self._a = {k: np.asarray(v) for k, v in arrays.items()}
+
+        self._impute = np.asarray(arrays["impute"], dtype=np.float64)
+        self._impute_mask = ~np.isnan(self._impute)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "CompiledModel":
+        return cls(load_npz(path, mmap=mmap))
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(np.asarray(a).nbytes for a in self._a.values()))
+
+    def _prepare(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64, copy=True, ndmin=2)
+        if self._impute_mask.any():
+            nan = np.isnan(X) & self._impute_mask
+            if nan.any():
+                X[nan] = np.broadcast_to(self._impute, X.shape)[nan]
+        return X
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """X: (n_rows, n_features) in `feature_columns` order."""
+        X = self._prepare(X)
+        if self.kind == "linear":
+            return X @ self._a["coef"] + float(self._a["intercept"][0])
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            out[start:start + _CHUNK_ROWS] = self._predict_trees(X[start:start + _CHUNK_ROWS])
+        return out
+
+    def _predict_trees(self, X: np.ndarray) -> np.ndarray:
+        a = self._a
+        # same ops as StandardScaler.transform, on the model's input column order
+        Z = X[:, a["input_order"]]
+        Z -= a["mean"]
+        Z /= a["scale"]
+
+        feature_idx, threshold = a["feature_idx"], a["threshold"]
+        left, right = a["left"], a["right"]
+        missing_left = a["missing_go_to_left"]
+        has_nan = bool(np.isnan(Z).any())
+
+        # leaves point to themselves, so walking max_depth levels settles every row on a leaf
+        rows = np.arange(Z.shape[0])[:, None]
+        node = np.broadcast_to(a["tree_roots"], (Z.shape[0], a["tree_roots"].size)).copy()
+        for _ in range(int(a["max_depth"][0])):
+            x = Z[rows, feature_idx[node]]
+            go_left = x <= threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), missing_left[node], go_left)
+            node = np.where(go_left, left[node], right[node])
+
+        # accumulate tree by tree, in the same order as sklearn, for identical sums
+        values = a["value"][node]
+        raw = np.zeros(Z.shape[0], dtype=np.float64)
+        raw += float(a["baseline"][0])
+        for t in range(values.shape[1]):
+            raw += values[:, t]
+        return raw
+
+
+def load_compiled(path: Path, mmap: bool = True) -> CompiledModel:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Compiled model not found at {path}. Run: python -m src.compile_model")
+    return CompiledModel.load(path, mmap=mmap)
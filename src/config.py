@@ -1,10 +1,15 @@
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
 import yaml
 from pathlib import Path
 
 
+CONFIG_PATH = "configs/config.yaml"
+
+
 def load_yaml(path: str) -> Dict[str, Any]:
+    """Read and parse a YAML file (uncached; use get_config() for the project config)."""
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Config not found: {p.resolve()}")
@@ -27,13 +32,23 @@ class Settings:
     val_size: float
     target: str
     save_model_as: str
+    preprocess_cache_dir: Path
+    preprocess_cache_keep: int
+
+    required_columns: Tuple[str, ...]
+    feature_columns: Tuple[str, ...]  # required_columns without the target
 
     log_level: str
+    log_format: str
 
+    # The whole parsed file, shared by every caller: treat as read-only. Sections without typed
+    # fields above (serving, monitoring, storage, models, ...) are only read here, mostly once at startup.
+    cfg: Dict[str, Any] = field(repr=False, compare=False)
 
-def load_settings(config_path: str = "configs/config.yaml") -> Settings:
-    cfg = load_yaml(config_path)
 
+def _parse_settings(cfg: Dict[str, Any]) -> Settings:
+    target = str(cfg["training"]["target"])
+    required = tuple(str(c) for c in cfg["validation"]["required_columns"])
     return Settings(
         project_name=cfg["project"]["name"],
         seed=int(cfg["project"]["seed"]),
@@ -46,8 +61,96 @@ def load_settings(config_path: str = "configs/config.yaml") -> Settings:
 
         test_size=float(cfg["training"]["test_size"]),
         val_size=float(cfg["training"]["val_size"]),
-        target=str(cfg["training"]["target"]),
+        target=target,
         save_model_as=str(cfg["training"]["save_model_as"]),
+        preprocess_cache_dir=Path(cfg["training"]["preprocess_cache_dir"]),
+        preprocess_cache_keep=int(cfg["training"].get("preprocess_cache_keep", 2)),
+
+        required_columns=required,
+        feature_columns=tuple(c for c in required if c != target),
 
         log_level=str(cfg["logging"]["level"]).upper(),
+        log_format=str(cfg["logging"].get("format", "auto")),
+
+        cfg=cfg,
     )
+
+
+# resolved config path -> ((mtime_ns, size), Settings)
+_cache: Dict[Path, tuple] = {}
+_cache_lock = threading.Lock()
+# resolved config path -> hooks run when that file is re-parsed
+_reload_hooks: Dict[Path, List[Callable[[Settings], None]]] = {}
+
+
+def _stamp(p: Path) -> tuple:
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config not found: {p.resolve()}") from None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_settings(config_path: str = CONFIG_PATH) -> Settings:
+    """
+    The parsed config, memoized per process. Each call costs one stat(): the
+    file is re-parsed only when its mtime or size changed, and then the
+    on_config_reload hooks run with the new Settings.
+    """
+    p = Path(config_path).resolve()
+    stamp = _stamp(p)
+    cached = _cache.get(p)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with _cache_lock:
+        cached = _cache.get(p)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        settings = _parse_settings(load_yaml(str(p)))
+        _cache[p] = (stamp, settings)
+
+    if cached is not None:
+        _run_reload_hooks(p, settings)
+    return settings
+
+
+def get_config(config_path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """The raw config dict behind load_settings() (shared: do not mutate)."""
+    return load_settings(config_path).cfg
+
+
+def reload_config(config_path: str = CONFIG_PATH) -> Settings:
+    """Drop the cached config and parse it again, running the reload hooks."""
+    p = Path(config_path).resolve()
+    with _cache_lock:
+        had = _cache.pop(p, None) is not None
+    settings = load_settings(config_path)
+    if had:
+        _run_reload_hooks(p, settings)
+    return settings
+
+
+def _run_reload_hooks(p: Path, settings: Settings) -> None:
+    for hook in list(_reload_hooks.get(p, ())):
+        hook(settings)
+
+
+def on_config_reload(fn: Optional[Callable[[Settings], None]] = None, config_path: str = CONFIG_PATH):
+    """
+    Register `fn(settings)` to run whenever `config_path` is re-parsed after
+    its first load; other config files do not trigger it. Works as a plain
+    decorator or as `@on_config_reload(config_path=...)`.
+    """
+    if fn is None:
+        return lambda f: on_config_reload(f, config_path)
+    with _cache_lock:
+        _reload_hooks.setdefault(Path(config_path).resolve(), []).append(fn)
+    return fn
+
+
+def remove_config_reload_hook(fn: Callable[[Settings], None], config_path: str = CONFIG_PATH) -> None:
+    with _cache_lock:
+        hooks = _reload_hooks.get(Path(config_path).resolve(), [])
+        if fn in hooks:
+            hooks.remove(fn)
@@ -1,38 +1,175 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Union
+
 import pandas as pd
-from sklearn.datasets import fetch_california_housing
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 from .paths import ensure_dirs
+from .storage import read_table, save_dataset, table_path
+
+
+# Dataset providers: a name (dataset.name in config) -> a function returning the
+# dataset as one DataFrame or as an iterable of DataFrame chunks. Results are
+# cached once per (name, provider version, options) as Parquet with a sha256
+# checksum, so later runs -- and offline machines -- never fetch or re-parse.
+
+Chunks = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+@dataclass(frozen=True)
+class DatasetProvider:
+    name: str
+    version: str
+    load: Callable[[dict], Chunks]   # options: the dataset.<name> config section
+
+
+_PROVIDERS: Dict[str, DatasetProvider] = {}
 
 
-def load_california_housing_df() -> pd.DataFrame:
-    bunch = fetch_california_housing(as_frame=True)
-    df = bunch.frame.copy()
+def register_dataset(name: str, version: str = "1"):
+    """
+    Decorator registering `fn(options) -> DataFrame | chunks` as dataset `name`.
+    Bump `version` when the provider's output changes, to invalidate caches.
+    """
+    def decorator(fn: Callable[[dict], Chunks]):
+        _PROVIDERS[name] = DatasetProvider(name, version, fn)
+        return fn
+    return decorator
+
+
+def get_provider(name: str) -> DatasetProvider:
+    if name not in _PROVIDERS:
+        raise ValueError(f"Unknown dataset: {name}. Registered: {sorted(_PROVIDERS)}")
+    return _PROVIDERS[name]
+
+
+@register_dataset("california_housing", version="sklearn-1")
+def load_california_housing_df(options: dict) -> pd.DataFrame:
+    from sklearn.datasets import fetch_california_housing
+
+    bunch = fetch_california_housing(as_frame=True, download_if_missing=not options.get("offline", False))
     # sklearn names target as "MedHouseVal" already in frame for as_frame=True
-    return df
+    return bunch.frame
+
+
+@register_dataset("csv", version="1")
+def read_csv_chunks(options: dict) -> Iterator[pd.DataFrame]:
+    """A local (or URL) CSV read `chunk_rows` rows at a time; numeric columns become float64."""
+    path = options.get("path")
+    if not path:
+        raise ValueError("dataset.csv.path is required for dataset.name: csv")
+    for chunk in pd.read_csv(path, chunksize=int(options.get("chunk_rows", 200_000))):
+        # a column may parse as int in one chunk and float (NaN) in the next: fix one schema
+        ints = [c for c in chunk.columns if pd.api.types.is_integer_dtype(chunk[c])]
+        yield chunk.astype({c: "float64" for c in ints}) if ints else chunk
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_dir(root: Path, provider: DatasetProvider, options: dict) -> Path:
+    """<root>/<name>/<version>-<hash of options>: new options or versions get a new entry."""
+    opts = {k: v for k, v in options.items() if k != "offline"}
+    path = opts.get("path")
+    if path and Path(path).exists():
+        st = Path(path).stat()
+        opts["_source"] = [st.st_size, st.st_mtime_ns]  # re-ingest when the local source file changes
+    digest = hashlib.sha256(json.dumps(opts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+    return Path(root) / provider.name / f"{provider.version}-{digest}"
+
+
+def _write_cache(chunks: Chunks, entry: Path) -> dict:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    entry.mkdir(parents=True, exist_ok=True)
+    data = entry / "data.parquet"
+    tmp = entry / ".data.parquet.tmp"
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("Dataset provider returned no data")
+    os.replace(tmp, data)
+
+    meta = {"rows": rows, "columns": writer.schema.names, "sha256": _file_sha256(data)}
+    (entry / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def cached_dataset(name: str, dataset_cfg: dict, log=None) -> Tuple[Path, dict]:
+    """
+    (cache file, metadata) for dataset `name`, checksum verified; fetched (or
+    ingested chunk by chunk) on a miss or checksum mismatch. With
+    dataset.offline a miss is an error instead of a download.
+    """
+    provider = get_provider(name)
+    options = dict(dataset_cfg.get(name) or {})
+    options["offline"] = bool(dataset_cfg.get("offline", False))
+    entry = cache_dir(Path(dataset_cfg["cache_dir"]), provider, options)
+    data, meta_path = entry / "data.parquet", entry / "meta.json"
+
+    if data.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if _file_sha256(data) == meta["sha256"]:
+            return data, meta
+        if log is not None:
+            log.info(f"[bold yellow]Checksum mismatch, re-fetching[/bold yellow] {data}")
+
+    meta = _write_cache(provider.load(options), entry)
+    if log is not None:
+        log.info(f"Cached {name} ({meta['rows']} rows) -> {data}")
+    return data, meta
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("data_loading", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("data_loading", settings.log_level, settings.log_format)
 
     ensure_dirs(settings)
 
     dataset_name = cfg["dataset"]["name"]
     raw_filename = cfg["dataset"]["raw_filename"]
 
-    if dataset_name != "california_housing":
-        raise ValueError(f"Unsupported dataset in Phase 1: {dataset_name}")
-
-    df = load_california_housing_df()
+    cached, meta = cached_dataset(dataset_name, cfg["dataset"], log)
 
+    st = cfg["storage"]
     raw_path = settings.raw_dir / raw_filename
-    df.to_csv(raw_path, index=False)
+    if st["format"] == "parquet" and not st.get("float32", False) and not st.get("export_csv", False):
+        # the cache is already the raw table: copy the file instead of decoding and re-encoding it
+        raw_path = table_path(raw_path, "parquet")
+        tmp = raw_path.with_name(f".{raw_path.name}.tmp")
+        shutil.copyfile(cached, tmp)
+        os.replace(tmp, raw_path)
+    else:
+        raw_path = save_dataset(read_table(cached), raw_path, cfg)
 
     log.info("[bold green]✅ Raw dataset saved[/bold green]")
-    log.info(f"Rows: {df.shape[0]} | Cols: {df.shape[1]}")
+    log.info(f"Rows: {meta['rows']} | Cols: {len(meta['columns'])}")
     log.info(f"Saved to: {raw_path.resolve()}")
 
 
@@ -1,6 +1,12 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
 import pandas as pd
 
-from .config import load_settings, load_yaml
+from .config import load_settings
+from .storage import find_table, iter_table
 from .logger import get_logger
 
 
@@ -8,58 +14,173 @@ class DataValidationError(Exception):
     pass
 
 
-def validate_dataframe(df: pd.DataFrame, cfg: dict) -> None:
+class ValidationStats:
+    """
+    Everything the checks need, accumulated chunk by chunk in one pass:
+    row count, per-column missing counts, numeric dtype, min/max, and an
+    estimate of distinct rows from a k-minimum-values sketch of row hashes
+    (exact while fewer than `sketch_size` distinct rows were seen). Memory
+    is bounded by one chunk plus the sketch.
+    """
+
+    def __init__(self, sketch_size: int = 1_000_000):
+        self.rows = 0
+        self.columns: list = []
+        self.missing: Dict[str, int] = {}
+        self.numeric: Dict[str, bool] = {}
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+        self._k = max(2, int(sketch_size))
+        self._sketch = np.empty(0, dtype=np.uint64)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        for col in chunk.columns:
+            if col not in self.missing:
+                self.columns.append(col)
+                self.missing[col] = 0
+                self.numeric[col] = True
+
+        self.rows += len(chunk)
+        na = chunk.isna().sum()
+        for col in chunk.columns:
+            self.missing[col] += int(na[col])
+            s = chunk[col]
+            if not pd.api.types.is_numeric_dtype(s):
+                self.numeric[col] = False
+            elif len(s) > int(na[col]):
+                lo, hi = float(s.min()), float(s.max())
+                self.min[col] = min(lo, self.min.get(col, lo))
+                self.max[col] = max(hi, self.max.get(col, hi))
+
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        self._sketch = np.union1d(self._sketch, hashes)[:self._k]
+
+    def missing_ratio(self, col: str) -> float:
+        return self.missing[col] / self.rows if self.rows else 0.0
+
+    @property
+    def duplicates_exact(self) -> bool:
+        return len(self._sketch) < self._k
+
+    @property
+    def distinct_rows_estimate(self) -> int:
+        if self.duplicates_exact:
+            return len(self._sketch)  # every distinct hash is still in the sketch
+        kth = float(self._sketch[-1]) / float(np.iinfo(np.uint64).max)
+        return min(self.rows, int(round((self._k - 1) / kth)))
+
+    def summary(self) -> dict:
+        distinct = self.distinct_rows_estimate
+        return {
+            "rows": self.rows,
+            "distinct_rows_estimate": distinct,
+            "duplicate_rows_estimate": self.rows - distinct,
+            "duplicates_exact": self.duplicates_exact,
+            "columns": {
+                c: {
+                    "missing": self.missing[c],
+                    "missing_ratio": self.missing_ratio(c),
+                    "numeric": self.numeric[c],
+                    "min": self.min.get(c),
+                    "max": self.max.get(c),
+                }
+                for c in self.columns
+            },
+        }
+
+
+def collect_stats(chunks: Iterable[pd.DataFrame], sketch_size: int = 1_000_000) -> ValidationStats:
+    stats = ValidationStats(sketch_size)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def check_stats(stats: ValidationStats, cfg: dict) -> None:
+    """Raise DataValidationError for the first failed check."""
     req_cols = cfg["validation"]["required_columns"]
     max_missing = float(cfg["validation"]["max_missing_ratio_per_column"])
     min_rows = int(cfg["validation"]["min_rows"])
 
     # 1) row count
-    if df.shape[0] < min_rows:
-        raise DataValidationError(f"Too few rows: {df.shape[0]} < {min_rows}")
+    if stats.rows < min_rows:
+        raise DataValidationError(f"Too few rows: {stats.rows} < {min_rows}")
 
     # 2) required columns present
-    missing_cols = [c for c in req_cols if c not in df.columns]
+    missing_cols = [c for c in req_cols if c not in stats.missing]
     if missing_cols:
         raise DataValidationError(f"Missing required columns: {missing_cols}")
 
     # 3) missing ratio check
-    miss_ratio = df[req_cols].isna().mean()
-    bad = miss_ratio[miss_ratio > max_missing]
-    if len(bad) > 0:
+    bad = {c: stats.missing_ratio(c) for c in req_cols if stats.missing_ratio(c) > max_missing}
+    if bad:
         raise DataValidationError(
-            f"Columns exceed missing threshold {max_missing}: {bad.to_dict()}"
+            f"Columns exceed missing threshold {max_missing}: {bad}"
         )
 
     # 4) target sanity
     target = cfg["training"]["target"]
-    if target not in df.columns:
+    if target not in stats.missing:
         raise DataValidationError(f"Target column not found: {target}")
-    if df[target].isna().mean() > 0:
+    if stats.missing[target] > 0:
         raise DataValidationError("Target contains missing values.")
 
     # 5) basic numeric sanity
     for col in req_cols:
-        if not pd.api.types.is_numeric_dtype(df[col]):
+        if not stats.numeric[col]:
             raise DataValidationError(f"Non-numeric column detected: {col}")
 
-    # 6) duplicates (rare here, but industry check)
-    if df.duplicated().any():
-        # don’t fail hard; just warn later in pipeline
-        pass
+    # 6) duplicates are reported (duplicate_rows_estimate in the summary), not fatal
+
+
+def validate_dataframe(df: pd.DataFrame, cfg: dict) -> ValidationStats:
+    stats = collect_stats([df], int(cfg["validation"].get("duplicate_sketch_size", 1_000_000)))
+    check_stats(stats, cfg)
+    return stats
+
+
+def validate_file(path: Path, cfg: dict, summary_path: Optional[Path] = None) -> ValidationStats:
+    """
+    Validate a stored table in one streaming pass of validation.chunk_rows
+    rows. The summary (stats plus pass/fail) is written to `summary_path`
+    whether or not the checks pass.
+    """
+    val_cfg = cfg["validation"]
+    stats = collect_stats(
+        iter_table(path, chunk_rows=int(val_cfg.get("chunk_rows", 100_000))),
+        int(val_cfg.get("duplicate_sketch_size", 1_000_000)),
+    )
+    error = None
+    try:
+        check_stats(stats, cfg)
+    except DataValidationError as e:
+        error = str(e)
+
+    if summary_path is not None:
+        summary = {"source": str(path), "passed": error is None, "error": error, **stats.summary()}
+        summary_path = Path(summary_path)
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    if error is not None:
+        raise DataValidationError(error)
+    return stats
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("data_validation", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("data_validation", settings.log_level, settings.log_format)
 
-    raw_path = settings.raw_dir / cfg["dataset"]["raw_filename"]
-    df = pd.read_csv(raw_path)
+    raw_path = find_table(settings.raw_dir / cfg["dataset"]["raw_filename"], cfg["storage"]["format"])
+    summary_path = Path(cfg["validation"]["summary_file"])
 
-    validate_dataframe(df, cfg)
+    stats = validate_file(raw_path, cfg, summary_path)
 
     log.info("[bold green]✅ Data validation passed[/bold green]")
     log.info(f"Validated file: {raw_path.resolve()}")
+    log.info(f"Rows: {stats.rows} | duplicate rows (est.): {stats.rows - stats.distinct_rows_estimate}")
+    log.info(f"Summary: {summary_path.resolve()}")
 
 
 if __name__ == "__main__":
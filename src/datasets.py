@@ -1,23 +1,24 @@
+from typing import List, Optional
+
 import pandas as pd
-from .config import load_settings, load_yaml
+from .config import load_settings
+from .storage import load_dataset
 
 
-def load_split(split_name: str) -> pd.DataFrame:
+def load_split(split_name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
     split_name: one of ["train", "val", "test"]
+    columns: read only these columns (Parquet/Feather skip the others entirely)
     """
     settings = load_settings()
-    path = settings.processed_dir / f"{split_name}.csv"
-    if not path.exists():
-        raise FileNotFoundError(
-            f"Split file not found: {path}. Run Phase 1 split first: python -m src.split"
-        )
-    return pd.read_csv(path)
+    try:
+        return load_dataset(settings.processed_dir / split_name, settings.cfg, columns=columns)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"{e}. Run Phase 1 split first: python -m src.split") from None
 
 
 def get_xy(df: pd.DataFrame):
-    cfg = load_yaml("configs/config.yaml")
-    target = cfg["training"]["target"]
+    target = load_settings().target
     if target not in df.columns:
         raise ValueError(f"Target column '{target}' not found in dataframe")
     X = df.drop(columns=[target])
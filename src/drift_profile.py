@@ -0,0 +1,161 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+PROFILE_VERSION = 1
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+_EPS = 1e-6
+
+
+# pandas is only imported where a DataFrame is built or consumed, so the API can load
+# profiles and score drift without paying for the pandas import.
+
+
+def build_profile(df: "pd.DataFrame", columns: List[str], n_bins: int = 20) -> dict:
+    """
+    Compact per-feature reference profile used for drift checks.
+
+    Each feature gets quantile-based cut points (so reference bins are roughly
+    equally populated), the reference share per bin, summary quantiles and
+    moments. Bins are open-ended: values below the first cut land in bin 0 and
+    values above the last cut land in the last bin.
+    """
+    features = {}
+    for col in columns:
+        values = df[col].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            raise ValueError(f"Cannot profile column with no values: {col}")
+
+        inner = np.quantile(values, np.linspace(0.0, 1.0, n_bins + 1)[1:-1])
+        cuts = np.unique(inner)
+        counts = np.bincount(np.searchsorted(cuts, values, side="right"), minlength=cuts.size + 1)
+
+        features[col] = {
+            "cuts": cuts.tolist(),
+            "proportions": (counts / values.size).tolist(),
+            "quantiles": {str(q): float(v) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))},
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "count": int(values.size),
+        }
+
+    return {"version": PROFILE_VERSION, "n_rows": int(len(df)), "features": features}
+
+
+def save_profile(profile: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+
+
+def load_profile(path: Path) -> dict:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Baseline profile not found: {path}. Run: python -m src.monitoring_baseline")
+    profile = json.loads(path.read_text(encoding="utf-8"))
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"Unsupported baseline profile version: {profile.get('version')}")
+    return profile
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two bin-share vectors."""
+    e = np.clip(expected, _EPS, None)
+    a = np.clip(actual, _EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """KS statistic on the binned CDFs (a lower bound of the exact two-sample KS)."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+class OnlineDriftEngine:
+    """
+    Incremental drift check against a baseline profile.
+
+    `update` bins a block of live rows into per-feature counts with one
+    searchsorted + bincount per feature; `drift` compares those counts with
+    the reference shares in O(bins) per feature.
+    """
+
+    def __init__(self, profile: dict, method: str = "psi",
+                 psi_threshold: float = 0.2, ks_threshold: float = 0.1):
+        if method not in ("psi", "ks"):
+            raise ValueError(f"Unknown drift method: {method}. Use 'psi' or 'ks'.")
+
+        self.method = method
+        self.psi_threshold = float(psi_threshold)
+        self.ks_threshold = float(ks_threshold)
+
+        self.features: List[str] = list(profile["features"])
+        self._cuts = [np.asarray(profile["features"][f]["cuts"], dtype=float) for f in self.features]
+        self._ref = [np.asarray(profile["features"][f]["proportions"], dtype=float) for f in self.features]
+        self._counts = [np.zeros(r.size, dtype=np.int64) for r in self._ref]
+
+    def reset(self):
+        for c in self._counts:
+            c[:] = 0
+
+    def to_matrix(self, X) -> np.ndarray:
+        """DataFrame / row dicts / array -> float matrix in `self.features` order."""
+        if hasattr(X, "columns") and hasattr(X, "to_numpy"):  # DataFrame
+            return X[self.features].to_numpy(dtype=float)
+        if isinstance(X, list) and X and isinstance(X[0], dict):
+            return np.array([[row.get(f, np.nan) for f in self.features] for row in X], dtype=float)
+        X = np.asarray(X, dtype=float)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def bin_counts(self, X) -> List[np.ndarray]:
+        """Per-feature bin counts of a block of rows (NaNs are skipped)."""
+        X = self.to_matrix(X)
+        out = []
+        for j, cuts in enumerate(self._cuts):
+            col = X[:, j]
+            col = col[~np.isnan(col)]
+            out.append(np.bincount(np.searchsorted(cuts, col, side="right"), minlength=cuts.size + 1))
+        return out
+
+    def update(self, X) -> None:
+        """Add live rows; `X` is a DataFrame, row dicts or a 2-D array in `self.features` order."""
+        for counts, new in zip(self._counts, self.bin_counts(X)):
+            counts += new
+
+    def counts(self) -> Dict[str, np.ndarray]:
+        return {f: c.copy() for f, c in zip(self.features, self._counts)}
+
+    def drift(self, counts: Optional[Dict[str, np.ndarray]] = None) -> dict:
+        """Per-feature PSI / binned KS and the share of drifted features."""
+        counts = counts or dict(zip(self.features, self._counts))
+
+        per_feature = {}
+        n_rows = 0
+        for f, ref in zip(self.features, self._ref):
+            c = np.asarray(counts[f])
+            total = int(c.sum())
+            n_rows = max(n_rows, total)
+            if total == 0:
+                continue
+            cur = c / total
+            p = psi(ref, cur)
+            ks = binned_ks(ref, cur)
+            drifted = p >= self.psi_threshold if self.method == "psi" else ks >= self.ks_threshold
+            per_feature[f] = {"psi": p, "ks": ks, "drifted": bool(drifted), "count": total}
+
+        n_drifted = sum(1 for v in per_feature.values() if v["drifted"])
+        return {
+            "method": self.method,
+            "rows": n_rows,
+            "share_of_drifted_columns": (n_drifted / len(per_feature)) if per_feature else 0.0,
+            "number_of_drifted_columns": n_drifted,
+            "features": per_feature,
+        }
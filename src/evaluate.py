@@ -4,7 +4,7 @@ from pathlib import Path
 import joblib
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 from .datasets import load_split, get_xy
 
@@ -18,8 +18,8 @@ def regression_metrics(y_true, y_pred) -> dict:
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("evaluate", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("evaluate", settings.log_level, settings.log_format)
 
     model_path = Path(settings.models_dir) / cfg["training"]["save_model_as"]
     if not model_path.exists():
@@ -7,7 +7,7 @@ from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
-from .config import load_yaml
+from .config import load_settings
 
 
 @dataclass(frozen=True)
@@ -67,10 +67,10 @@ def get_feature_spec_from_config_or_infer(df: pd.DataFrame) -> Tuple[FeatureSpec
     If config has validation.required_columns, we use that as a strict schema.
     Then we infer feature types from those columns.
     """
-    cfg = load_yaml("configs/config.yaml")
-    target = cfg["training"]["target"]
+    settings = load_settings()
+    target = settings.target
 
-    required_cols = cfg["validation"]["required_columns"]
+    required_cols = list(settings.required_columns)
     # ensure df contains required columns
     missing = [c for c in required_cols if c not in df.columns]
     if missing:
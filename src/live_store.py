@@ -0,0 +1,224 @@
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from .config import load_settings
+from .logger import get_logger
+
+
+# Live traffic is stored as hourly partitions of columnar segments:
+#   <root>/date=YYYY-MM-DD/hour=HH/part-<pid>-<uuid>.parquet
+# Every capture flush adds one small segment; `compact` merges the segments of
+# closed hours and `apply_retention` deletes partitions past the retention window.
+#
+# Compaction is made visible by a single rename. Before it, the merged segment
+# is staged under a hidden name and a hidden manifest (.compacted-<id>.sources)
+# lists the segments it replaces; once compacted-<id> is visible, readers skip
+# those sources even if a crash left them behind, and the next `compact` run
+# deletes them.
+
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+
+def _suffix(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported live store format: {fmt}. Use one of {list(FORMATS)}")
+    return FORMATS[fmt]
+
+
+def _hour_floor(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def partition_dir(root: Path, ts: datetime) -> Path:
+    ts = _hour_floor(ts)
+    return Path(root) / f"date={ts:%Y-%m-%d}" / f"hour={ts:%H}"
+
+
+def list_partitions(root: Path) -> List[Tuple[datetime, Path]]:
+    """All hourly partitions under root as (hour start UTC, dir), oldest first."""
+    root = Path(root)
+    if not root.exists():
+        return []
+
+    parts = []
+    for date_dir in root.glob("date=*"):
+        for hour_dir in date_dir.glob("hour=*"):
+            try:
+                ts = datetime.strptime(
+                    f"{date_dir.name[5:]} {hour_dir.name[5:]}", "%Y-%m-%d %H"
+                ).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            parts.append((ts, hour_dir))
+    return sorted(parts)
+
+
+def _manifest(merged: Path) -> Path:
+    return merged.with_name(f".{merged.stem}.sources")
+
+
+def _read_manifest(path: Path) -> List[str]:
+    try:
+        return path.read_text().split()
+    except FileNotFoundError:
+        return []
+
+
+def _segments(part_dir: Path, fmt: str) -> List[Path]:
+    # names starting with "." are in-flight temp files; sources of a committed
+    # compaction are hidden even before compact has unlinked them
+    visible = [p for p in part_dir.glob(f"*{_suffix(fmt)}") if not p.name.startswith(".")]
+    replaced = set()
+    for p in visible:
+        if p.name.startswith("compacted-"):
+            replaced.update(_read_manifest(_manifest(p)))
+    return sorted(p for p in visible if p.name not in replaced)
+
+
+def _write(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, path)
+
+
+def _read(path: Path, fmt: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def write_segment(df: pd.DataFrame, root: Path, fmt: str = "parquet",
+                  ts: Optional[datetime] = None) -> Path:
+    """Write one segment into the partition for `ts` (default: now). Safe across processes."""
+    part = partition_dir(root, ts or datetime.now(timezone.utc))
+    part.mkdir(parents=True, exist_ok=True)
+    path = part / f"part-{os.getpid()}-{uuid.uuid4().hex}{_suffix(fmt)}"
+    _write(df, path, fmt)
+    return path
+
+
+def _read_partition(part: Path, fmt: str, columns: Optional[List[str]] = None,
+                    attempts: int = 5) -> List[pd.DataFrame]:
+    # A segment that disappears mid-read was merged by a concurrent compact,
+    # whose merged segment was visible before any source was unlinked: re-list.
+    for _ in range(attempts):
+        try:
+            return [_read(p, fmt, columns) for p in _segments(part, fmt)]
+        except FileNotFoundError:
+            continue
+    raise RuntimeError(f"Live store partition {part} kept changing while it was read")
+
+
+def load_window(root: Path, fmt: str = "parquet", since: Optional[datetime] = None,
+                until: Optional[datetime] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read only the partitions whose hour overlaps [since, until).
+    Granularity is one hour: a partition is included if its hour starts before
+    `until` and ends after `since`.
+    """
+    frames = []
+    for ts, part in list_partitions(root):
+        if since is not None and ts + timedelta(hours=1) <= since:
+            continue
+        if until is not None and ts >= until:
+            continue
+        frames.extend(_read_partition(part, fmt, columns))
+
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact(root: Path, fmt: str = "parquet", now: Optional[datetime] = None) -> int:
+    """
+    Merge the segments of every closed hour into a single segment.
+    The current hour is skipped because workers may still be writing to it.
+    Also finishes or discards compactions interrupted by a crash.
+    Returns the number of partitions compacted.
+    """
+    current = _hour_floor(now or datetime.now(timezone.utc))
+    compacted = 0
+    for ts, part in list_partitions(root):
+        if ts >= current:
+            continue
+        _recover(part, fmt)
+        segments = _segments(part, fmt)
+        if len(segments) < 2:
+            continue
+
+        df = pd.concat([_read(p, fmt) for p in segments], ignore_index=True)
+        merged = part / f"compacted-{uuid.uuid4().hex}{_suffix(fmt)}"
+        staged = merged.with_name(f".{merged.name}")
+        manifest = _manifest(merged)
+        _write(df, staged, fmt)
+        tmp = manifest.with_name(f"{manifest.name}.tmp")
+        tmp.write_text("\n".join(p.name for p in segments))
+        os.replace(tmp, manifest)
+
+        os.replace(staged, merged)  # commit: the sources are hidden from here on
+        _finish(merged, manifest)
+        compacted += 1
+    return compacted
+
+
+def _finish(merged: Path, manifest: Path) -> None:
+    for name in _read_manifest(manifest):
+        merged.with_name(name).unlink(missing_ok=True)
+    manifest.unlink(missing_ok=True)
+
+
+def _recover(part: Path, fmt: str) -> None:
+    for manifest in part.glob(".compacted-*.sources"):
+        merged = part / f"{manifest.name[1:-len('.sources')]}{_suffix(fmt)}"
+        if merged.exists():
+            _finish(merged, manifest)  # committed, crashed before the sources were unlinked
+        else:
+            merged.with_name(f".{merged.name}").unlink(missing_ok=True)  # never committed
+            manifest.unlink(missing_ok=True)
+
+
+def apply_retention(root: Path, retention_hours: float, now: Optional[datetime] = None) -> int:
+    """Delete partitions older than `retention_hours`. Returns the number removed."""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=float(retention_hours))
+    removed = 0
+    for ts, part in list_partitions(root):
+        if ts + timedelta(hours=1) <= cutoff:
+            shutil.rmtree(part, ignore_errors=True)
+            removed += 1
+
+    # drop date directories left empty
+    root = Path(root)
+    if root.exists():
+        for date_dir in root.glob("date=*"):
+            if date_dir.is_dir() and not any(date_dir.iterdir()):
+                date_dir.rmdir()
+    return removed
+
+
+def main():
+    settings = load_settings()
+    cfg = settings.cfg
+    log = get_logger("live_store", settings.log_level, settings.log_format)
+
+    store_cfg = cfg["monitoring"]["live_store"]
+    root = Path(store_cfg["dir"])
+    fmt = str(store_cfg["format"])
+
+    compacted = compact(root, fmt)
+    removed = apply_retention(root, float(store_cfg["retention_hours"]))
+
+    log.info("[bold green]✅ Live store maintenance complete[/bold green]")
+    log.info(f"Store: {root.resolve()} | compacted partitions: {compacted} | expired partitions: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,149 @@
+import copy
+import json
 import logging
-from rich.logging import RichHandler
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+from datetime import datetime, timezone
 
 
-def get_logger(name: str, level: str = "INFO") -> logging.Logger:
+# Rich markup tags used in log messages ("[bold green]...[/bold green]"), dropped from JSON output
+_MARKUP = re.compile(r"\[/?[a-z][a-z0-9 _#,.-]*\]")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"fields": {...}}` adds structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "msg": _MARKUP.sub("", record.getMessage()),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            out.update(fields)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # formatted before queueing (AsyncQueueHandler.prepare)
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str)
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on a bounded queue; a QueueListener thread formats and
+    writes them. When the queue is full the record is dropped (and counted)
+    instead of blocking the caller.
+
+    The listener is started on first use in each process, so a handler
+    created before gunicorn forks its workers still works in every worker.
+    close() (run by logging.shutdown at exit) drains the queue.
+    """
+
+    def __init__(self, target: logging.Handler, maxsize: int = 10000):
+        self._target = target
+        self._maxsize = max(1, int(maxsize))
+        self._pid = None
+        self._listener = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+        super().__init__(queue.Queue(self._maxsize))
+        if hasattr(os, "register_at_fork"):
+            # a forked child must not inherit the lock in whatever state another parent thread left it
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._start_lock = threading.Lock()
+        self._listener = None
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:  # another thread's first emit got here first
+                return
+            self.queue = queue.Queue(self._maxsize)
+            self._listener = logging.handlers.QueueListener(self.queue, self._target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = pid
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class formats the record with a plain Formatter, which merges the traceback
+        # into msg, and clears exc_info. Keep msg as the message and the traceback in exc_text,
+        # so JsonFormatter still writes it to its own "exc" field.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def close(self) -> None:
+        with self._start_lock:
+            listener, self._listener = self._listener, None
+            if listener is not None and self._pid == os.getpid():
+                listener.stop()  # writes what is still queued, then joins the thread
+            self._pid = None
+        super().close()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        try:
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+_json_handler = None
+
+
+def json_handler(queue_size: int = 10000) -> AsyncQueueHandler:
+    """The process-wide queued JSON handler (one background writer for every logger)."""
+    global _json_handler
+    if _json_handler is None:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter())
+        _json_handler = AsyncQueueHandler(stream, maxsize=queue_size)
+    return _json_handler
+
+
+def get_logger(name: str, level: str = "INFO", fmt: str = "auto") -> logging.Logger:
+    """
+    fmt: "rich" (synchronous Rich console output), "json" (structured records
+    written by a background thread) or "auto" (Rich on an interactive
+    terminal, JSON otherwise).
+    """
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger  # avoid duplicate handlers
 
-    logger.setLevel(level)
-    handler = RichHandler(rich_tracebacks=True, markup=True)
-    formatter = logging.Formatter("%(message)s")
-    handler.setFormatter(formatter)
+    if fmt == "auto":
+        fmt = "rich" if sys.stdout.isatty() else "json"
+    if fmt == "rich":
+        from rich.logging import RichHandler  # only interactive runs pay for importing rich
 
+        handler = RichHandler(rich_tracebacks=True, markup=True)
+        formatter = logging.Formatter("%(message)s")
+        handler.setFormatter(formatter)
+    elif fmt == "json":
+        handler = json_handler()
+    else:
+        raise ValueError(f"Unknown log format: {fmt}. Use 'auto', 'rich' or 'json'.")
+
+    logger.setLevel(level)
     logger.addHandler(handler)
     logger.propagate = False
     return logger
@@ -1,27 +1,32 @@
-import pandas as pd
 from pathlib import Path
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
-from .datasets import load_split, get_xy
+from .datasets import load_split
+from .drift_profile import build_profile, save_profile
+from .storage import save_dataset
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("baseline", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("baseline", settings.log_level, settings.log_format)
 
     monitoring_dir = Path(cfg["monitoring"]["monitoring_dir"])
     monitoring_dir.mkdir(parents=True, exist_ok=True)
 
-    df_train = load_split("train")
-    X_train, _ = get_xy(df_train)
+    features = list(settings.feature_columns)
+    X_train = load_split("train", columns=features)
 
-    baseline_path = Path(cfg["monitoring"]["baseline_file"])
-    X_train.to_csv(baseline_path, index=False)
+    baseline_path = save_dataset(X_train, Path(cfg["monitoring"]["baseline_file"]), cfg)
+
+    profile_path = Path(cfg["monitoring"]["baseline_profile"])
+    profile = build_profile(X_train, list(X_train.columns), n_bins=int(cfg["monitoring"]["drift"]["n_bins"]))
+    save_profile(profile, profile_path)
 
     log.info("[bold green]✅ Baseline created[/bold green]")
     log.info(f"Saved baseline: {baseline_path.resolve()}")
+    log.info(f"Saved baseline profile: {profile_path.resolve()}")
     log.info(f"Rows: {X_train.shape[0]} | Cols: {X_train.shape[1]}")
 
 
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import CONFIG_PATH, load_settings
+from .logger import get_logger
+from .storage import table_path
+
+
+# DAG runner over the stage CLIs (python -m src.<module>).
+#
+# Every stage declares the config keys it reads, the files it reads and the
+# files it writes. Its key is a hash of those config values, its code (the
+# module plus the src modules it imports, transitively) and the content of its
+# input files. A stage whose key and output hashes match the stamp of its last
+# successful run is skipped; the others run as subprocesses, independent ones
+# in parallel. Upstream outputs are hashed by content, so a stage that reran
+# and wrote identical files does not invalidate what comes after it.
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+@dataclass
+class Stage:
+    name: str
+    module: str
+    config: List[str]                       # dotted keys, e.g. "training.test_size"
+    inputs: List[Path] = field(default_factory=list)
+    outputs: List[Path] = field(default_factory=list)
+
+
+def build_stages(settings) -> Dict[str, Stage]:
+    cfg = settings.cfg
+    fmt = str(cfg["storage"]["format"])
+    raw = table_path(settings.raw_dir / cfg["dataset"]["raw_filename"], fmt)
+    csv_path = (cfg["dataset"].get("csv") or {}).get("path")
+    source = [Path(csv_path)] if cfg["dataset"]["name"] == "csv" and csv_path else []
+    splits = {s: table_path(settings.processed_dir / s, fmt) for s in ("train", "val", "test")}
+    model = settings.models_dir / cfg["training"]["save_model_as"]
+    compile_cfg = cfg["training"]["compile"]
+    compiled = [settings.models_dir / compile_cfg["save_as"]] if compile_cfg["enabled"] else []
+
+    stages = [
+        Stage("data_loading", "data_loading", ["dataset", "storage"], inputs=source, outputs=[raw]),
+        Stage(
+            "data_validation", "data_validation", ["training.target", "validation", "storage"],
+            inputs=[raw], outputs=[Path(cfg["validation"]["summary_file"])],
+        ),
+        Stage(
+            "split", "split",
+            ["project.seed", "training.target", "training.test_size", "training.val_size", "validation", "storage"],
+            inputs=[raw], outputs=list(splits.values()),
+        ),
+        Stage(
+            "train", "train",
+            ["project.seed", "training.target", "training.save_model_as", "training.compile", "validation", "models"],
+            inputs=[splits["train"], splits["val"]] + ([splits["test"]] if compiled else []),
+            outputs=[model] + compiled + [settings.reports_dir / "model_comparison.csv",
+                                          settings.reports_dir / "metrics_val.json"],
+        ),
+        Stage(
+            "evaluate", "evaluate",
+            ["training.target", "training.save_model_as"],
+            inputs=[model, splits["test"]], outputs=[settings.reports_dir / "metrics_test.json"],
+        ),
+        Stage(
+            "monitoring_baseline", "monitoring_baseline",
+            ["training.target", "validation.required_columns", "monitoring.baseline_file",
+             "monitoring.baseline_profile", "monitoring.drift.n_bins", "storage"],
+            inputs=[splits["train"]],
+            outputs=[table_path(Path(cfg["monitoring"]["baseline_file"]), fmt),
+                     Path(cfg["monitoring"]["baseline_profile"])],
+        ),
+    ]
+    return {s.name: s for s in stages}
+
+
+def upstream(stages: Dict[str, Stage]) -> Dict[str, List[str]]:
+    """Stage -> the stages that write its inputs."""
+    producer = {str(p): s.name for s in stages.values() for p in s.outputs}
+    return {
+        s.name: sorted({producer[str(p)] for p in s.inputs if str(p) in producer})
+        for s in stages.values()
+    }
+
+
+_LOCAL_IMPORT = re.compile(r"^\s*from \.(\w*) import ([\w, ]+)", re.M)
+
+
+def code_files(module: str, src_dir: Path = SRC_DIR) -> List[Path]:
+    """The stage module and every src module it imports (relative imports, transitively)."""
+    seen, todo = set(), [module]
+    while todo:
+        name = todo.pop()
+        path = src_dir / f"{name}.py"
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        for mod, names in _LOCAL_IMPORT.findall(path.read_text(encoding="utf-8")):
+            todo.extend([mod] if mod else [n.strip() for n in names.split(",")])
+    return sorted(src_dir / f"{n}.py" for n in seen)
+
+
+def config_value(cfg: dict, key: str):
+    value = cfg
+    for part in key.split("."):
+        value = value[part]
+    return value
+
+
+class _FileHashes:
+    """Content hashes, recomputed only when a file's size or mtime changed during the run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[str, tuple] = {}
+
+    def __call__(self, path: Path) -> Optional[str]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._cache.get(str(path))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._cache[str(path)] = (stamp, digest)
+        return digest
+
+
+class Runner:
+    """
+    Runs `python -m <package>.<stage.module>` for each stage; `src_dir` is
+    where that package's modules live (hashed as the stage's code).
+    """
+
+    def __init__(self, settings, stages: Dict[str, Stage], state_dir: Path, log,
+                 jobs: int = 2, force: bool = False, package: str = "src", src_dir: Path = SRC_DIR):
+        self.settings = settings
+        self.stages = stages
+        self.deps = upstream(stages)
+        self.state_dir = Path(state_dir)
+        self.log = log
+        self.jobs = max(1, int(jobs))
+        self.force = force
+        self.package = package
+        self.src_dir = Path(src_dir)
+        self.file_hash = _FileHashes()
+
+    def stage_key(self, stage: Stage) -> dict:
+        cfg = self.settings.cfg
+        return {
+            "config": {k: config_value(cfg, k) for k in stage.config},
+            "code": {p.name: self.file_hash(p) for p in code_files(stage.module, self.src_dir)},
+            "inputs": {str(p): self.file_hash(p) for p in stage.inputs},
+        }
+
+    def _stamp_path(self, stage: Stage) -> Path:
+        return self.state_dir / f"{stage.name}.json"
+
+    def up_to_date(self, stage: Stage, key: dict) -> bool:
+        path = self._stamp_path(stage)
+        if self.force or not path.exists():
+            return False
+        stamp = json.loads(path.read_text(encoding="utf-8"))
+        if stamp.get("key") != key:
+            return False
+        for p in stage.outputs:
+            digest = self.file_hash(p)
+            if digest is None or stamp["outputs"].get(str(p)) != digest:
+                return False
+        return True
+
+    def _save_stamp(self, stage: Stage, key: dict, seconds: float) -> None:
+        missing = [str(p) for p in stage.outputs if not p.exists()]
+        if missing:
+            raise RuntimeError(f"Stage {stage.name} did not write: {missing}")
+        stamp = {
+            "key": key,
+            "outputs": {str(p): self.file_hash(p) for p in stage.outputs},
+            "seconds": round(seconds, 3),
+        }
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._stamp_path(stage)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(stamp, indent=2, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _run_stage(self, stage: Stage) -> str:
+        key = self.stage_key(stage)
+        if self.up_to_date(stage, key):
+            return "skipped"
+
+        self._stamp_path(stage).unlink(missing_ok=True)
+        self.log.info(f"▶ {stage.name}: python -m {self.package}.{stage.module}")
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-m", f"{self.package}.{stage.module}"])
+        if proc.returncode != 0:
+            raise RuntimeError(f"Stage {stage.name} failed with exit code {proc.returncode}")
+        elapsed = time.perf_counter() - start
+        self._save_stamp(stage, key, elapsed)
+        return f"ran in {elapsed:.1f}s"
+
+    def select(self, targets: List[str]) -> List[str]:
+        """`targets` and everything upstream of them, in declaration order."""
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {unknown}. Stages: {list(self.stages)}")
+        wanted, todo = set(), list(targets or self.stages)
+        while todo:
+            name = todo.pop()
+            if name not in wanted:
+                wanted.add(name)
+                todo.extend(self.deps[name])
+        return [n for n in self.stages if n in wanted]
+
+    def run(self, targets: List[str]) -> Dict[str, str]:
+        """Run the selected stages, each as soon as its upstream stages are done. Returns stage -> result."""
+        pending = self.select(targets)
+        results: Dict[str, str] = {}
+        running = {}
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                if not failed:
+                    for name in [n for n in pending if all(d in results for d in self.deps[n])]:
+                        if len(running) >= self.jobs:
+                            break
+                        pending.remove(name)
+                        running[pool.submit(self._run_stage, self.stages[name])] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        results[name] = fut.result()
+                        self.log.info(f"{name}: {results[name]}")
+                    except Exception as e:
+                        results[name] = f"failed: {e}"
+                        self.log.info(f"[bold red]❌ {name}[/bold red] {e}")
+                        failed = True
+        for name in pending:
+            results[name] = "not run (upstream failed)"
+        return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping up-to-date stages.")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date, with their upstream (default: all).")
+    parser.add_argument("--force", action="store_true", help="Rerun the selected stages even if up to date.")
+    parser.add_argument("--jobs", type=int, default=None, help="Stages run in parallel (default: pipeline.jobs).")
+    parser.add_argument("--list", action="store_true", help="Print each stage's upstream and status, then exit.")
+    args = parser.parse_args()
+
+    settings = load_settings(CONFIG_PATH)
+    cfg = settings.cfg
+    log = get_logger("pipeline", settings.log_level, settings.log_format)
+    pipe_cfg = cfg["pipeline"]
+
+    runner = Runner(
+        settings,
+        build_stages(settings),
+        state_dir=Path(pipe_cfg["state_dir"]),
+        log=log,
+        jobs=args.jobs if args.jobs is not None else int(pipe_cfg["jobs"]),
+        force=args.force,
+    )
+
+    if args.list:
+        for name in runner.select(args.targets):
+            stage = runner.stages[name]
+            status = "up to date" if runner.up_to_date(stage, runner.stage_key(stage)) else "stale"
+            log.info(f"{name} <- {', '.join(runner.deps[name]) or '-'}: {status}")
+        return
+
+    start = time.perf_counter()
+    results = runner.run(args.targets)
+    if any(r.startswith(("failed", "not run")) for r in results.values()):
+        log.info(f"[bold red]❌ Pipeline failed[/bold red] ({time.perf_counter() - start:.1f}s)")
+        sys.exit(1)
+    ran = sum(1 for r in results.values() if r != "skipped")
+    log.info(f"[bold green]✅ Pipeline up to date[/bold green] | ran {ran}, skipped {len(results) - ran} "
+             f"({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
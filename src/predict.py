@@ -4,7 +4,7 @@ from pathlib import Path
 import joblib
 import pandas as pd
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 
 
@@ -16,8 +16,8 @@ def main():
     args = parser.parse_args()
 
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("predict", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("predict", settings.log_level, settings.log_format)
 
     model_path = Path(settings.models_dir) / cfg["training"]["save_model_as"]
     if not model_path.exists():
@@ -1,11 +1,11 @@
 import mlflow
 from mlflow.tracking import MlflowClient
 
-from .config import load_yaml
+from .config import get_config
 
 
 def main():
-    cfg = load_yaml("configs/config.yaml")
+    cfg = get_config()
     mlflow.set_tracking_uri(cfg["mlflow"]["tracking_uri"])
 
     name = cfg["mlflow"]["registered_model_name"]
@@ -1,21 +1,20 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 from .paths import ensure_dirs
 from .data_validation import validate_dataframe
+from .storage import load_dataset, save_dataset
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("split", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("split", settings.log_level, settings.log_format)
 
     ensure_dirs(settings)
 
-    raw_path = settings.raw_dir / cfg["dataset"]["raw_filename"]
-    df = pd.read_csv(raw_path)
+    df = load_dataset(settings.raw_dir / cfg["dataset"]["raw_filename"], cfg)
 
     # validate before splitting
     validate_dataframe(df, cfg)
@@ -44,13 +43,9 @@ def main():
     )
 
     # save
-    train_path = settings.processed_dir / "train.csv"
-    val_path = settings.processed_dir / "val.csv"
-    test_path = settings.processed_dir / "test.csv"
-
-    train.to_csv(train_path, index=False)
-    val.to_csv(val_path, index=False)
-    test.to_csv(test_path, index=False)
+    train_path = save_dataset(train, settings.processed_dir / "train", cfg)
+    val_path = save_dataset(val, settings.processed_dir / "val", cfg)
+    test_path = save_dataset(test, settings.processed_dir / "test", cfg)
 
     log.info("[bold green]✅ Split complete[/bold green]")
     log.info(f"Train: {train.shape} -> {train_path.resolve()}")
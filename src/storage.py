@@ -0,0 +1,146 @@
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from .config import load_settings
+from .logger import get_logger
+
+
+# Tabular datasets (raw data, splits, monitoring baseline) are stored in the
+# format chosen by `storage.format`; the suffix of a configured file name is
+# replaced by the format's own. Readers fall back to the other formats, so a
+# tree written as CSV keeps working after switching to Parquet or Feather, and
+# log a warning when they do.
+
+FORMATS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+
+def _suffix(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported storage format: {fmt}. Use one of {list(FORMATS)}")
+    return FORMATS[fmt]
+
+
+def _format_of(path: Path) -> str:
+    for fmt, suffix in FORMATS.items():
+        if path.suffix == suffix:
+            return fmt
+    raise ValueError(f"Unknown table format for {path}. Use one of {list(FORMATS.values())}")
+
+
+def table_path(path: Path, fmt: str) -> Path:
+    """`path` with the suffix of `fmt` ("data/raw/x.csv" -> "data/raw/x.parquet")."""
+    return Path(path).with_suffix(_suffix(fmt))
+
+
+def find_table(path: Path, fmt: str) -> Path:
+    """
+    The stored table for `path`: the `fmt` file if present, else any other
+    supported format, with a warning (a leftover file in another format may
+    be older than the data the `fmt` one would hold).
+    """
+    preferred = table_path(path, fmt)
+    if preferred.exists():
+        return preferred
+    for candidate in [table_path(path, f) for f in FORMATS if f != fmt]:
+        if candidate.exists():
+            settings = load_settings()
+            log = get_logger("storage", settings.log_level, settings.log_format)
+            log.warning(f"{preferred} not found, reading {candidate} instead (storage.format is {fmt!r}); "
+                        f"re-run the stage that writes it if that file is stale")
+            return candidate
+    raise FileNotFoundError(f"Table not found: {preferred} (also looked for {', '.join(FORMATS.values())})")
+
+
+def to_float32(df: pd.DataFrame, keep: Optional[List[str]] = None) -> pd.DataFrame:
+    """Downcast float64 columns to float32 (half the size on disk and in memory), except `keep`."""
+    keep = set(keep or [])
+    cols = [c for c in df.columns if df[c].dtype == "float64" and c not in keep]
+    return df.astype({c: "float32" for c in cols}) if cols else df
+
+
+def write_table(df: pd.DataFrame, path: Path, fmt: str = "parquet", export_csv: bool = False) -> Path:
+    """
+    Write `df` as `fmt` next to `path` (suffix replaced) and return the file.
+    The write goes through a temp file, so readers never see a partial table.
+    export_csv also writes a .csv copy for tools that need text.
+    """
+    out = table_path(path, fmt)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    elif fmt == "feather":
+        # uncompressed Arrow IPC: memory-mapped reads need no decode step
+        df.reset_index(drop=True).to_feather(tmp, compression="uncompressed")
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, out)
+
+    if export_csv and fmt != "csv":
+        write_table(df, path, "csv")
+    return out
+
+
+def read_table(path: Path, columns: Optional[List[str]] = None, memory_map: bool = False) -> pd.DataFrame:
+    """
+    Read a stored table, format taken from the suffix. `columns` projects
+    the read: Parquet and Feather only decode the requested columns.
+    """
+    path = Path(path)
+    fmt = _format_of(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns, memory_map=memory_map)
+    if fmt == "feather":
+        from pyarrow import feather
+
+        return feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    df = pd.read_csv(path, usecols=columns, memory_map=memory_map)
+    return df[columns] if columns is not None else df
+
+
+def iter_table(path: Path, chunk_rows: int = 100_000,
+               columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a stored table as DataFrames of at most `chunk_rows` rows, so
+    memory stays bounded by the chunk size rather than the file size.
+    """
+    path = Path(path)
+    fmt = _format_of(path)
+    chunk_rows = max(1, int(chunk_rows))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "feather":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for start in range(0, batch.num_rows, chunk_rows):
+                    yield batch.slice(start, chunk_rows).to_pandas()
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            yield chunk[columns] if columns is not None else chunk
+
+
+def save_dataset(df: pd.DataFrame, path: Path, cfg: dict) -> Path:
+    """write_table with the project's `storage` settings (the target column is never downcast)."""
+    st = cfg["storage"]
+    if st.get("float32", False):
+        df = to_float32(df, keep=[cfg["training"]["target"]])
+    return write_table(df, path, str(st["format"]), export_csv=bool(st.get("export_csv", False)))
+
+
+def load_dataset(path: Path, cfg: dict, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """read_table of the stored table for `path`, in the configured format if available."""
+    st = cfg["storage"]
+    found = find_table(path, str(st["format"]))
+    return read_table(found, columns=columns, memory_map=bool(st.get("memory_map", False)))
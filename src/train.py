@@ -3,41 +3,20 @@ from dataclasses import asdict
 from pathlib import Path
 
 import pandas as pd
-from sklearn.pipeline import Pipeline
-from sklearn.linear_model import Ridge
-from sklearn.ensemble import HistGradientBoostingRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 from .paths import ensure_dirs
 from .datasets import load_split, get_xy
-from .features import get_feature_spec_from_config_or_infer, build_preprocessor
-
-
-def regression_metrics(y_true, y_pred) -> dict:
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
-    mae = mean_absolute_error(y_true, y_pred)
-    r2 = r2_score(y_true, y_pred)
-    return {"rmse": float(rmse), "mae": float(mae), "r2": float(r2)}
-
-
-def train_and_eval(model_name: str, model, preprocessor, X_train, y_train, X_val, y_val) -> tuple[Pipeline, dict]:
-    pipeline = Pipeline(steps=[
-        ("preprocess", preprocessor),
-        ("model", model),
-    ])
-    pipeline.fit(X_train, y_train)
-    pred_val = pipeline.predict(X_val)
-    metrics = regression_metrics(y_val, pred_val)
-    metrics["model"] = model_name
-    return pipeline, metrics
+from .features import get_feature_spec_from_config_or_infer
+from .compile_model import export_compiled
+from .training import build_candidates, fit_preprocessing, save_pipeline, select_best, train_candidates
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("train", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("train", settings.log_level, settings.log_format)
 
     ensure_dirs(settings)
 
@@ -48,37 +27,22 @@ def main():
     X_train, y_train = get_xy(df_train)
     X_val, y_val = get_xy(df_val)
 
-    # Build preprocessor
+    # Fit the preprocessor once (cached on disk), then every candidate on its output
     spec, _ = get_feature_spec_from_config_or_infer(df_train)
-    preprocessor = build_preprocessor(spec)
-
-    # Models
-    ridge_cfg = cfg["models"]["baseline_ridge"]
-    hgb_cfg = cfg["models"]["strong_hist_gb"]
-
-    ridge = Ridge(alpha=float(ridge_cfg["alpha"]), random_state=settings.seed)
-    hgb = HistGradientBoostingRegressor(
-        max_depth=int(hgb_cfg["max_depth"]),
-        learning_rate=float(hgb_cfg["learning_rate"]),
-        max_iter=int(hgb_cfg["max_iter"]),
-        l2_regularization=float(hgb_cfg["l2_regularization"]),
-        random_state=settings.seed,
+    preprocessor, Xt_train, Xt_val = fit_preprocessing(
+        X_train, X_val, spec, settings.preprocess_cache_dir, log, keep=settings.preprocess_cache_keep
     )
 
     # Train + evaluate on VAL
+    candidates = build_candidates(cfg["models"], settings.seed)
+    fitted = train_candidates(candidates, Xt_train, y_train, Xt_val, y_val,
+                              n_jobs=int(cfg["training"].get("n_jobs", 0)))
     results = []
-    best_pipeline = None
-    best_rmse = float("inf")
-
-    for name, model in [("ridge_baseline", ridge), ("hist_gb_strong", hgb)]:
-        pipe, metrics = train_and_eval(name, model, preprocessor, X_train, y_train, X_val, y_val)
+    for name, _, metrics in fitted:
         results.append(metrics)
-
         log.info(f"[bold]{name}[/bold] VAL metrics: RMSE={metrics['rmse']:.4f} | MAE={metrics['mae']:.4f} | R2={metrics['r2']:.4f}")
 
-        if metrics["rmse"] < best_rmse:
-            best_rmse = metrics["rmse"]
-            best_pipeline = pipe
+    best_name, best_pipeline, _ = select_best(fitted, preprocessor)
 
     # Save comparison report
     reports_dir = Path(settings.reports_dir)
@@ -87,21 +51,17 @@ def main():
     comparison_path = reports_dir / "model_comparison.csv"
     pd.DataFrame(results).to_csv(comparison_path, index=False)
 
-    # Save best pipeline
-    models_dir = Path(settings.models_dir)
-    models_dir.mkdir(parents=True, exist_ok=True)
-
-    model_path = models_dir / cfg["training"]["save_model_as"]
-
-    import joblib
-    joblib.dump(best_pipeline, model_path)
+    # Save best pipeline (replaced atomically: API workers may have the current file memory-mapped)
+    model_path = save_pipeline(best_pipeline, Path(settings.models_dir) / cfg["training"]["save_model_as"])
+    compiled_path = export_compiled(best_pipeline, cfg, settings, log)
 
     # Save metrics summary
     summary = {
-        "best_model": [r for r in results if r["rmse"] == best_rmse][0]["model"],
+        "best_model": best_name,
         "val_results": results,
         "feature_spec": asdict(spec),
         "artifact": str(model_path),
+        "compiled_artifact": str(compiled_path) if compiled_path else None,
         "seed": settings.seed,
     }
     metrics_path = reports_dir / "metrics_val.json"
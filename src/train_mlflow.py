@@ -1,30 +1,19 @@
-import joblib
 import mlflow
 import pandas as pd
 from pathlib import Path
 
-from sklearn.pipeline import Pipeline
-from sklearn.linear_model import Ridge
-from sklearn.ensemble import HistGradientBoostingRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-
-from .config import load_settings, load_yaml
+from .config import load_settings
 from .logger import get_logger
 from .datasets import load_split, get_xy
-from .features import get_feature_spec_from_config_or_infer, build_preprocessor
-
-
-def regression_metrics(y_true, y_pred) -> dict:
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
-    mae = mean_absolute_error(y_true, y_pred)
-    r2 = r2_score(y_true, y_pred)
-    return {"rmse": float(rmse), "mae": float(mae), "r2": float(r2)}
+from .features import get_feature_spec_from_config_or_infer
+from .compile_model import export_compiled
+from .training import build_candidates, fit_preprocessing, save_pipeline, select_best, train_candidates
 
 
 def main():
     settings = load_settings()
-    cfg = load_yaml("configs/config.yaml")
-    log = get_logger("train_mlflow", settings.log_level)
+    cfg = settings.cfg
+    log = get_logger("train_mlflow", settings.log_level, settings.log_format)
 
     mlflow_cfg = cfg["mlflow"]
     mlflow.set_tracking_uri(mlflow_cfg["tracking_uri"])
@@ -36,49 +25,30 @@ def main():
     X_val, y_val = get_xy(df_val)
 
     spec, _ = get_feature_spec_from_config_or_infer(df_train)
-    preprocessor = build_preprocessor(spec)
-
-    ridge_cfg = cfg["models"]["baseline_ridge"]
-    hgb_cfg = cfg["models"]["strong_hist_gb"]
-
-    candidates = [
-        ("ridge_baseline", Ridge(alpha=float(ridge_cfg["alpha"]), random_state=settings.seed)),
-        ("hist_gb_strong", HistGradientBoostingRegressor(
-            max_depth=int(hgb_cfg["max_depth"]),
-            learning_rate=float(hgb_cfg["learning_rate"]),
-            max_iter=int(hgb_cfg["max_iter"]),
-            l2_regularization=float(hgb_cfg["l2_regularization"]),
-            random_state=settings.seed,
-        )),
-    ]
-
-    best = None
-    best_rmse = float("inf")
+    preprocessor, Xt_train, Xt_val = fit_preprocessing(
+        X_train, X_val, spec, settings.preprocess_cache_dir, log, keep=settings.preprocess_cache_keep
+    )
+    candidates = build_candidates(cfg["models"], settings.seed)
 
     with mlflow.start_run(run_name="train_house_price") as run:
         mlflow.log_param("seed", settings.seed)
 
-        for name, model in candidates:
-            pipe = Pipeline([("preprocess", preprocessor), ("model", model)])
-            pipe.fit(X_train, y_train)
-            pred = pipe.predict(X_val)
-            m = regression_metrics(y_val, pred)
-
+        fitted = train_candidates(candidates, Xt_train, y_train, Xt_val, y_val,
+                                  n_jobs=int(cfg["training"].get("n_jobs", 0)))
+        for name, _, m in fitted:
             mlflow.log_metrics({f"{name}_val_rmse": m["rmse"], f"{name}_val_mae": m["mae"], f"{name}_val_r2": m["r2"]})
             log.info(f"{name} VAL: RMSE={m['rmse']:.4f} MAE={m['mae']:.4f} R2={m['r2']:.4f}")
 
-            if m["rmse"] < best_rmse:
-                best_rmse = m["rmse"]
-                best = (name, pipe)
-
-        best_name, best_pipe = best
+        best_name, best_pipe, _ = select_best(fitted, preprocessor)
         mlflow.log_param("best_model", best_name)
 
         # Save local artifact too (keep your old behavior)
-        model_path = Path(settings.models_dir) / cfg["training"]["save_model_as"]
-        model_path.parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump(best_pipe, model_path)
+        # replaced atomically: API workers may have the current file memory-mapped
+        model_path = save_pipeline(best_pipe, Path(settings.models_dir) / cfg["training"]["save_model_as"])
         mlflow.log_artifact(str(model_path), artifact_path="model_local")
+        compiled_path = export_compiled(best_pipe, cfg, settings, log)
+        if compiled_path is not None:
+            mlflow.log_artifact(str(compiled_path), artifact_path="model_local")
 
         # Register to MLflow Model Registry
         registered_name = mlflow_cfg["registered_model_name"]
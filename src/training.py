@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline
+
+from .features import FeatureSpec, build_preprocessor
+
+
+# Candidate training shared by train and train_mlflow.
+#
+# The preprocessor is fit once per (train data, val data, feature spec,
+# preprocessor params) and its outputs are cached on disk as .npy; every
+# candidate in `models:` is then fit on the cached matrices, in parallel
+# worker processes that memory-map them. The winner is put back behind the
+# fitted preprocessor as the usual ("preprocess", "model") Pipeline.
+
+# models.<key>.type -> estimator class; every other key of the entry is a constructor argument
+ESTIMATORS = {
+    "ridge": Ridge,
+    "hist_gb": HistGradientBoostingRegressor,
+}
+
+
+def regression_metrics(y_true, y_pred) -> dict:
+    rmse = mean_squared_error(y_true, y_pred, squared=False)
+    mae = mean_absolute_error(y_true, y_pred)
+    r2 = r2_score(y_true, y_pred)
+    return {"rmse": float(rmse), "mae": float(mae), "r2": float(r2)}
+
+
+def build_candidates(models_cfg: dict, seed: int) -> List[Tuple[str, object]]:
+    """(report name, unfitted estimator) for every entry of the `models:` config section."""
+    candidates = []
+    for key, entry in models_cfg.items():
+        params = dict(entry)
+        kind = params.pop("type", None)
+        name = params.pop("name", key)
+        if kind not in ESTIMATORS:
+            raise ValueError(f"models.{key}.type must be one of {list(ESTIMATORS)}, got {kind!r}")
+        estimator = ESTIMATORS[kind](**params)
+        if "random_state" in estimator.get_params():
+            estimator.set_params(random_state=seed)
+        candidates.append((name, estimator))
+    return candidates
+
+
+def _frame_digest(df) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def preprocess_key(X_train: pd.DataFrame, X_val: pd.DataFrame, spec: FeatureSpec) -> str:
+    import sklearn
+
+    parts = {
+        "train": _frame_digest(X_train),
+        "val": _frame_digest(X_val),
+        "columns": list(X_train.columns),
+        "spec": asdict(spec),
+        "preprocessor": repr(build_preprocessor(spec).get_params(deep=True)),
+        "sklearn": sklearn.__version__,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def fit_preprocessing(X_train: pd.DataFrame, X_val: pd.DataFrame, spec: FeatureSpec, cache_dir: Path,
+                      log=None, keep: int = 2):
+    """
+    (fitted preprocessor, Xt_train path, Xt_val path) from
+    <cache_dir>/<preprocess_key>, fitting and filling it only on a miss.
+    Only the `keep` most recently used entries stay on disk.
+    """
+    import joblib
+
+    entry = Path(cache_dir) / preprocess_key(X_train, X_val, spec)
+    paths = (entry / "preprocessor.joblib", entry / "Xt_train.npy", entry / "Xt_val.npy")
+    if all(p.exists() for p in paths):
+        if log is not None:
+            log.info(f"Preprocessing cache hit: {entry}")
+        os.utime(entry)  # mtime = last use, for prune_preprocess_cache
+        prune_preprocess_cache(cache_dir, keep, log)
+        return joblib.load(paths[0]), paths[1], paths[2]
+
+    preprocessor = build_preprocessor(spec)
+    Xt_train = preprocessor.fit_transform(X_train)
+    Xt_val = preprocessor.transform(X_val)
+
+    entry.mkdir(parents=True, exist_ok=True)
+    for path, obj in zip(paths, (preprocessor, Xt_train, Xt_val)):
+        tmp = path.with_name(f".{path.name}.tmp")
+        with tmp.open("wb") as f:
+            if path.suffix == ".npy":
+                # one-hot output can be sparse; workers memory-map plain arrays
+                np.save(f, np.ascontiguousarray(obj.toarray() if hasattr(obj, "toarray") else obj))
+            else:
+                joblib.dump(obj, f)
+        os.replace(tmp, path)
+    if log is not None:
+        log.info(f"Preprocessing fitted once, cached: {entry}")
+    prune_preprocess_cache(cache_dir, keep, log)
+    return preprocessor, paths[1], paths[2]
+
+
+def prune_preprocess_cache(cache_dir: Path, keep: int, log=None) -> List[Path]:
+    """
+    Delete all but the `keep` (at least 1) most recently used entries of
+    `cache_dir`. Each entry holds full transformed copies of train and val,
+    so old data versions and feature specs would otherwise pile up.
+    """
+    entries = sorted((p for p in Path(cache_dir).iterdir() if p.is_dir()),
+                     key=lambda p: p.stat().st_mtime_ns, reverse=True)
+    removed = entries[max(1, int(keep)):]
+    for old in removed:
+        shutil.rmtree(old, ignore_errors=True)
+    if removed and log is not None:
+        log.info(f"Preprocessing cache: removed {len(removed)} old entries from {cache_dir}")
+    return removed
+
+
+def save_pipeline(pipe, path: Path) -> Path:
+    """
+    joblib.dump through a temp file in the same directory and os.replace it
+    into place. Serving workers memory-map the artifact (serving.mmap_mode)
+    and the hot reloader polls it, so it must never be rewritten in place:
+    the old inode stays valid for the workers that mapped it, and readers
+    only ever see a complete file.
+    """
+    import joblib
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        joblib.dump(pipe, f)
+    os.replace(tmp, path)
+    return path
+
+
+def _fit_candidate(name: str, estimator, Xt_train_path: Path, y_train: np.ndarray,
+                   Xt_val_path: Path, y_val: np.ndarray):
+    # runs in a worker process: the matrices are memory-mapped, not pickled per task
+    Xt_train = np.load(Xt_train_path, mmap_mode="r")
+    Xt_val = np.load(Xt_val_path, mmap_mode="r")
+    model = clone(estimator).fit(Xt_train, y_train)
+    metrics = regression_metrics(y_val, model.predict(Xt_val))
+    metrics["model"] = name
+    return name, model, metrics
+
+
+def train_candidates(candidates: List[Tuple[str, object]], Xt_train_path: Path, y_train, Xt_val_path: Path, y_val,
+                     n_jobs: int = 0) -> List[tuple]:
+    """
+    Fit every candidate on the cached matrices; returns (name, fitted model,
+    VAL metrics) in config order. n_jobs <= 0: one worker per candidate, up
+    to the CPU count; 1: sequential in this process.
+    """
+    y_train = np.asarray(y_train, dtype=np.float64)
+    y_val = np.asarray(y_val, dtype=np.float64)
+    if n_jobs <= 0:
+        n_jobs = min(len(candidates), os.cpu_count() or 1)
+
+    args = [(name, est, Xt_train_path, y_train, Xt_val_path, y_val) for name, est in candidates]
+    if n_jobs == 1 or len(candidates) <= 1:
+        return [_fit_candidate(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(_fit_candidate, *zip(*args)))
+
+
+def select_best(results: List[tuple], preprocessor) -> Tuple[str, Pipeline, Dict[str, float]]:
+    """The lowest VAL RMSE candidate, reassembled behind the fitted preprocessor."""
+    name, model, metrics = min(results, key=lambda r: r[2]["rmse"])
+    return name, Pipeline(steps=[("preprocess", preprocessor), ("model", model)]), metrics
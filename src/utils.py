@@ -5,7 +5,7 @@ from .paths import ensure_dirs
 
 def main():
     settings = load_settings()
-    log = get_logger("setup", settings.log_level)
+    log = get_logger("setup", settings.log_level, settings.log_format)
     ensure_dirs(settings)
     log.info(f"[bold green]✅ Setup OK[/bold green] | Project: {settings.project_name}")
     log.info(f"Data dir: {settings.data_dir.resolve()}")
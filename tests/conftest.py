@@ -1,5 +1,25 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """app.main with live capture writing under tmp_path, not into the real drift input."""
+    from app import main
+    from app.capture import LiveRequestCapture
+
+    live_dir = tmp_path / "live"
+    monkeypatch.setitem(main.cfg["monitoring"]["live_store"], "dir", str(live_dir))
+    monkeypatch.setitem(main.cfg["monitoring"], "live_file", str(tmp_path / "live_requests.csv"))
+    monkeypatch.setattr(main, "live_capture", LiveRequestCapture(
+        path=str(live_dir) if main.capture_sink == "store" else str(tmp_path / "live_requests.csv"),
+        columns=main.FEATURE_COLUMNS,
+        sink=main.capture_sink,
+        store_format=str(main.cfg["monitoring"]["live_store"]["format"]),
+    ))
+    return main
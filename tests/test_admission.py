@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, Overloaded
+
+
+def test_admission_sheds_when_queue_full_and_on_deadline():
+    async def scenario():
+        ctl = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout_ms=50)
+        await ctl.acquire()  # the only slot
+
+        waiter = asyncio.create_task(ctl.acquire())
+        await asyncio.sleep(0)
+        assert ctl.waiting == 1
+
+        with pytest.raises(Overloaded) as full:
+            await ctl.acquire()
+        assert full.value.reason == "queue_full"
+
+        with pytest.raises(Overloaded) as late:
+            await waiter
+        assert late.value.reason == "deadline"
+
+        ctl.release()
+        async with ctl.slot():
+            assert ctl.active == 1
+        return ctl.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["admitted"], stats["shed_queue_full"], stats["shed_deadline"]) == (2, 1, 1)
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+def test_waiters_that_time_out_or_are_cancelled_never_keep_a_permit():
+    async def scenario():
+        ctl = AdmissionController(max_concurrency=2, max_queue=100, queue_timeout_ms=2)
+        for i in range(200):
+            await ctl.acquire()
+            await ctl.acquire()
+            waiters = [asyncio.create_task(ctl.acquire()) for _ in range(4)]
+            await asyncio.sleep(0.002)  # the releases land around the waiters' deadline
+            ctl.release()
+            ctl.release()
+            if i % 2:
+                waiters[0].cancel()  # the client went away
+            for result in await asyncio.gather(*waiters, return_exceptions=True):
+                if isinstance(result, float):
+                    ctl.release()
+            await asyncio.sleep(0)  # let abandoned acquires hand their permit back
+
+            assert ctl.active == 0 and ctl.waiting == 0
+            assert ctl._sem._value == 2, f"permit lost in round {i}"
+
+    asyncio.run(scenario())
+
+
+def test_micro_batched_predict_is_capped_by_batch_size_not_max_concurrency(api):
+    import anyio.to_thread
+    from fastapi.testclient import TestClient
+
+    main = api
+    row = {"MedInc": 3.0, "HouseAge": 20.0, "AveRooms": 5.0, "AveBedrms": 1.0,
+           "Population": 1000.0, "AveOccup": 3.0, "Latitude": 35.0, "Longitude": -120.0}
+    with TestClient(main.app) as client:
+        stats = client.get("/monitoring/admission").json()
+        assert stats["micro_batched"]["max_concurrency"] == max(
+            stats["max_concurrency"], int(main.micro_batching_cfg["max_batch_size"]))
+
+        assert client.post("/predict", json=row).status_code == 200
+        assert client.get("/monitoring/admission").json()["micro_batched"]["admitted"] >= 1
+
+        tokens = client.portal.call(lambda: anyio.to_thread.current_default_thread_limiter().total_tokens)
+        assert tokens >= stats["max_concurrency"] + stats["micro_batched"]["max_concurrency"]
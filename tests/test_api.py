@@ -0,0 +1,110 @@
+import asyncio
+
+ROW = {"MedInc": 3.0, "HouseAge": 20.0, "AveRooms": 5.0, "AveBedrms": 1.0,
+       "Population": 1000.0, "AveOccup": 3.0, "Latitude": 35.0, "Longitude": -120.0}
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_json_bodies_are_parsed_off_the_event_loop(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = api
+    parse_body = main.parse_body
+    seen = []
+
+    def spy(body, schema, **kwargs):
+        seen.append((schema.__name__, _on_event_loop()))
+        return parse_body(body, schema, **kwargs)
+
+    monkeypatch.setattr(main, "parse_body", spy)
+    with TestClient(main.app) as client:
+        assert client.post("/predict", json=ROW).status_code == 200
+        assert client.post("/predict/batch", json={"records": [ROW, ROW]}).json()["count"] == 2
+
+        bad_json = client.post("/predict", content=b"{not json", headers={"content-type": "application/json"})
+        assert bad_json.status_code == 422 and bad_json.json()["detail"][0]["type"] == "json_invalid"
+        invalid = client.post("/predict/batch", json={"records": [{**ROW, "AveRooms": -1}]})
+        assert invalid.status_code == 422
+        assert invalid.json()["detail"][0]["loc"] == ["body", "records", 0, "AveRooms"]
+
+    assert [name for name, _ in seen] == ["HouseFeatures", "BatchPredictRequest", "HouseFeatures", "BatchPredictRequest"]
+    assert not any(on_loop for _, on_loop in seen)
+
+
+def test_columnar_batches_are_captured_without_per_row_dicts(api, monkeypatch):
+    import io
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    from app.columnar import NPY
+
+    main = api
+    captured = []
+    monkeypatch.setattr(main.live_capture, "capture", lambda rows: captured.append(rows))
+    monkeypatch.setattr(main.live_capture, "capture_matrix", lambda X: captured.append(X))
+
+    buf = io.BytesIO()
+    np.save(buf, np.tile([ROW[c] for c in main.FEATURE_COLUMNS], (3, 1)))
+    with TestClient(main.app) as client:
+        r = client.post("/predict/batch", content=buf.getvalue(), headers={"content-type": NPY})
+        assert r.status_code == 200 and r.headers["X-Row-Count"] == "3"
+
+    assert len(captured) == 1 and isinstance(captured[0], np.ndarray) and captured[0].shape == (3, 8)
+
+
+def test_oversized_json_batches_are_refused_before_validation(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = api
+    monkeypatch.setitem(main.cfg["serving"], "max_request_rows", 3)
+    validated = []
+    validate = main.BatchPredictRequest.model_validate
+    monkeypatch.setattr(main.BatchPredictRequest, "model_validate",
+                        lambda data: validated.append(data["records"]) or validate(data))
+
+    with TestClient(main.app) as client:
+        too_many = client.post("/predict/batch", json={"records": [ROW] * 4})
+        assert too_many.status_code == 413
+        assert client.post("/predict/batch", json={"records": [ROW] * 3}).json()["count"] == 3
+        assert client.post("/predict/batch", json={"records": "nope"}).status_code == 422
+
+    assert validated == [[ROW] * 3, "nope"]  # the oversized batch never reached pydantic
+
+
+def test_predict_reports_the_model_that_scored_it_across_a_hot_swap(api, monkeypatch):
+    from types import SimpleNamespace
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    main = api
+    with TestClient(main.app) as client:
+        expected = client.post("/predict", json=ROW).json()
+        live = main.model_service.current
+        swapped = SimpleNamespace(version="swapped-in", artifact_path="elsewhere", matrix=live.matrix,
+                                  predict_matrix=lambda X: np.full(len(X), -1.0))
+        model_for = main.model_service.model_for
+
+        def resolve_then_swap(version=None):
+            model = model_for(version)
+            main.model_service.swap(swapped)  # lands between resolving and scoring
+            return model
+
+        monkeypatch.setattr(main.model_service, "model_for", resolve_then_swap)
+        try:
+            one = client.post("/predict", json=ROW).json()
+            main.model_service.swap(live)
+            batch = client.post("/predict/batch", json={"records": [ROW]}).json()
+        finally:
+            main.model_service.swap(live)
+
+    assert (one["prediction"], one["model_version"]) == (expected["prediction"], live.version)
+    assert (batch["predictions"], batch["model_version"]) == ([expected["prediction"]], live.version)
@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.capture import LiveRequestCapture
+from src.live_store import load_window
+
+COLUMNS = ["a", "b"]
+
+
+def _rows(n: int) -> list:
+    return [{"a": float(i), "b": float(i) * 2} for i in range(n)]
+
+
+def test_queue_full_policies_drop_at_once_or_after_the_block_timeout(tmp_path):
+    drop = LiveRequestCapture(tmp_path / "drop.csv", COLUMNS, policy="drop", max_queue_size=2)
+    assert drop.capture(_rows(5)) == 2  # writer not started: the queue just fills up
+    assert (drop.stats()["enqueued"], drop.stats()["dropped"]) == (2, 3)
+
+    block = LiveRequestCapture(tmp_path / "block.csv", COLUMNS, policy="block",
+                               max_queue_size=1, block_timeout_ms=50)
+    start = time.perf_counter()
+    assert block.capture(_rows(2)) == 1
+    assert time.perf_counter() - start >= 0.04  # waited for space before dropping
+    assert block.stats()["dropped"] == 1
+
+
+def test_csv_sink_flushes_everything_on_close(tmp_path):
+    path = tmp_path / "live.csv"
+    capture = LiveRequestCapture(path, COLUMNS, sink="csv", flush_interval_s=60, flush_batch_size=1000)
+    capture.start()
+    capture.capture(_rows(3))
+    capture.capture(_rows(2))
+    capture.close()  # well before the flush interval: close must flush what is buffered
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == COLUMNS and len(df) == 5
+    assert capture.stats()["written"] == 5 and capture.stats()["queue_depth"] == 0
+
+
+def test_store_sink_writes_segments_and_survives_a_failing_listener(tmp_path):
+    seen = []
+
+    def broken(rows):
+        raise RuntimeError("listener bug")
+
+    capture = LiveRequestCapture(tmp_path / "live", COLUMNS, sink="store", flush_interval_s=0.01)
+    capture.add_listener(broken)
+    capture.add_listener(seen.extend)
+    capture.start()
+    capture.capture(_rows(4))
+    deadline = time.monotonic() + 5
+    while capture.stats()["written"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    capture.capture(_rows(3))  # the writer thread is still alive after the listener error
+    capture.close()
+
+    stats = capture.stats()
+    assert stats["written"] == 7 and stats["write_errors"] == 0
+    assert stats["listener_errors"] == stats["flushes"] >= 2
+    assert len(seen) == 7
+    assert len(load_window(tmp_path / "live")) == 7
+
+
+def test_matrices_are_captured_as_blocks_within_the_row_bound(tmp_path):
+    capture = LiveRequestCapture(tmp_path / "live", COLUMNS, sink="store", max_queue_size=5, flush_interval_s=60)
+    X = np.arange(8, dtype=float).reshape(4, 2)
+    assert capture.capture_matrix(X) == 4
+    assert capture.capture(_rows(3)) == 1  # the bound counts rows, not batches
+    assert capture.capture_matrix(X) == 0
+    assert capture.stats()["queue_depth"] == 5
+
+    capture.start()
+    capture.close()
+    df = load_window(tmp_path / "live")
+    assert capture.stats()["written"] == 5 and capture.stats()["dropped"] == 6
+    assert sorted(df["a"].tolist()) == [0.0, 0.0, 2.0, 4.0, 6.0]
+
+    csv = LiveRequestCapture(tmp_path / "live.csv", COLUMNS, sink="csv")
+    csv.start()
+    csv.capture_matrix(X[:2])
+    csv.capture(_rows(1))
+    csv.close()
+    assert pd.read_csv(tmp_path / "live.csv").values.tolist() == [[0.0, 1.0], [2.0, 3.0], [0.0, 0.0]]
@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pytest
+
+from app.columnar import NPY, ColumnarError, decode_matrix, encode_predictions, feature_bounds, validate_matrix
+from app.schemas import HouseFeatures
+
+
+COLUMNS = list(HouseFeatures.model_fields)
+
+
+def _valid_rows(n: int) -> np.ndarray:
+    return np.tile([3.0, 20.0, 5.0, 1.0, 1000.0, 3.0, 34.0, -118.0], (n, 1))
+
+
+def test_validate_matrix_uses_schema_bounds_and_reports_indices():
+    X = _valid_rows(6)
+    X[1, COLUMNS.index("HouseAge")] = -1.0
+    X[3, COLUMNS.index("AveRooms")] = 0.0  # gt=0
+    X[3, COLUMNS.index("Latitude")] = 91.0
+    X[5, COLUMNS.index("MedInc")] = np.nan
+
+    n_bad, rejected = validate_matrix(X, COLUMNS, feature_bounds(HouseFeatures))
+
+    assert n_bad == 3
+    assert [r["index"] for r in rejected] == [1, 3, 5]
+    assert rejected[1]["errors"] == ["AveRooms: must be > 0", "Latitude: must be <= 90"]
+
+
+def test_npy_round_trip_and_shape_check():
+    buf = io.BytesIO()
+    np.save(buf, _valid_rows(4))
+    assert decode_matrix(buf.getvalue(), NPY, COLUMNS).shape == (4, 8)
+
+    preds = np.array([1.5, 2.5])
+    assert np.array_equal(np.load(io.BytesIO(encode_predictions(preds, NPY))), preds)
+
+    buf = io.BytesIO()
+    np.save(buf, np.zeros((2, 3)))
+    with pytest.raises(ColumnarError):
+        decode_matrix(buf.getvalue(), NPY, COLUMNS)
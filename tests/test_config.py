@@ -0,0 +1,61 @@
+import os
+import shutil
+
+from src.config import CONFIG_PATH, load_settings, on_config_reload, reload_config, remove_config_reload_hook
+
+
+def test_settings_are_memoized_and_invalidated_on_change(tmp_path):
+    path = tmp_path / "config.yaml"
+    shutil.copy("configs/config.yaml", path)
+
+    first = load_settings(str(path))
+    assert load_settings(str(path)) is first
+
+    reloaded = []
+    on_config_reload(reloaded.append, config_path=str(path))
+    try:
+        path.write_text(path.read_text().replace('level: "INFO"', 'level: "DEBUG"', 1), encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        changed = load_settings(str(path))
+        assert changed is not first
+        assert changed.log_level == "DEBUG"
+        assert reloaded == [changed]
+
+        assert reload_config(str(path)) is not changed
+        assert len(reloaded) == 2
+    finally:
+        remove_config_reload_hook(reloaded.append, config_path=str(path))
+
+
+def test_reload_hooks_only_fire_for_their_config_file(tmp_path):
+    one, two = tmp_path / "one.yaml", tmp_path / "two.yaml"
+    shutil.copy("configs/config.yaml", one)
+    shutil.copy("configs/config.yaml", two)
+    load_settings(str(one))
+    load_settings(str(two))
+
+    fired = []
+
+    @on_config_reload(config_path=str(one))
+    def hook(settings):
+        fired.append(settings)
+
+    try:
+        reload_config(str(two))
+        assert fired == []
+        assert reload_config(str(one)) is fired[0]
+    finally:
+        remove_config_reload_hook(hook, config_path=str(one))
+    reload_config(str(one))
+    assert len(fired) == 1
+
+
+def test_typed_fields_follow_the_config():
+    settings = load_settings(CONFIG_PATH)
+    cfg = settings.cfg
+    assert settings.required_columns == tuple(cfg["validation"]["required_columns"])
+    assert settings.target in settings.required_columns
+    assert settings.feature_columns == tuple(c for c in settings.required_columns if c != settings.target)
+    assert str(settings.preprocess_cache_dir) == cfg["training"]["preprocess_cache_dir"]
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from src.data_loading import cached_dataset, register_dataset
+from src.storage import read_table
+
+
+def test_chunked_csv_ingest_is_cached_and_checksummed(tmp_path):
+    src = tmp_path / "region.csv"
+    df = pd.DataFrame({"a": np.arange(10), "b": [1.5] * 9 + [np.nan]})
+    df.to_csv(src, index=False)
+    dataset_cfg = {"cache_dir": str(tmp_path / "cache"), "csv": {"path": str(src), "chunk_rows": 3}}
+
+    path, meta = cached_dataset("csv", dataset_cfg)
+    assert meta["rows"] == 10
+    back = read_table(path)
+    assert back["a"].dtype == np.float64 and back["b"].isna().sum() == 1
+
+    calls = []
+    register_dataset("test_region")(lambda options: calls.append(options) or df)
+    cfg = {"cache_dir": str(tmp_path / "cache")}
+    first, _ = cached_dataset("test_region", cfg)
+    second, _ = cached_dataset("test_region", cfg)
+    assert first == second and len(calls) == 1
+
+    first.write_bytes(b"corrupt")
+    cached_dataset("test_region", cfg)  # checksum mismatch -> fetched again
+    assert len(calls) == 2
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import get_config
+from src.data_validation import DataValidationError, collect_stats, validate_dataframe, validate_file
+from src.storage import write_table
+
+
+def _frame(n=1200):
+    cfg = get_config()
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({c: rng.normal(size=n) for c in cfg["validation"]["required_columns"]})
+
+
+def test_streaming_validation_matches_in_memory_and_writes_summary(tmp_path):
+    cfg = get_config()
+    df = _frame()
+    df = pd.concat([df, df.head(50)], ignore_index=True)  # 50 duplicate rows
+    df.loc[200:300, "MedInc"] = np.nan
+    path = write_table(df, tmp_path / "raw", "parquet")
+
+    stats = validate_file(path, {**cfg, "validation": {**cfg["validation"], "chunk_rows": 97}}, tmp_path / "summary.json")
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["passed"] and summary["rows"] == len(df)
+    assert summary["duplicate_rows_estimate"] == 50 and summary["duplicates_exact"]
+    assert summary["columns"]["MedInc"]["missing"] == int(df["MedInc"].isna().sum())
+    assert stats.max["HouseAge"] == df["HouseAge"].max()
+
+    # KMV estimate once the sketch is full
+    approx = collect_stats([df.iloc[i:i + 100] for i in range(0, len(df), 100)], sketch_size=256)
+    assert not approx.duplicates_exact
+    assert abs(approx.distinct_rows_estimate - (len(df) - 50)) < 0.25 * len(df)
+
+    df.loc[:400, "MedInc"] = np.nan
+    with pytest.raises(DataValidationError, match="missing threshold"):
+        validate_dataframe(df, cfg)
+    with pytest.raises(DataValidationError, match="missing threshold"):
+        validate_file(write_table(df, tmp_path / "bad", "csv"), cfg, tmp_path / "bad.json")
+    assert json.loads((tmp_path / "bad.json").read_text())["passed"] is False
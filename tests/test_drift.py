@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from app.drift import RollingDriftMonitor, _merge_moments
+from src.drift_profile import build_profile
+
+T0 = 1_000_000.0  # bucket-aligned for window_s=60, n_buckets=6
+
+
+def _monitor(**kwargs) -> RollingDriftMonitor:
+    rng = np.random.default_rng(0)
+    baseline = pd.DataFrame({"a": rng.normal(0, 1, 5000), "b": rng.uniform(0, 10, 5000)})
+    profile = build_profile(baseline, ["a", "b"], n_bins=10)
+    return RollingDriftMonitor(profile, window_s=60, n_buckets=6, **kwargs)
+
+
+def test_chan_merge_matches_direct_moments():
+    rng = np.random.default_rng(1)
+    blocks = [rng.normal(3, 2, size=(n, 2)) for n in (1, 7, 50, 200)]
+    n, mean, m2 = np.zeros(2), np.zeros(2), np.zeros(2)
+    for X in blocks:
+        mu = X.mean(axis=0)
+        n, mean, m2 = _merge_moments(n, mean, m2, np.full(2, len(X), dtype=float), mu, ((X - mu) ** 2).sum(axis=0))
+
+    everything = np.vstack(blocks)
+    np.testing.assert_allclose(mean, everything.mean(axis=0))
+    np.testing.assert_allclose(m2 / n, everything.var(axis=0))
+
+    monitor = _monitor(min_rows=1)
+    for i, X in enumerate(blocks):  # spread over several time slices
+        monitor.update(X, now=T0 + i * 10)
+    snap = monitor.snapshot(now=T0 + 35)
+    assert snap["rows"] == len(everything)
+    assert np.isclose(snap["features"]["a"]["mean"], everything[:, 0].mean())
+    assert np.isclose(snap["features"]["b"]["std"], everything[:, 1].std())
+
+
+def test_buckets_older_than_the_window_expire():
+    monitor = _monitor(min_rows=1)
+    monitor.update(np.full((5, 2), 1.0), now=T0)          # slice 0
+    monitor.update(np.full((3, 2), 2.0), now=T0 + 30)     # slice 3
+
+    assert monitor.snapshot(now=T0 + 59)["rows"] == 8
+    after = monitor.snapshot(now=T0 + 61)                  # slice 0 has left the 60 s window
+    assert after["rows"] == 3 and after["buckets"] == 1
+    assert after["features"]["a"]["mean"] == 2.0
+    assert monitor.snapshot(now=T0 + 200)["rows"] == 0
+
+
+def test_min_rows_gates_drift_detection():
+    monitor = _monitor(min_rows=100, drift_threshold_share=0.5)
+    shifted = np.column_stack([np.full(60, 8.0), np.full(60, 50.0)])  # far outside the baseline
+
+    monitor.update(shifted)
+    snap = monitor.snapshot()
+    assert snap["share_of_drifted_columns"] == 1.0
+    assert snap["insufficient_data"] and not snap["drift_detected"]
+
+    monitor.update(shifted)
+    snap = monitor.snapshot()
+    assert not snap["insufficient_data"] and snap["drift_detected"]
+
+
+def test_observe_buffers_rows_until_a_flush():
+    monitor = _monitor(min_rows=1, flush_rows=10, flush_interval_s=3600)
+    for i in range(9):
+        monitor.observe([{"a": 0.0, "b": float(i)}])
+    assert monitor._pending_rows == 9 and not monitor._buckets  # nothing binned yet
+
+    monitor.observe(np.zeros((1, 2)))  # the 10th row triggers the flush
+    assert monitor._pending_rows == 0
+    monitor.observe([{"a": 0.0, "b": 1.0}])
+    assert monitor.snapshot()["rows"] == 11  # snapshots flush what is pending
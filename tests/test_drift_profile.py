@@ -0,0 +1,22 @@
+from src.config import load_settings
+from src.datasets import load_split
+from src.drift_profile import OnlineDriftEngine, build_profile
+
+
+def test_online_drift_engine_flags_shifted_features_only():
+    baseline = load_split("train", columns=list(load_settings().feature_columns))
+    profile = build_profile(baseline, list(baseline.columns), n_bins=20)
+
+    engine = OnlineDriftEngine(profile, method="psi", psi_threshold=0.2)
+    live = baseline.sample(3000, random_state=0)
+    for start in range(0, len(live), 500):  # incremental updates
+        engine.update(live.iloc[start:start + 500])
+    assert engine.drift()["share_of_drifted_columns"] == 0.0
+
+    engine.reset()
+    shifted = live.copy()
+    shifted["MedInc"] = shifted["MedInc"] * 1.5
+    engine.update(shifted)
+    result = engine.drift()
+    assert result["features"]["MedInc"]["drifted"]
+    assert result["number_of_drifted_columns"] == 1
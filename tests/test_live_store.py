@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from src.live_store import apply_retention, compact, list_partitions, load_window, partition_dir, write_segment
+
+T0 = datetime(2024, 3, 1, 22, 30, tzinfo=timezone.utc)
+
+
+def _frame(start: int, n: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({"x": [float(i) for i in range(start, start + n)]})
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_segments_land_in_hourly_partitions_and_windows_span_them(tmp_path, fmt):
+    for h in range(4):  # 22:30, 23:30, 00:30 (next date), 01:30
+        write_segment(_frame(10 * h), tmp_path, fmt, ts=T0 + timedelta(hours=h))
+    write_segment(_frame(100), tmp_path, fmt, ts=T0 + timedelta(minutes=10))
+
+    hours = [ts for ts, _ in list_partitions(tmp_path)]
+    assert hours == [datetime(2024, 3, 1, 22, tzinfo=timezone.utc) + timedelta(hours=h) for h in range(4)]
+    assert partition_dir(tmp_path, T0).relative_to(tmp_path).as_posix() == "date=2024-03-01/hour=22"
+
+    # 23:15 .. 00:45 crosses the date boundary and overlaps the 23:00 and 00:00 partitions
+    window = load_window(tmp_path, fmt, since=T0 + timedelta(minutes=45), until=T0 + timedelta(hours=2, minutes=15))
+    assert sorted(window["x"]) == [10.0, 11.0, 12.0, 20.0, 21.0, 22.0]
+    assert len(load_window(tmp_path, fmt)) == 15
+
+
+def test_compaction_merges_closed_hours_only(tmp_path):
+    for i in range(3):
+        write_segment(_frame(i * 3), tmp_path, ts=T0)
+    for i in range(2):
+        write_segment(_frame(50 + i * 3), tmp_path, ts=T0 + timedelta(hours=1))
+
+    # "now" is inside the second hour, which workers may still be writing to
+    assert compact(tmp_path, now=T0 + timedelta(hours=1)) == 1
+    closed, current = [part for _, part in list_partitions(tmp_path)]
+    assert len(list(closed.glob("*.parquet"))) == 1
+    assert len(list(current.glob("*.parquet"))) == 2
+    assert sorted(load_window(tmp_path)["x"]) == [float(i) for i in range(9)] + [float(i) for i in range(50, 56)]
+
+
+def test_retention_deletes_expired_partitions_and_empty_dates(tmp_path):
+    for h in range(4):
+        write_segment(_frame(h), tmp_path, ts=T0 + timedelta(hours=h))
+
+    # cutoff 00:30 on the next day: the 22:00 and 23:00 partitions have ended before it
+    removed = apply_retention(tmp_path, retention_hours=2, now=T0 + timedelta(hours=4))
+    assert removed == 2
+    assert not (tmp_path / "date=2024-03-01").exists()
+    assert [ts.hour for ts, _ in list_partitions(tmp_path)] == [0, 1]
+
+
+def test_compaction_is_committed_by_one_rename_and_survives_a_crash(tmp_path, monkeypatch):
+    import os
+    from src import live_store
+
+    for i in range(3):
+        write_segment(_frame(i * 3), tmp_path, ts=T0)
+    expected = [float(i) for i in range(9)]
+    seen = []
+    replace = os.replace
+
+    def crash_after_commit(src, dst):
+        seen.append(sorted(load_window(tmp_path)["x"]))  # a reader racing each step
+        replace(src, dst)
+        if str(dst).endswith(".parquet") and os.path.basename(dst).startswith("compacted-"):
+            raise KeyboardInterrupt  # killed before any source was unlinked
+
+    monkeypatch.setattr(live_store.os, "replace", crash_after_commit)
+    with pytest.raises(KeyboardInterrupt):
+        compact(tmp_path, now=T0 + timedelta(hours=1))
+    monkeypatch.setattr(live_store.os, "replace", replace)
+
+    assert seen and all(s == expected for s in seen)
+    (part,) = [part for _, part in list_partitions(tmp_path)]
+    assert len(list(part.glob("part-*.parquet"))) == 3  # left behind, but hidden
+    assert sorted(load_window(tmp_path)["x"]) == expected
+
+    compact(tmp_path, now=T0 + timedelta(hours=1))  # the next run finishes the cleanup
+    assert [p.name.startswith("compacted-") for p in part.iterdir()] == [True]
+    assert sorted(load_window(tmp_path)["x"]) == expected
+
+
+def test_segments_merged_away_mid_read_are_reread_not_lost(tmp_path, monkeypatch):
+    from src import live_store
+
+    for i in range(3):
+        write_segment(_frame(i * 3), tmp_path, ts=T0)
+    read = live_store._read
+    calls = []
+
+    def read_then_compact(path, fmt, columns=None):
+        calls.append(path.name)
+        if len(calls) == 2:
+            compact(tmp_path, now=T0 + timedelta(hours=1))  # merges and unlinks what we are reading
+        return read(path, fmt, columns)
+
+    monkeypatch.setattr(live_store, "_read", read_then_compact)
+    assert sorted(load_window(tmp_path)["x"]) == [float(i) for i in range(9)]
+    assert calls[-1].startswith("compacted-")
+
+
+def test_drift_window_never_reads_the_unwindowed_legacy_csv(tmp_path):
+    from src.check_drift_and_retrain import load_live_window
+
+    legacy = tmp_path / "live_requests.csv"
+    _frame(0, 1000).to_csv(legacy, index=False)  # months of traffic, no timestamps
+    cfg = {"monitoring": {"live_file": str(legacy),
+                          "live_store": {"dir": str(tmp_path / "live"), "format": "parquet"}}}
+    assert len(load_live_window(cfg, window_hours=6)) == 0
+
+    write_segment(_frame(0), tmp_path / "live")
+    write_segment(_frame(100), tmp_path / "live", ts=datetime.now(timezone.utc) - timedelta(hours=12))
+    assert sorted(load_live_window(cfg, window_hours=6)["x"]) == [0.0, 1.0, 2.0]
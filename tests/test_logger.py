@@ -0,0 +1,81 @@
+import io
+import json
+import logging
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from src.logger import AsyncQueueHandler, JsonFormatter
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _handler():
+    out = io.StringIO()
+    stream = logging.StreamHandler(out)
+    stream.setFormatter(JsonFormatter())
+    return AsyncQueueHandler(stream), out
+
+
+def _logger(name: str, handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel("INFO")
+    logger.propagate = False
+    return logger
+
+
+def test_json_records_keep_fields_and_a_separate_traceback():
+    handler, out = _handler()
+    log = _logger("test_logger.fields", handler)
+    log.info("[bold green]✅ scored[/bold green] %d rows", 3, extra={"fields": {"status": 200, "duration_ms": 1.5}})
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        log.exception("scoring failed")
+    handler.close()
+
+    ok, err = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {"ts", "level", "logger", "pid"} <= set(ok)
+    assert ok["msg"] == "✅ scored 3 rows" and ok["level"] == "INFO" and ok["logger"] == "test_logger.fields"
+    assert (ok["status"], ok["duration_ms"]) == (200, 1.5)
+
+    assert err["msg"] == "scoring failed"  # the traceback is not merged into the message
+    assert err["exc"].startswith("Traceback") and "ZeroDivisionError" in err["exc"]
+
+
+def test_concurrent_first_emits_start_one_listener_and_lose_nothing():
+    handler, out = _handler()
+    log = _logger("test_logger.threads", handler)
+    barrier = threading.Barrier(16)
+
+    def burst(i):
+        barrier.wait()
+        for j in range(50):
+            log.info(f"{i}-{j}")
+
+    threads = [threading.Thread(target=burst, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    listener = None
+    for t in threads:
+        t.join()
+        listener = listener or handler._listener
+    assert handler._listener is listener
+    handler.close()
+
+    assert len(out.getvalue().splitlines()) == 16 * 50
+
+
+def test_queued_records_are_flushed_at_interpreter_exit():
+    script = (
+        "from src.logger import get_logger\n"
+        "log = get_logger('exit_flush', 'INFO', 'json')\n"
+        "for i in range(2000):\n"
+        "    log.info(f'record {i}')\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    lines = out.stdout.splitlines()
+    assert len(lines) == 2000 and json.loads(lines[-1])["msg"] == "record 1999"
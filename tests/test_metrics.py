@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Multiprocess mode is chosen when prometheus_client is imported, so the app runs in a fresh interpreter.
+SCRIPT = textwrap.dedent("""
+    import sys
+
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.capture import LiveRequestCapture
+    from app.main import app, model_service
+
+    # captured rows go to the test's temp dir, not the real drift input
+    main.live_capture = LiveRequestCapture(path=sys.argv[1], columns=main.FEATURE_COLUMNS, sink="store")
+
+    row = {"MedInc": 3.0, "HouseAge": 20.0, "AveRooms": 5.0, "AveBedrms": 1.0,
+           "Population": 1000.0, "AveOccup": 3.0, "Latitude": 35.0, "Longitude": -120.0}
+    with TestClient(app) as client:
+        for i in range(3):
+            # a hot reload between requests: the live model gets a new local-<mtime> version each time
+            live = model_service.current
+            model_service.swap(model_service.build_model(live.artifact_path, version=f"local-{i}", pipe=live.pipe))
+            assert client.post("/predict", json={**row, "MedInc": 3.0 + i}).status_code == 200
+        print("--- metrics ---")
+        print(client.get("/metrics").text)
+""")
+
+
+def test_metrics_render_in_multiprocess_mode_with_bounded_model_labels(tmp_path):
+    prom_dir = tmp_path / "prometheus"
+    prom_dir.mkdir()
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(prom_dir)}
+    out = subprocess.run([sys.executable, "-c", SCRIPT, str(tmp_path / "live")], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr[-2000:]
+    body = out.stdout.split("--- metrics ---\n", 1)[1]  # JSON logs go to stdout too
+
+    assert any(p.name.startswith("counter_") for p in prom_dir.iterdir())  # samples went to the mmap'd files
+    assert 'house_api_predictions_total{model="live",route="/predict"} 3.0' in body
+    assert "local-" not in body  # reloads add no series
+    assert "house_api_live_model_loaded_timestamp_seconds{" in body
+    assert 'house_api_stage_duration_seconds_count{stage="predict"}' in body
+    assert list((tmp_path / "live").rglob("*.parquet"))  # captured rows land under tmp_path
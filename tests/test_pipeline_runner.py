@@ -0,0 +1,125 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import load_settings
+from src.pipeline import Runner, Stage, build_stages, code_files, upstream
+
+
+def test_stage_graph_and_code_dependencies():
+    deps = upstream(build_stages(load_settings()))
+    assert deps["split"] == ["data_loading"]
+    assert deps["evaluate"] == ["split", "train"]
+    assert deps["monitoring_baseline"] == ["split"]  # independent of train/evaluate: runs in parallel
+
+    names = {p.name for p in code_files("train")}
+    assert {"train.py", "features.py", "datasets.py", "storage.py", "compile_model.py"} <= names
+    assert "live_store.py" not in names
+
+
+# Runner tests on stub stages: python -m stubstages.<module>, written to a temp dir
+
+COMMON = """
+from pathlib import Path
+
+ROOT = Path({root!r})
+
+
+def record(name):
+    with (ROOT / "runs.log").open("a", encoding="utf-8") as f:
+        f.write(name + "\\n")
+"""
+
+STUB = """
+import sys
+from .common import ROOT, record
+
+record({name!r})
+text = (ROOT / {src!r}).read_text(encoding="utf-8")
+{body}
+"""
+
+
+@pytest.fixture
+def stub_pipeline(tmp_path, monkeypatch):
+    pkg = tmp_path / "stubstages"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "common.py").write_text(COMMON.format(root=str(tmp_path)))
+    bodies = {
+        "clean": ("raw.txt", "(ROOT / 'clean.txt').write_text(text.strip(), encoding='utf-8')"),
+        "count": ("clean.txt", "(ROOT / 'count.txt').write_text(str(len(text)), encoding='utf-8')"),
+        "boom": ("clean.txt", "sys.exit(3)"),
+        "after_boom": ("boom.txt", "(ROOT / 'after.txt').write_text(text, encoding='utf-8')"),
+    }
+    for name, (src, body) in bodies.items():
+        (pkg / f"{name}.py").write_text(STUB.format(name=name, src=src, body=body))
+    (tmp_path / "raw.txt").write_text("abc\n")
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+
+    stages = {s.name: s for s in [
+        Stage("clean", "clean", ["params.clean"], inputs=[tmp_path / "raw.txt"], outputs=[tmp_path / "clean.txt"]),
+        Stage("count", "count", ["params.count"], inputs=[tmp_path / "clean.txt"], outputs=[tmp_path / "count.txt"]),
+        Stage("boom", "boom", [], inputs=[tmp_path / "clean.txt"], outputs=[tmp_path / "boom.txt"]),
+        Stage("after_boom", "after_boom", [], inputs=[tmp_path / "boom.txt"], outputs=[tmp_path / "after.txt"]),
+    ]}
+    settings = SimpleNamespace(cfg={"params": {"clean": 1, "count": 1}})
+
+    def run(*targets, force=False):
+        (tmp_path / "runs.log").unlink(missing_ok=True)
+        runner = Runner(settings, stages, tmp_path / "state", logging.getLogger("test_pipeline"),
+                        jobs=2, force=force, package="stubstages", src_dir=pkg)
+        results = runner.run(list(targets))
+        log = tmp_path / "runs.log"
+        ran = sorted(log.read_text().split()) if log.exists() else []
+        return results, ran
+
+    return SimpleNamespace(root=tmp_path, pkg=pkg, settings=settings, run=run)
+
+
+def test_runner_skips_up_to_date_stages_and_reruns_on_config_code_or_input_change(stub_pipeline):
+    p = stub_pipeline
+    results, ran = p.run("count")
+    assert ran == ["clean", "count"] and (p.root / "count.txt").read_text() == "3"
+    assert all(r.startswith("ran in") for r in results.values())
+
+    assert p.run("count") == ({"clean": "skipped", "count": "skipped"}, [])
+    assert p.run("count", force=True)[1] == ["clean", "count"]
+
+    p.settings.cfg["params"]["count"] = 2        # config key of the downstream stage only
+    assert p.run("count")[1] == ["count"]
+
+    (p.pkg / "count.py").write_text((p.pkg / "count.py").read_text() + "\n# edited\n")
+    assert p.run("count")[1] == ["count"]        # its own code
+    (p.pkg / "common.py").write_text((p.pkg / "common.py").read_text() + "\n# edited\n")
+    assert p.run("count")[1] == ["clean", "count"]  # a module both import
+
+    (p.root / "raw.txt").write_text("abcd\n")    # input content
+    assert p.run("count")[1] == ["clean", "count"]
+    assert (p.root / "count.txt").read_text() == "4"
+
+    (p.root / "count.txt").write_text("tampered")  # an output changed behind the runner's back
+    assert p.run("count")[1] == ["count"]
+
+
+def test_identical_rewritten_outputs_do_not_invalidate_downstream(stub_pipeline):
+    p = stub_pipeline
+    p.run("count")
+    (p.root / "raw.txt").write_text("abc   \n")   # clean.txt comes out byte-identical
+    results, ran = p.run("count")
+    assert ran == ["clean"]
+    assert results["count"] == "skipped"
+
+
+def test_a_failed_stage_stops_its_downstream_and_is_retried_next_run(stub_pipeline):
+    p = stub_pipeline
+    results, ran = p.run("after_boom", "count")
+    assert results["boom"] == "failed: Stage boom failed with exit code 3"
+    assert results["after_boom"] == "not run (upstream failed)"
+    assert results["clean"].startswith("ran in")
+    assert "after_boom" not in ran
+    assert not (p.root / "state" / "boom.json").exists()
+
+    results, ran = p.run("after_boom")
+    assert results["clean"] == "skipped" and ran == ["boom"]
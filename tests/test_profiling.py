@@ -0,0 +1,80 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from app.profiling import RequestProfiler, StackSampler
+
+
+def test_stack_sampler_runs_once_and_writes_collapsed_stacks(tmp_path):
+    sampler = StackSampler(str(tmp_path), interval_ms=1, max_seconds=5)
+    stop = threading.Event()
+    busy = threading.Thread(target=stop.wait, name="busy-worker", daemon=True)
+    busy.start()
+
+    path = sampler.start(0.2)
+    assert sampler.running
+    with pytest.raises(RuntimeError):
+        sampler.start(0.2)  # one run at a time
+
+    deadline = time.monotonic() + 10
+    while sampler.running and time.monotonic() < deadline:
+        time.sleep(0.02)
+    stop.set()
+    assert not sampler.running
+
+    last = sampler.stats()["last"]
+    assert last["path"] == str(path) and last["samples"] > 0
+    lines = path.read_text().splitlines()
+    assert len(lines) == last["stacks"]
+    assert any(line.startswith("busy-worker;") for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    sampler.start(0.1)  # a finished run frees the sampler
+    sampler._thread.join(timeout=10)
+    assert not sampler.running
+
+
+def test_request_profiler_merges_sampled_calls_into_one_pstats_file(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), sample_rate=1.0, dump_every=2)
+    assert [profiler.call(sum, [i, 1]) for i in range(3)] == [1, 2, 3]
+    profiler.close()
+
+    stats = profiler.stats()
+    assert stats["profiled_requests"] == 3
+    assert len(list(tmp_path.glob("requests-*.pstats"))) == 1
+    assert pstats.Stats(stats["path"]).total_calls > 0
+
+    off = RequestProfiler(str(tmp_path / "off"), sample_rate=0.0)
+    assert off.call(sum, [1, 2]) == 3 and off.stats()["profiled_requests"] == 0
+
+
+@pytest.mark.parametrize("route", [("post", "/admin/profile"), ("get", "/admin/profile"), ("post", "/admin/config/reload")])
+def test_admin_endpoints_need_the_admin_token(api, monkeypatch, route):
+    from fastapi.testclient import TestClient
+
+    main = api
+
+    method, path = route
+    client = TestClient(main.app)
+    env = str(main.profiling_cfg["admin_token_env"])
+
+    monkeypatch.delenv(env, raising=False)
+    assert getattr(client, method)(path, headers={"X-Admin-Token": "anything"}).status_code == 404  # off
+
+    monkeypatch.setenv(env, "s3cret")
+    assert getattr(client, method)(path).status_code == 403
+    assert getattr(client, method)(path, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_admin_profile_status_with_the_token(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = api
+
+    monkeypatch.setenv(str(main.profiling_cfg["admin_token_env"]), "s3cret")
+    body = TestClient(main.app).get("/admin/profile", headers={"X-Admin-Token": "s3cret"}).json()
+    assert set(body) == {"pid", "sampler", "requests"}
+    assert body["sampler"]["running"] is False
@@ -0,0 +1,379 @@
+import pandas as pd
+
+from app.service import ModelService
+from src.config import load_settings
+from src.datasets import load_split
+
+
+def _features(n: int) -> pd.DataFrame:
+    return load_split("train", columns=list(load_settings().feature_columns)).head(n)
+
+
+def _sample_records(n: int) -> list:
+    return _features(n).to_dict(orient="records")
+
+
+def test_predict_batch_matches_predict_one_in_order():
+    service = ModelService()
+    service.load()
+    service._max_batch_size = 7  # force several sub-batches
+
+    records = _sample_records(25)
+    preds = service.predict_batch(records)
+
+    assert len(preds) == len(records)
+    for rec, pred in zip(records, preds):
+        assert abs(service.predict_one(rec) - pred) < 1e-9
+
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.service import MicroBatcher
+
+    calls = []
+
+    def predict_fn(rows, model):
+        calls.append(len(rows))
+        return [r["x"] * 2.0 for r in rows]
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=16, max_wait_ms=50)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda i: batcher.submit({"x": float(i)}), range(32)))
+    finally:
+        batcher.stop()
+
+    assert results == [i * 2.0 for i in range(32)]
+    assert sum(calls) == 32
+    assert len(calls) < 32
+    assert batcher.stats()["rows"] == 32
+
+
+def test_rows_are_scored_by_the_model_they_were_resolved_against():
+    import threading
+    from types import SimpleNamespace
+    import numpy as np
+
+    service = ModelService()
+    service.load()  # micro-batching on
+    old = service.current
+    new = SimpleNamespace(version="new", matrix=old.matrix, predict_matrix=lambda X: np.full(len(X), -1.0))
+    record = _sample_records(1)[0]
+    expected = service.predict_one(record)
+    try:
+        # the request resolved `old`, then a hot swap landed before it was scored
+        service.swap(new)
+        assert service.predict_one(record, model=old) == expected
+        assert service.predict_batch([record], model=old) == [expected]
+
+        results = {}
+        start = threading.Barrier(2)
+
+        def score(name, model):
+            start.wait()
+            results[name] = service.predict_one(record, model=model)
+
+        threads = [threading.Thread(target=score, args=a) for a in (("old", old), ("new", new))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == {"old": expected, "new": -1.0}  # may share a micro-batch, never a model
+    finally:
+        service.close()
+
+
+def test_micro_batcher_stop_fails_queued_rows_instead_of_hanging():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import pytest
+    from app.service import MicroBatcher
+
+    release = threading.Event()
+
+    def predict_fn(rows, model):
+        release.wait(5)  # the first batch holds the thread while more rows queue up
+        return [0.0] * len(rows)
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=1, max_wait_ms=0, result_timeout_s=5)
+    batcher.start()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(batcher.submit, {"x": i}) for i in range(4)]
+        while batcher.stats()["queue_depth"] < 3:
+            time.sleep(0.001)
+        batcher.stop(timeout=0.05)
+        release.set()
+        errors = [f.exception(timeout=5) for f in futures]
+
+    assert sum(isinstance(e, RuntimeError) for e in errors) == 3  # queued behind the stuck batch
+    with pytest.raises(RuntimeError):
+        batcher.submit({"x": 0})  # after stop: rejected, not queued forever
+
+    slow = MicroBatcher(lambda rows, model: time.sleep(0.3) or [0.0] * len(rows), result_timeout_s=0.05)
+    slow.start()
+    with pytest.raises(TimeoutError):
+        slow.submit({"x": 0})
+    slow.stop()
+
+
+def _nan_matrix(df: pd.DataFrame):
+    import numpy as np
+
+    X = df.to_numpy(dtype=float)
+    X[::5, 2] = np.nan  # exercise the imputer
+    return X
+
+
+def test_fast_path_matches_pipeline_exactly():
+    import joblib
+    import numpy as np
+    from app.fast_path import build_fast_path
+
+    pipe = joblib.load("models/pipeline.joblib")
+    df = _features(500)
+    X = _nan_matrix(df)
+
+    fast = build_fast_path(pipe, list(df.columns))
+    expected = pipe.predict(pd.DataFrame(X, columns=df.columns))
+    assert np.array_equal(fast.predict(X), expected)
+
+
+def test_compiled_model_matches_pipeline(tmp_path):
+    import joblib
+    import numpy as np
+    from src.compile_model import compile_pipeline, save_compiled
+    from src.compiled_model import load_compiled
+
+    pipe = joblib.load("models/pipeline.joblib")
+    df = _features(500)
+    X = _nan_matrix(df)
+
+    save_compiled(compile_pipeline(pipe, list(df.columns)), tmp_path / "model.npz")
+    compiled = load_compiled(tmp_path / "model.npz", mmap=True)
+
+    expected = pipe.predict(pd.DataFrame(X, columns=df.columns))
+    assert np.allclose(compiled.predict(X), expected, rtol=0, atol=1e-9)
+
+
+def test_compiled_export_is_verified_before_it_replaces_the_live_artifact(tmp_path, monkeypatch):
+    import logging
+    from types import SimpleNamespace
+
+    import joblib
+    import pytest
+    from src import compile_model
+
+    pipe = joblib.load("models/pipeline.joblib")
+    X_check = _features(200)
+    settings = SimpleNamespace(models_dir=tmp_path, feature_columns=tuple(X_check.columns))
+    cfg = {"training": {"compile": {"enabled": True, "save_as": "model.npz", "atol": 1e-6}}}
+    live = tmp_path / "model.npz"
+    live.write_bytes(b"previous artifact")
+
+    check = compile_model.check_equivalence
+    during_check = []
+
+    def spy(pipe, compiled, X):
+        during_check.append(live.read_bytes())
+        return check(pipe, compiled, X)
+
+    monkeypatch.setattr(compile_model, "check_equivalence", spy)
+    log = logging.getLogger("test_compile")
+    assert compile_model.export_compiled(pipe, cfg, settings, log, X_check=X_check) == live
+    assert during_check == [b"previous artifact"]  # verified while the old file was still in place
+    assert live.read_bytes() != b"previous artifact"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.npz"]  # no staging file left
+
+    monkeypatch.setattr(compile_model, "check_equivalence", lambda pipe, compiled, X: 1.0)
+    with pytest.raises(ValueError):
+        compile_model.export_compiled(pipe, cfg, settings, log, X_check=X_check)
+    assert list(tmp_path.iterdir()) == []  # neither the unverified file nor the stale one
+
+
+def test_reloader_rejects_bad_artifact_and_swaps_good_one(tmp_path, monkeypatch):
+    import os
+    import shutil
+    from app.reloader import ModelReloader, canary_batch
+
+    service = ModelService()
+    service.load()
+    artifact = tmp_path / "pipeline.joblib"
+    shutil.copy("models/pipeline.joblib", artifact)
+    monkeypatch.setattr(service, "resolve_artifact", lambda: artifact)
+
+    canary = canary_batch("data/monitoring/baseline_profile.json", service.feature_columns)
+    reloader = ModelReloader(service, canary=canary)
+    reloader._seen = reloader._mtime_signature()
+    assert not reloader.check_once()
+
+    live = service.current
+    artifact.write_bytes(b"not a model")
+    assert not reloader.check_once()
+    assert service.current is live
+    assert reloader.stats()["rejected"] == 1
+
+    shutil.copy("models/pipeline.joblib", artifact)
+    os.utime(artifact, ns=(1, 10**18))
+    assert reloader.check_once()
+    assert service.current is not live
+    assert service.model_version == f"local-{10**18}"
+    assert reloader.stats()["reloads"] == 1
+
+
+def test_model_cache_lru_budget_and_pinning():
+    from types import SimpleNamespace
+    from app.model_cache import ModelCache
+
+    loads = []
+
+    def loader(version):
+        loads.append(version)
+        return SimpleNamespace(version=version, model_format="joblib", nbytes=100)
+
+    cache = ModelCache(loader, max_models=2, max_bytes=250, pinned=["1"])
+    cache.get("1")
+    cache.get("2")
+    cache.get("2")
+    cache.get("3")  # over both budgets: "2" is the LRU unpinned entry
+    assert cache.versions() == ["1", "3"]
+
+    cache.get("1")
+    assert loads == ["1", "2", "3"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+
+
+def test_model_cache_loads_each_version_once_off_the_request_thread():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    import pytest
+    from app.model_cache import ModelCache, ModelLoading
+
+    release = threading.Event()
+    loads = []
+
+    def slow_loader(version):
+        loads.append(version)
+        release.wait(5)  # a registry download
+        return SimpleNamespace(version=version, model_format="joblib", nbytes=1)
+
+    cache = ModelCache(slow_loader, load_timeout_s=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        waits = [pool.submit(cache.get, "7") for _ in range(8)]
+        errors = [f.exception(timeout=5) for f in waits]
+    assert all(isinstance(e, ModelLoading) for e in errors)  # requests gave up, the load did not
+    assert loads == ["7"] and cache.stats()["loading"] == ["7"]
+
+    release.set()
+    assert cache.load("7").version == "7"
+    assert cache.get("7").version == "7" and loads == ["7"]
+
+    failing = ModelCache(lambda v: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing.get("1")
+    assert failing.stats()["load_errors"] == 1 and failing.stats()["loading"] == []
+
+
+def test_shadow_scorer_aggregates_differences_per_version_pair():
+    from types import SimpleNamespace
+    import numpy as np
+    from app.shadow import ShadowScorer
+
+    shadow_model = SimpleNamespace(
+        version="m/2",
+        matrix=lambda rows: np.array([[r["x"]] for r in rows]),
+        predict_matrix=lambda X: X[:, 0] + 1.0,
+    )
+    service = SimpleNamespace(model_for=lambda version: shadow_model)
+
+    scorer = ShadowScorer(service, "challenger", batch_size=4, flush_interval_s=0.05, alert_abs_diff=0.5)
+    scorer.start()
+    rows = [{"x": float(i)} for i in range(10)]
+    scorer.submit(rows[:6], [r["x"] for r in rows[:6]], "m/1")
+    X = np.array([[r["x"]] for r in rows[6:]])
+    scorer.submit_matrix(X, ["x"], X[:, 0] + 2.0, "m/3")  # columnar requests
+    scorer.close()
+
+    stats = scorer.stats()
+    by_primary = {c["primary_version"]: c for c in stats["comparisons"]}
+    assert stats["enqueued"] == 10 and stats["errors"] == 0
+    assert by_primary["m/1"]["rows"] == 6 and by_primary["m/1"]["mean_diff"] == 1.0
+    assert by_primary["m/3"]["mean_diff"] == -1.0 and by_primary["m/3"]["share_over_threshold"] == 1.0
+
+
+def test_prediction_cache_hits_and_invalidates_on_model_swap():
+    service = ModelService()
+    service.load()
+    service.close()  # score inline, no micro-batcher
+
+    record = _sample_records(1)[0]
+    first = service.predict_one(record)
+    nudged = {k: v + 1e-9 for k, v in record.items()}  # equal after rounding
+    assert service.predict_one(nudged) == first
+    stats = service.prediction_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    service.swap(service.current)
+    assert service.prediction_cache_stats()["size"] == 0
+
+
+def test_every_prediction_reaches_the_row_observer_once():
+    service = ModelService()
+    service.load()  # micro-batching on: batched predict_one rows must not be counted twice
+    seen = []
+    service.set_row_observer(lambda rows: seen.append(len(rows)))
+    try:
+        records = _sample_records(5)
+        service.predict_one(records[0])
+        service.predict_one(records[0])  # prediction cache hit: still live traffic
+        service.predict_batch(records)
+        service.predict_matrix(service.current.matrix(records[:3]))
+    finally:
+        service.close()
+    assert seen == [1, 1, 5, 3]
+
+
+def test_reloader_never_sees_a_half_written_artifact(tmp_path, monkeypatch):
+    import threading
+    import time
+    import joblib
+    import numpy as np
+    from app.reloader import ModelReloader, canary_batch
+    from src.training import save_pipeline
+
+    service = ModelService()
+    service.load()
+    service.close()
+    pipe = joblib.load("models/pipeline.joblib")
+    artifact = save_pipeline(pipe, tmp_path / "pipeline.joblib")
+    monkeypatch.setattr(service, "resolve_artifact", lambda: artifact)
+    service.swap(service.build_model(artifact))  # memory-mapped from the file being rewritten
+
+    canary = canary_batch("data/monitoring/baseline_profile.json", service.feature_columns)
+    expected = service.current.predict_matrix(canary)
+    reloader = ModelReloader(service, canary=canary)
+    reloader._seen = reloader._mtime_signature()
+
+    stop = threading.Event()
+
+    def retrain():
+        while not stop.is_set():
+            save_pipeline(pipe, artifact)
+
+    writer = threading.Thread(target=retrain)
+    writer.start()
+    try:
+        deadline = time.monotonic() + 30
+        while reloader.stats()["reloads"] < 3 and time.monotonic() < deadline:
+            reloader.check_once()
+            np.testing.assert_array_equal(service.current.predict_matrix(canary), expected)
+    finally:
+        stop.set()
+        writer.join()
+
+    stats = reloader.stats()
+    assert stats["rejected"] == 0, stats["last_error"]
+    assert stats["reloads"] == 3
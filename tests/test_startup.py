@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+def _wait_for(predicate, timeout_s: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_worker_is_live_but_not_ready_while_warming_up(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = api
+
+    release = threading.Event()
+    warming = threading.Event()
+
+    def slow_warm_up(X, iterations=1):
+        warming.set()
+        assert release.wait(30)
+        return 0.0
+
+    monkeypatch.setattr(main.model_service, "warm_up", slow_warm_up)
+    monkeypatch.setitem(main.warmup_cfg, "enabled", True)
+
+    with TestClient(main.app) as client:  # startup returns without waiting for the warm-up
+        assert warming.wait(30)
+        assert client.get("/health/live").status_code == 200
+        health = client.get("/health")
+        assert health.status_code == 200 and health.json()["ready"] is False
+        assert client.get("/health/ready").status_code == 503
+
+        release.set()
+        assert _wait_for(lambda: client.get("/health/ready").status_code == 200)
+        assert "warmup" in client.get("/health/ready").json()["startup_ms"]
+        assert client.get("/health").json()["ready"] is True
+
+    assert main.ready is False
+
+
+def test_failed_warm_up_keeps_the_worker_out_of_rotation(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    main = api
+
+    done = threading.Event()
+
+    def broken_warm_up(X, iterations=1):
+        done.set()
+        raise ValueError("cannot score canary rows")
+
+    monkeypatch.setattr(main.model_service, "warm_up", broken_warm_up)
+    monkeypatch.setitem(main.warmup_cfg, "enabled", True)
+
+    with TestClient(main.app) as client:
+        assert done.wait(30)
+        time.sleep(0.1)
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health/live").status_code == 200
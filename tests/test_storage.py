@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.storage import find_table, read_table, to_float32, write_table
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_columnar_roundtrip_keeps_dtypes_and_projects_columns(tmp_path, fmt):
+    df = pd.DataFrame({"a": np.arange(5, dtype=np.float64), "b": np.arange(5), "y": np.ones(5)})
+    stored = to_float32(df, keep=["y"])
+
+    path = write_table(stored, tmp_path / "train.csv", fmt, export_csv=True)
+    assert path.suffix == f".{fmt}"
+    assert (tmp_path / "train.csv").exists()
+
+    back = read_table(path, memory_map=True)
+    assert back.dtypes.to_dict() == {"a": np.float32, "b": np.int64, "y": np.float64}
+    assert list(read_table(path, columns=["y", "a"]).columns) == ["y", "a"]
+
+
+def test_find_table_falls_back_to_other_formats_with_a_warning(tmp_path, caplog, monkeypatch):
+    import logging
+
+    # the "storage" logger does not propagate: hand its records to caplog directly
+    monkeypatch.setattr(logging.getLogger("storage"), "handlers", [caplog.handler])
+    pd.DataFrame({"a": [1.0]}).to_csv(tmp_path / "val.csv", index=False)
+    with caplog.at_level("WARNING", logger="storage"):
+        assert find_table(tmp_path / "val", "parquet") == tmp_path / "val.csv"
+    assert "val.parquet not found, reading" in caplog.text
+
+    caplog.clear()
+    pd.DataFrame({"a": [1.0]}).to_parquet(tmp_path / "val.parquet", index=False)
+    with caplog.at_level("WARNING", logger="storage"):
+        assert find_table(tmp_path / "val", "parquet") == tmp_path / "val.parquet"
+    assert not caplog.text
+    with pytest.raises(FileNotFoundError):
+        find_table(tmp_path / "test", "parquet")
@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.datasets import get_xy, load_split
+from src.features import get_feature_spec_from_config_or_infer
+from src.training import build_candidates, fit_preprocessing, select_best, train_candidates
+
+
+def test_preprocess_once_then_train_candidates_in_parallel(tmp_path):
+    df = load_split("train").head(2000)
+    X, y = get_xy(df)
+    X_train, y_train, X_val, y_val = X.iloc[:1500], y.iloc[:1500], X.iloc[1500:], y.iloc[1500:]
+    spec, _ = get_feature_spec_from_config_or_infer(df)
+
+    pre, Xt_train, Xt_val = fit_preprocessing(X_train, X_val, spec, tmp_path)
+    _, hit_train, _ = fit_preprocessing(X_train, X_val, spec, tmp_path)
+    assert hit_train == Xt_train and len(list(tmp_path.iterdir())) == 1
+
+    models = {
+        "ridge": {"type": "ridge", "alpha": 1.0},
+        "gb": {"type": "hist_gb", "name": "small_gb", "max_iter": 20},
+    }
+    candidates = build_candidates(models, seed=0)
+    parallel = train_candidates(candidates, Xt_train, y_train, Xt_val, y_val, n_jobs=2)
+    sequential = train_candidates(candidates, Xt_train, y_train, Xt_val, y_val, n_jobs=1)
+    assert [r[0] for r in parallel] == ["ridge", "small_gb"]
+    assert [r[2] for r in parallel] == [r[2] for r in sequential]
+
+    name, pipe, metrics = select_best(parallel, pre)
+    assert name == min(parallel, key=lambda r: r[2]["rmse"])[0]
+    model = dict((n, m) for n, m, _ in parallel)[name]
+    np.testing.assert_allclose(pipe.predict(X_val), model.predict(np.load(Xt_val)))
+
+
+def test_preprocess_cache_keeps_only_the_most_recently_used_entries(tmp_path):
+    import os
+
+    df = load_split("train").head(600)
+    X, _ = get_xy(df)
+    spec, _ = get_feature_spec_from_config_or_infer(df)
+    X_train = X.iloc[:400]
+    vals = [X.iloc[400 + 50 * i:450 + 50 * i] for i in range(4)]  # each val slice is a new cache key
+
+    calls = []
+
+    def fit(i, keep=2):
+        _, path, _ = fit_preprocessing(X_train, vals[i], spec, tmp_path, keep=keep)
+        calls.append(i)  # then a strictly later mtime per use, whatever the clock resolution
+        os.utime(path.parent, ns=(0, 10 ** 18 + len(calls) * 10 ** 9))
+        return path.parent
+
+    first, second = fit(0), fit(1)
+    assert first.exists() and second.exists()
+
+    fit(0)                  # a hit makes the first entry the most recently used
+    third = fit(2)
+    assert {p.name for p in tmp_path.iterdir()} == {first.name, third.name}
+
+    fit(3, keep=1)
+    assert len(list(tmp_path.iterdir())) == 1